@@ -0,0 +1,283 @@
+"""
+Batch analysis of many documents: a folder, ZIP archives or a multi-file upload.
+
+Extraction runs across a process pool while the Gemini analyses of documents
+already extracted stay in flight on a thread pool, so both kinds of work
+overlap. Each finished document becomes one JSON line in the output. A batch
+that was interrupted is resumed by running it again with the same output file:
+documents already recorded (same name and content hash) with a final status
+are skipped, and failed ones are retried.
+
+Usage (from the backend directory):
+    python batch.py leases/ -o results.jsonl [--workers 4] [--llm-concurrency 8]
+    python batch.py leases.zip -o results.jsonl
+"""
+
+import argparse
+import json
+import logging
+import os
+import posixpath
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from executors import _extract_in_worker, _init_extraction_worker
+from extraction_cache import file_sha256
+from text_extractor import DOCX_EXTENSIONS, IMAGE_EXTENSIONS, available_cpu_count
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_EXTENSIONS = ['.pdf', *DOCX_EXTENSIONS, *IMAGE_EXTENSIONS]
+
+# Record statuses. Final ones are not re-run on resume; 'failed' is.
+SUCCESS = 'success'
+REJECTED = 'rejected'  # not a legal document, or text too poor to analyze
+FAILED = 'failed'
+FINAL_STATUSES = (SUCCESS, REJECTED)
+
+_REJECTIONS = ("Not a legal document", "Poor text extraction quality")
+
+
+def analyze_text(analyzer, text: str) -> Dict[str, Any]:
+    """
+    Analyze extracted text like /analyze does, keeping the outcome distinguishable.
+
+    Returns:
+        Dict with status, analysis (the summary report, as in /analyze), details
+        (the structured analysis) and error
+    """
+    if not text.strip():
+        return {'status': REJECTED, 'analysis': None, 'details': None,
+                'error': "Could not extract text from the document"}
+    details = analyzer.pipeline.run(text, detect_language=False)['analysis']
+    if "error" in details:
+        status = REJECTED if details["error"] in _REJECTIONS else FAILED
+        return {'status': status, 'analysis': details.get("message"), 'details': details,
+                'error': details["error"]}
+    return {'status': SUCCESS, 'analysis': analyzer.generate_summary_report(details), 'details': details,
+            'error': None}
+
+
+def make_record(name: str, sha256: str, outcome: Dict[str, Any], text_length: int, seconds: float,
+                **extra) -> Dict[str, Any]:
+    """One output line: the document, its content hash and the outcome of its analysis."""
+    record = {'file': name, 'sha256': sha256, **outcome, 'extracted_text_length': text_length,
+              'seconds': round(seconds, 3)}
+    record.update(extra)
+    return record
+
+
+def failure_record(name: str, sha256: str, error: Exception, seconds: float) -> Dict[str, Any]:
+    outcome = {'status': FAILED, 'analysis': None, 'details': None, 'error': str(error)}
+    return make_record(name, sha256, outcome, 0, seconds)
+
+
+def find_documents(directory: str, extensions: Iterable[str] = DOCUMENT_EXTENSIONS) -> List[Tuple[str, str]]:
+    """(name relative to directory, path) of every supported document below directory, in sorted order."""
+    documents = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for filename in sorted(files):
+            if filename.startswith('.') or os.path.splitext(filename)[1].lower() not in extensions:
+                continue
+            path = os.path.join(root, filename)
+            documents.append((os.path.relpath(path, directory).replace(os.sep, '/'), path))
+    return documents
+
+
+def unpack_zip(zip_path: str, destination: str, extensions: Iterable[str] = DOCUMENT_EXTENSIONS,
+               max_files: int = 500, max_bytes: int = 500 * 1024 * 1024, prefix: str = '',
+               used_bytes: int = 0) -> List[Tuple[str, str]]:
+    """
+    Copy the supported documents of a ZIP archive into destination.
+
+    Entries are written under generated names (archive paths are never used
+    as file system paths), and the number of documents and their total
+    uncompressed size are capped while copying, whatever the archive claims.
+    used_bytes is what the rest of the batch already takes up: it counts against
+    max_bytes too, so one limit can cover several archives and plain files.
+
+    Returns:
+        (name inside the archive, prefixed with prefix, path on disk) per document
+
+    Raises:
+        ValueError: if the archive holds more than max_files documents or goes past max_bytes
+    """
+    documents = []
+    total = used_bytes
+    with zipfile.ZipFile(zip_path) as archive:
+        for info in archive.infolist():
+            name = info.filename
+            extension = posixpath.splitext(name)[1].lower()
+            if (info.is_dir() or name.startswith('__MACOSX/') or posixpath.basename(name).startswith('.')
+                    or extension not in extensions):
+                continue
+            if len(documents) >= max_files:
+                raise ValueError(f"Too many documents: at most {max_files} per batch")
+            path = os.path.join(destination, f"{len(documents):05d}-{os.urandom(4).hex()}{extension}")
+            with archive.open(info) as source, open(path, 'wb') as target:
+                while chunk := source.read(1024 * 1024):
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise ValueError(f"Batch too large: at most {max_bytes // (1024 * 1024)} MB uncompressed")
+                    target.write(chunk)
+            documents.append((prefix + name, path))
+    return documents
+
+
+def load_completed(output_path: str) -> Set[Tuple[str, str]]:
+    """(file, sha256) of the records in an existing output file that need no re-run."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of a batch killed mid-write
+                continue
+            if record.get('status') in FINAL_STATUSES:
+                completed.add((record['file'], record['sha256']))
+    return completed
+
+
+class JSONLWriter:
+    """Appends records to a JSONL file, each one flushed to disk before the next is written."""
+
+    def __init__(self, path: str):
+        # A line cut short by a crash is terminated so the next record starts on its own line
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        self._file = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write('\n')
+
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def run_batch(documents: List[Tuple[str, str]], output_path: str, analyzer, extraction_workers: int,
+              llm_concurrency: int = 8) -> Dict[str, int]:
+    """
+    Extract and analyze documents, appending one record per document to output_path.
+
+    At most 2 x extraction_workers extractions are queued on the process pool, and
+    new extractions wait while 2 x llm_concurrency extracted documents are queued
+    for analysis, so memory stays bounded on large batches.
+
+    Returns:
+        Count of documents per status, plus 'skipped' for those already done
+    """
+    completed = load_completed(output_path)
+    counts = {SUCCESS: 0, REJECTED: 0, FAILED: 0, 'skipped': 0}
+    pending = []
+    for name, path in documents:
+        sha256 = file_sha256(path)
+        if (name, sha256) in completed:
+            counts['skipped'] += 1
+        else:
+            pending.append((name, path, sha256))
+    total = len(pending)
+    if counts['skipped']:
+        logger.info(f"Resuming: {counts['skipped']} documents already done, {total} to go")
+
+    writer = JSONLWriter(output_path)
+    extraction_pool = ProcessPoolExecutor(max_workers=extraction_workers, initializer=_init_extraction_worker)
+    llm_pool = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix='batch-llm')
+    extractions: Dict[Future, Tuple[str, str, float]] = {}
+    analyses: Dict[Future, Tuple[str, str, int, float]] = {}
+    queue = iter(pending)
+    finished = 0
+
+    def finish(record: Dict[str, Any]):
+        nonlocal finished
+        finished += 1
+        counts[record['status']] += 1
+        writer.write(record)
+        logger.info(f"[{finished}/{total}] {record['file']}: {record['status']} ({record['seconds']}s)")
+
+    try:
+        while True:
+            while len(extractions) < 2 * extraction_workers and len(analyses) < 2 * llm_concurrency:
+                item = next(queue, None)
+                if item is None:
+                    break
+                name, path, sha256 = item
+                extractions[extraction_pool.submit(_extract_in_worker, path, 'detailed')] = (name, sha256, time.time())
+            if not extractions and not analyses:
+                break
+
+            done, _ = wait([*extractions, *analyses], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in extractions:
+                    name, sha256, started = extractions.pop(future)
+                    try:
+                        text = future.result()['combined_text']
+                    except Exception as e:
+                        finish(failure_record(name, sha256, e, time.time() - started))
+                        continue
+                    analyses[llm_pool.submit(analyze_text, analyzer, text)] = (name, sha256, len(text), started)
+                else:
+                    name, sha256, text_length, started = analyses.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        finish(failure_record(name, sha256, e, time.time() - started))
+                        continue
+                    finish(make_record(name, sha256, outcome, text_length, time.time() - started))
+    finally:
+        extraction_pool.shutdown(wait=True, cancel_futures=True)
+        llm_pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs='+', help="Directories, ZIP archives or individual documents")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file to append results to (resumes if it exists)")
+    parser.add_argument("--workers", type=int, default=0, help="Extraction processes (default: available cores)")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="Documents analyzed at the same time")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from legal_document_analyzer import LegalDocumentAnalyzer
+
+    unpacked = tempfile.mkdtemp(prefix='lexilingua-batch-')
+    try:
+        documents = []
+        for source in args.inputs:
+            if os.path.isdir(source):
+                documents.extend(find_documents(source))
+            elif source.lower().endswith('.zip'):
+                documents.extend(unpack_zip(source, unpacked, prefix=f"{os.path.basename(source)}/"))
+            else:
+                documents.append((os.path.basename(source), source))
+        if not documents:
+            print("No supported documents found.", file=sys.stderr)
+            return
+
+        counts = run_batch(documents, args.output, LegalDocumentAnalyzer(),
+                           extraction_workers=args.workers or available_cpu_count(),
+                           llm_concurrency=args.llm_concurrency)
+        print(", ".join(f"{count} {status}" for status, count in counts.items()), file=sys.stderr)
+    finally:
+        shutil.rmtree(unpacked, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
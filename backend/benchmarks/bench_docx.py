@@ -0,0 +1,153 @@
+"""
+DOCX extraction benchmark: streaming extractor vs python-docx.
+
+Generates a contract-like .docx of --pages pages (numbered clauses, a table
+every few pages, header and footer) with python-docx, or uses the file given,
+then extracts it with docx_extractor.extract_docx and with the usual
+python-docx approach (paragraphs, table cells, section headers and footers).
+Each extraction runs in a fresh process. "peak MB" is the growth of the
+process's peak RSS over its RSS just before the extraction (Linux: the peak is
+reset through /proc/self/clear_refs first, so import-time peaks do not hide it).
+
+Usage (from the backend directory):
+    python benchmarks/bench_docx.py [--pages 500] [--repeat 3] [--file contract.docx]
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+CLAUSE = ("The Tenant shall pay the monthly rent of $1,500 on or before the first day of each month. "
+          "Late payment shall incur a fee of five percent (5%) of the outstanding amount, and the Landlord "
+          "may terminate this Agreement upon thirty (30) days' written notice if payment remains overdue. ")
+
+
+def generate(path: str, pages: int):
+    """A contract of roughly `pages` pages: 8 clauses per page, a table every 10 pages."""
+    from docx import Document
+
+    document = Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "RESIDENTIAL LEASE AGREEMENT - CONFIDENTIAL"
+    section.footer.paragraphs[0].text = "Initials: ______ Landlord   ______ Tenant"
+    clause = 0
+    for page in range(pages):
+        for _ in range(8):
+            clause += 1
+            document.add_paragraph(f"{clause}. {CLAUSE}")
+        if page % 10 == 0:
+            table = document.add_table(rows=4, cols=3)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"Schedule {page}.{r} item {c}: $ {100 * (r + c)}"
+    document.save(path)
+
+
+def extract_python_docx(path: str) -> str:
+    from docx import Document
+
+    document = Document(path)
+    parts = [p.text for p in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(' | '.join(cell.text for cell in row.cells))
+    for section in document.sections:
+        parts.extend(p.text for p in section.header.paragraphs)
+        parts.extend(p.text for p in section.footer.paragraphs)
+    return '\n'.join(part for part in parts if part.strip())
+
+
+def extract_native(path: str) -> str:
+    from docx_extractor import extract_docx
+
+    return extract_docx(path, ocr=None)['combined_text']
+
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def reset_peak_rss() -> int:
+    """Reset the peak RSS to the current RSS where the kernel allows it; returns the baseline in KB."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return _status_kb('VmRSS')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss() -> int:
+    try:
+        return _status_kb('VmHWM')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(method: str, path: str):
+    """Child process: run one extraction and print seconds, peak RSS growth and text length as JSON."""
+    extract = extract_native if method == 'native' else extract_python_docx
+    # Import everything the method needs before taking the baseline
+    if method == 'native':
+        import docx_extractor  # noqa: F401
+    else:
+        import docx  # noqa: F401
+    baseline_kb = reset_peak_rss()
+    start = time.perf_counter()
+    text = extract(path)
+    seconds = time.perf_counter() - start
+    peak_kb = peak_rss()
+    print(json.dumps({'seconds': seconds, 'peak_mb': (peak_kb - baseline_kb) / 1024, 'chars': len(text)}))
+
+
+def run_child(method: str, path: str):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', method, path],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", help="Benchmark this .docx instead of a generated one")
+    parser.add_argument("--measure", nargs=2, metavar=("METHOD", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    path = args.file
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.docx')
+        os.close(fd)
+        generate(path, args.pages)
+    try:
+        print(f"{os.path.basename(path)}: {os.path.getsize(path) / 1024:.0f} KB"
+              + ("" if args.file else f", {args.pages} pages"))
+        print(f"{'method':<12} {'seconds':>8} {'peak MB':>8} {'chars':>10}")
+        for method in ('python-docx', 'native'):
+            runs = [run_child(method, path) for _ in range(args.repeat)]
+            print(f"{method:<12} {statistics.median(r['seconds'] for r in runs):8.3f} "
+                  f"{statistics.median(r['peak_mb'] for r in runs):8.1f} {runs[0]['chars']:>10}")
+    finally:
+        if args.file is None:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Burst benchmark for the Gemini client layer, against the local fake API server.
+
+Fires --requests concurrent generate_content calls at a fake server that
+injects 429s, stalls and a per-minute quota, once through a bare
+GenerativeModel and once through ResilientModel, and reports successes,
+failures, retries, timeouts and latency for each. No API key or quota is used.
+
+Usage (from the backend directory):
+    python benchmarks/bench_gemini_client.py [--requests 50] [--concurrency 20]
+        [--latency 0.3] [--error-rate 0.2] [--hang-rate 0.02] [--quota-rpm 0]
+        [--timeout 5] [--rpm 0]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import google.generativeai as genai  # noqa: E402
+
+from fake_gemini_server import start_in_thread  # noqa: E402
+from gemini_client import ResilientModel, TokenBucket, configure_gemini  # noqa: E402
+
+
+def burst(model, requests: int, concurrency: int):
+    """(successes, errors by type, sorted latencies of successes, wall seconds)"""
+    def one(i):
+        start = time.perf_counter()
+        try:
+            model.generate_content(f"Detect the language of request {i}")
+            return None, time.perf_counter() - start
+        except Exception as e:
+            return type(e).__name__, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - start
+
+    errors = {}
+    for error, _ in results:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    latencies = sorted(seconds for error, seconds in results if error is None)
+    return len(latencies), errors, latencies, wall
+
+
+def report(label: str, requests: int, result, extra: str = ""):
+    successes, errors, latencies, wall = result
+    latency = (f"p50 {statistics.median(latencies):.2f}s, max {latencies[-1]:.2f}s"
+               if latencies else "no successes")
+    print(f"{label:<10} {successes}/{requests} ok in {wall:.1f}s ({latency}); errors {errors or 'none'} {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20, help="Caller threads")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake server seconds per answer")
+    parser.add_argument("--error-rate", type=float, default=0.2, help="Share of requests answered 429")
+    parser.add_argument("--hang-rate", type=float, default=0.02, help="Share of requests that stall")
+    parser.add_argument("--quota-rpm", type=int, default=0, help="Fake server per-minute quota (0 = none)")
+    parser.add_argument("--timeout", type=float, default=5.0, help="ResilientModel deadline per attempt")
+    parser.add_argument("--rpm", type=float, default=0, help="ResilientModel rate limit (0 = none)")
+    parser.add_argument("--max-concurrent", type=int, default=8, help="ResilientModel requests in flight")
+    args = parser.parse_args()
+
+    server = start_in_thread(latency=args.latency, error_rate=args.error_rate, hang_rate=args.hang_rate,
+                             hang_seconds=args.timeout * 3, quota_rpm=args.quota_rpm)
+    os.environ['GEMINI_API_ENDPOINT'] = f"http://127.0.0.1:{server.server_port}"
+    configure_gemini("fake-key")
+    model = genai.GenerativeModel('gemini-1.5-flash')
+
+    print(f"{args.requests} requests from {args.concurrency} threads; fake server: {args.latency}s latency, "
+          f"{args.error_rate:.0%} 429s, {args.hang_rate:.0%} stalls, quota {args.quota_rpm or 'none'} rpm")
+    report("bare", args.requests, burst(model, args.requests, args.concurrency))
+
+    resilient = ResilientModel(
+        model, timeout_seconds=args.timeout, max_retries=3, backoff_base_seconds=0.5, backoff_max_seconds=5,
+        rate_limiter=TokenBucket(args.rpm / 60, 5) if args.rpm else None, max_concurrency=args.max_concurrent
+    )
+    result = burst(resilient, args.requests, args.concurrency)
+    report("resilient", args.requests, result, f"\n           client counters {resilient.stats()}")
+    resilient.shutdown()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
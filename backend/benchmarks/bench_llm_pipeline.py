@@ -0,0 +1,106 @@
+"""
+Gemini fan-out benchmark: end-to-end analysis latency, serial vs concurrent.
+
+Uses a stub model with a fixed latency per call, so only the orchestration is
+measured. The serial baseline makes the calls one after another, as
+process_document_complete used to: detect language, (translate), classify,
+analyze. The pipeline runs them through ConcurrentAnalysisPipeline.
+
+Usage (from the backend directory):
+    python benchmarks/bench_llm_pipeline.py [--latency 0.8] [--repeat 3]
+        [--language English|Spanish] [--not-legal] [--no-speculative]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legal_document_analyzer import LegalDocumentAnalyzer  # noqa: E402
+from llm_pipeline import ConcurrentAnalysisPipeline  # noqa: E402
+
+DOCUMENT = (
+    "RESIDENTIAL LEASE AGREEMENT. This Lease is made between the Landlord and the Tenant. "
+    "The Tenant shall pay a monthly rent of $1,500 on the first day of each month. "
+) * 40
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """Answers like Gemini would for each prompt type, after a fixed delay."""
+
+    model_name = 'stub'
+
+    def __init__(self, latency: float, language: str, legal: bool):
+        self.latency = latency
+        self.language = language
+        self.legal = legal
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        if "Detect the language" in prompt:
+            return StubResponse(self.language)
+        if "Respond with only" in prompt:
+            return StubResponse("LEGAL" if self.legal else "NOT_LEGAL")
+        if prompt.lstrip().startswith("Translate"):
+            return StubResponse(DOCUMENT)
+        return StubResponse(json.dumps({"document_type": "Lease", "summary": "A lease."}))
+
+
+def run_serial(analyzer: LegalDocumentAnalyzer, language: str):
+    detected = analyzer.detect_language(DOCUMENT)
+    text = DOCUMENT
+    if detected.lower() != "english" and language.lower() == "english":
+        text = analyzer.translate_document(DOCUMENT, "English")
+    return analyzer.simplify_legal_document(text, language)
+
+
+def measure(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.8, help="Seconds per stub Gemini call")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--language", default="English", help="Language the stub detects")
+    parser.add_argument("--not-legal", action="store_true", help="Stub classifies the document as NOT_LEGAL")
+    parser.add_argument("--no-speculative", action="store_true", help="Wait for the classifier before analyzing")
+    args = parser.parse_args()
+
+    model = StubModel(args.latency, args.language, legal=not args.not_legal)
+    analyzer = LegalDocumentAnalyzer(model=model)
+    pipeline = ConcurrentAnalysisPipeline(analyzer, speculative=not args.no_speculative)
+
+    model.calls = 0
+    serial = measure(lambda: run_serial(analyzer, "English"), args.repeat)
+    serial_calls = model.calls / args.repeat
+    model.calls = 0
+    concurrent = measure(lambda: pipeline.run(DOCUMENT, "English"), args.repeat)
+    concurrent_calls = model.calls / args.repeat
+    pipeline.shutdown()
+
+    print(f"serial     {serial:6.2f} s  ({serial_calls:.0f} calls)")
+    print(f"pipeline   {concurrent:6.2f} s  ({concurrent_calls:.0f} calls)  speedup {serial / concurrent:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
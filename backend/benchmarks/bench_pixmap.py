@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: PDF page rasterisation to a NumPy image array.
+
+Compares the old PNG encode/decode round trip against the direct
+Pixmap.samples path used by TextExtractor.render_page.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pixmap.py [document.pdf] [--repeat N]
+
+Without a PDF, a synthetic 3-page text document is generated.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from text_extractor import PDF_RENDER_ZOOM, pixmap_to_array
+
+
+def png_round_trip(pix: fitz.Pixmap) -> np.ndarray:
+    """The previous per-page path: encode to PNG, then decode with OpenCV."""
+    img_data = pix.tobytes("png")
+    nparr = np.frombuffer(img_data, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+
+def synthetic_document(pages: int = 3) -> fitz.Document:
+    """Build an in-memory PDF with a page of text on each page."""
+    doc = fitz.open()
+    clause = "The Tenant shall pay the Landlord the monthly rent on or before the first day of each month. "
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), clause * 30, fontsize=10)
+    return doc
+
+
+def time_per_page(doc: fitz.Document, convert, repeat: int) -> float:
+    """Average milliseconds per page for rasterisation plus conversion."""
+    matrix = fitz.Matrix(PDF_RENDER_ZOOM, PDF_RENDER_ZOOM)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in doc:
+            convert(page.get_pixmap(matrix=matrix, alpha=False))
+    return (time.perf_counter() - start) * 1000 / (repeat * doc.page_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", help="PDF to rasterise (default: synthetic document)")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the document")
+    args = parser.parse_args()
+
+    doc = fitz.open(args.pdf) if args.pdf else synthetic_document()
+
+    # Both paths must produce the same pixels
+    pix = doc[0].get_pixmap(matrix=fitz.Matrix(PDF_RENDER_ZOOM, PDF_RENDER_ZOOM), alpha=False)
+    if not np.array_equal(png_round_trip(pix), pixmap_to_array(pix)):
+        print("WARNING: direct path output differs from PNG round trip")
+
+    # Rasterisation alone, shared by both paths
+    render_ms = time_per_page(doc, lambda p: p, args.repeat)
+    png_ms = time_per_page(doc, png_round_trip, args.repeat)
+    direct_ms = time_per_page(doc, pixmap_to_array, args.repeat)
+
+    print(f"Pages: {doc.page_count} x {args.repeat} at {PDF_RENDER_ZOOM}x zoom ({pix.width}x{pix.height})")
+    print(f"Rasterise only:        {render_ms:8.2f} ms/page")
+    print(f"PNG encode/decode:     {png_ms:8.2f} ms/page  (+{png_ms - render_ms:.2f} conversion)")
+    print(f"Direct samples buffer: {direct_ms:8.2f} ms/page  (+{direct_ms - render_ms:.2f} conversion)")
+    print(f"Saved per page:        {png_ms - direct_ms:8.2f} ms")
+
+    doc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Q&A benchmark: prompt size and latency, full document vs retrieved clauses.
+
+Asks a set of questions about one document twice: once with the whole text in
+the prompt (retrieval disabled) and once with only the top-k BM25 chunks.
+By default the model is a stub whose latency grows with prompt length
+(--base-latency + --per-kchar per 1000 prompt characters), so the numbers
+isolate the effect of prompt size. --live uses Gemini (GEMINI_API_KEY).
+
+Usage (from the backend directory):
+    python benchmarks/bench_retrieval_qa.py [document.txt] [--pages 100] [--top-k 5] [--live]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from legal_document_analyzer import LegalDocumentAnalyzer  # noqa: E402
+
+QUESTIONS = [
+    "How much is the monthly rent and when is it due?",
+    "Can the landlord keep my security deposit?",
+    "How do I terminate this agreement early?",
+    "Am I allowed to keep pets?",
+    "Who pays for repairs and maintenance?",
+]
+
+CLAUSES = [
+    "Rent. The Tenant shall pay a monthly rent of $1,500 on or before the first day of each month. "
+    "Late payments incur a fee of $75 after a grace period of five days.",
+    "Security Deposit. The Tenant shall deposit $3,000 as security. The Landlord may deduct unpaid rent "
+    "and the cost of repairing damage beyond normal wear and tear, and shall return the balance within 30 days.",
+    "Termination. Either party may terminate this Lease with sixty days written notice. Early termination "
+    "by the Tenant requires payment of two months rent as liquidated damages.",
+    "Pets. No animals shall be kept on the premises without the prior written consent of the Landlord.",
+    "Maintenance and Repairs. The Landlord is responsible for structural repairs; the Tenant shall keep the "
+    "premises clean and pay for repairs caused by the Tenant's negligence.",
+    "Indemnification. The Tenant shall indemnify and hold harmless the Landlord from any claims arising "
+    "from the Tenant's use of the premises.",
+    "Governing Law. This Lease shall be governed by the laws of the State in which the premises are located.",
+    "Notices. All notices shall be in writing and delivered by hand or registered mail to the addresses above.",
+]
+
+
+def synthetic_contract(pages: int) -> str:
+    """A long lease: the clauses above repeated under numbered sections, ~3000 characters per page."""
+    sections, number = [], 1
+    while sum(len(s) for s in sections) < pages * 3000:
+        for clause in CLAUSES:
+            sections.append(f"{number}. {clause}")
+            number += 1
+    return "RESIDENTIAL LEASE AGREEMENT\n\n" + "\n\n".join(sections)
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """Latency proportional to prompt length, like a real model's prefill."""
+
+    model_name = 'stub'
+
+    def __init__(self, base_latency: float, per_kchar: float):
+        self.base_latency = base_latency
+        self.per_kchar = per_kchar
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        time.sleep(self.base_latency + self.per_kchar * len(prompt) / 1000)
+        return StubResponse("Stub answer.")
+
+
+class PromptRecorder:
+    """Wraps a model and records the size of each prompt sent to it."""
+
+    def __init__(self, model):
+        self.model = model
+        self.model_name = getattr(model, 'model_name', None)
+        self.prompt_sizes = []
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.prompt_sizes.append(len(prompt))
+        return self.model.generate_content(prompt)
+
+
+def run(analyzer: LegalDocumentAnalyzer, recorder: PromptRecorder, text: str, reuse_index: bool):
+    recorder.prompt_sizes.clear()
+    latencies = []
+    index = analyzer.build_qa_index(text) if reuse_index else None
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        analyzer.ask_question_about_document(text, question, index=index)
+        latencies.append(time.perf_counter() - start)
+    return statistics.mean(recorder.prompt_sizes), statistics.median(latencies), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("document", nargs="?", help="Text file to use instead of a synthetic contract")
+    parser.add_argument("--pages", type=int, default=100, help="Length of the synthetic contract")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--chunk-chars", type=int, default=1200)
+    parser.add_argument("--base-latency", type=float, default=0.3, help="Stub seconds per call")
+    parser.add_argument("--per-kchar", type=float, default=0.02, help="Stub seconds per 1000 prompt characters")
+    parser.add_argument("--live", action="store_true", help="Call Gemini instead of the stub")
+    args = parser.parse_args()
+
+    if args.document:
+        with open(args.document, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = synthetic_contract(args.pages)
+
+    if args.live:
+        import google.generativeai as genai
+        genai.configure(api_key=os.environ['GEMINI_API_KEY'])
+        model = genai.GenerativeModel('gemini-1.5-flash')
+    else:
+        model = StubModel(args.base_latency, args.per_kchar)
+    recorder = PromptRecorder(model)
+    analyzer = LegalDocumentAnalyzer(model=recorder)
+    analyzer.qa_chunk_chars = args.chunk_chars
+    analyzer.qa_top_k = args.top_k
+
+    start = time.perf_counter()
+    index = analyzer.build_qa_index(text)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for question in QUESTIONS:
+        index.retrieve(question, args.top_k)
+    query_ms = (time.perf_counter() - start) / len(QUESTIONS) * 1000
+    print(f"document {len(text):,} chars -> {len(index.chunks)} chunks; "
+          f"index built in {build_seconds * 1000:.1f} ms, {query_ms:.2f} ms per query")
+
+    analyzer.qa_full_text_max_chars = len(text)
+    full = run(analyzer, recorder, text, reuse_index=False)
+    analyzer.qa_full_text_max_chars = 0
+    retrieval = run(analyzer, recorder, text, reuse_index=True)
+
+    for label, (prompt_chars, p50, worst) in (("full text", full), (f"top-{args.top_k}", retrieval)):
+        print(f"{label:<10} prompt {prompt_chars:>10,.0f} chars   p50 {p50:6.2f} s   max {worst:6.2f} s")
+    print(f"prompt size reduced {full[0] / retrieval[0]:.1f}x, median latency {full[1] / retrieval[1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
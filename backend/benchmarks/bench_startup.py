@@ -0,0 +1,80 @@
+"""
+Startup benchmark: time and peak RSS to get the backend's OCR stack ready.
+
+Each scenario runs in a fresh interpreter so that module imports and model
+loads are measured from a cold start:
+
+    import       import text_extractor
+    construct    import + two TextExtractor() instances (as main.py and
+                 LegalDocumentAnalyzer used to create)
+    preload      import + ocr_engines.preload()
+    first_ocr    construct + OCR of a small synthetic image (engines load here
+                 when they are lazy)
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py [--repeat N]
+
+Run it on two revisions to compare startup before and after a change.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    'import': "import text_extractor",
+    'construct': "import text_extractor\n"
+                 "a = text_extractor.TextExtractor()\n"
+                 "b = text_extractor.TextExtractor()",
+    'preload': "import text_extractor, ocr_engines\n"
+               "ocr_engines.preload()",
+    'first_ocr': "import text_extractor, numpy as np, cv2\n"
+                 "a = text_extractor.TextExtractor()\n"
+                 "b = text_extractor.TextExtractor()\n"
+                 "image = np.full((120, 600, 3), 255, np.uint8)\n"
+                 "cv2.putText(image, 'Lease Agreement', (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)\n"
+                 "a.extract_from_image_array(image)",
+}
+
+RUNNER = """
+import resource, sys, time, json, logging
+logging.disable(logging.CRITICAL)
+start = time.perf_counter()
+exec(compile(sys.argv[1], 'scenario', 'exec'))
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss_kb //= 1024
+print(json.dumps({'seconds': elapsed, 'rss_mb': rss_kb / 1024}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', RUNNER, code],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Cold starts per scenario")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), action="append",
+                        help="Scenario to run (default: all)")
+    args = parser.parse_args()
+
+    for name in args.scenario or SCENARIOS:
+        runs = [run_scenario(SCENARIOS[name]) for _ in range(args.repeat)]
+        seconds = statistics.median(run['seconds'] for run in runs)
+        rss = statistics.median(run['rss_mb'] for run in runs)
+        print(f"{name:<10} {seconds:8.2f} s   peak RSS {rss:8.1f} MB   (median of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Tesseract backend benchmark: the tesseract executable per call (pytesseract) vs
+the in-process engine (tesseract_api).
+
+Runs the exhaustive-mode Tesseract workload, extract_text_tesseract on each of
+the six preprocessing variants (12 calls per image), over --images synthetic
+contract pages, or the images given with --files, once per backend. Reports
+the first call (which includes loading the in-process engine), the median call,
+the time per image and how far the texts of the two backends differ.
+A backend that is not installed is reported and skipped.
+
+Usage (from the backend directory):
+    python benchmarks/bench_tesseract.py [--images 3] [--dpi 150] [--files a.png b.jpg]
+"""
+
+import argparse
+import difflib
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ocr_engines  # noqa: E402
+from text_extractor import PREPROCESS_VARIANTS, TESSERACT_CONFIGS, TextExtractor  # noqa: E402
+
+CLAUSE = "{n}. The Tenant shall pay the monthly rent of $1,500 on or before the first day of each month."
+
+
+def make_page(index: int, dpi: int) -> np.ndarray:
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    page = np.full((height, width, 3), 250, np.uint8)
+    for line in range(int(8 * dpi / 25)):
+        y = dpi + line * dpi // 4
+        if y > height - dpi:
+            break
+        cv2.putText(page, CLAUSE.format(n=index * 100 + line + 1), (dpi // 2, y), cv2.FONT_HERSHEY_SIMPLEX,
+                    dpi / 400, (20, 20, 20), max(1, dpi // 100), cv2.LINE_AA)
+    return page
+
+
+def available(backend: str) -> bool:
+    if backend == 'api':
+        return ocr_engines.get_tesseract_api() is not None
+    return ocr_engines.ensure_tesseract()
+
+
+def run(backend: str, images):
+    extractor = TextExtractor(tesseract_backend=backend, normalize_images=False)
+    calls, per_image, texts = [], [], []
+    for image in images:
+        variants = extractor.preprocessing.variants(image)
+        image_start = time.perf_counter()
+        for name in PREPROCESS_VARIANTS:
+            for config in TESSERACT_CONFIGS.values():
+                start = time.perf_counter()
+                texts.append(extractor._tesseract_to_string(variants[name], config).strip())
+                calls.append(time.perf_counter() - start)
+        per_image.append(time.perf_counter() - image_start)
+    return calls, per_image, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--files", nargs='+', help="Benchmark these images instead of synthetic pages")
+    args = parser.parse_args()
+
+    images = [cv2.imread(path) for path in args.files] if args.files else [
+        make_page(i, args.dpi) for i in range(args.images)]
+    h, w = images[0].shape[:2]
+    print(f"{len(images)} images ({w}x{h}), {len(PREPROCESS_VARIANTS) * len(TESSERACT_CONFIGS)} Tesseract calls each")
+    print(f"{'backend':<11} {'first call s':>12} {'median call s':>13} {'s/image':>8}")
+
+    results = {}
+    for backend in ('subprocess', 'api'):
+        if not available(backend):
+            print(f"{backend:<11} not available, skipped")
+            continue
+        calls, per_image, texts = run(backend, images)
+        results[backend] = texts
+        print(f"{backend:<11} {calls[0]:12.3f} {statistics.median(calls):13.3f} {statistics.mean(per_image):8.2f}")
+
+    if len(results) == 2:
+        ratios = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(results['subprocess'], results['api'])]
+        identical = sum(a == b for a, b in zip(results['subprocess'], results['api']))
+        print(f"\ntext agreement: {identical}/{len(ratios)} identical, mean similarity {statistics.mean(ratios):.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Evaluation harness for the local LEGAL/NOT_LEGAL pre-screen.
+
+Reports, for the configured ambiguous band:
+    coverage     share of documents answered locally as LEGAL (final; the rest go to Gemini)
+    accuracy     correctness of the local answers, LEGAL and NOT_LEGAL
+    confusion    local answers per true label
+    latency      per-document classification time
+
+A local NOT_LEGAL is only a hint (the analysis is not started speculatively)
+and is confirmed by Gemini, so a legal document below the NOT_LEGAL threshold
+costs a round trip, not a wrong answer. A non-legal document above the LEGAL
+threshold is analysed as legal: --sweep shows how low the LEGAL threshold can
+go before that happens.
+
+Without --data the bundled examples are evaluated with leave-one-out
+cross-validation (each example is classified by a model trained on the
+others). With --data the model is trained on the bundled examples and
+evaluated on your set: a JSON list or JSONL file of {"text", "label"}, or a
+directory with legal/ and not_legal/ subdirectories of .txt files. The
+thresholds in .env.template are calibrated on data/document_type_heldout.json,
+which shares no texts with the training set.
+
+Usage (from the backend directory):
+    python benchmarks/eval_document_classifier.py [--data PATH] [--legal 0.9] [--not-legal 0.05] [--sweep]
+    python benchmarks/eval_document_classifier.py --data data/document_type_heldout.json --sweep
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_classifier import LEGAL, NOT_LEGAL, DocumentTypeClassifier, load_examples  # noqa: E402
+
+
+def load_dataset(path: str) -> List[Dict[str, str]]:
+    if os.path.isdir(path):
+        examples = []
+        for label, directory in ((LEGAL, 'legal'), (NOT_LEGAL, 'not_legal')):
+            folder = os.path.join(path, directory)
+            for name in sorted(os.listdir(folder)):
+                with open(os.path.join(folder, name), encoding='utf-8', errors='replace') as f:
+                    examples.append({'text': f.read(), 'label': label})
+        return examples
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+def predict_all(examples: List[Dict[str, str]], data_path: str, legal: float, not_legal: float):
+    """(probability, seconds) per example."""
+    results = []
+    if data_path:
+        classifier = DocumentTypeClassifier.from_examples(legal_threshold=legal, not_legal_threshold=not_legal)
+        classifiers = [classifier] * len(examples)
+    else:
+        classifiers = []
+        for i in range(len(examples)):
+            weights, bias = DocumentTypeClassifier.train(examples[:i] + examples[i + 1:])
+            classifiers.append(DocumentTypeClassifier(weights, bias, legal, not_legal))
+    for example, classifier in zip(examples, classifiers):
+        start = time.perf_counter()
+        probability = classifier.probability(example['text'])
+        results.append((probability, time.perf_counter() - start))
+    return results
+
+
+def summarize(examples, results, legal: float, not_legal: float) -> Dict[str, float]:
+    confusion = {(truth, answer): 0 for truth in (LEGAL, NOT_LEGAL) for answer in (LEGAL, NOT_LEGAL, None)}
+    for example, (probability, _) in zip(examples, results):
+        answer = LEGAL if probability >= legal else NOT_LEGAL if probability <= not_legal else None
+        confusion[(example['label'], answer)] += 1
+    decided = sum(count for (_, answer), count in confusion.items() if answer is not None)
+    correct = confusion[(LEGAL, LEGAL)] + confusion[(NOT_LEGAL, NOT_LEGAL)]
+    return {
+        'coverage': (confusion[(LEGAL, LEGAL)] + confusion[(NOT_LEGAL, LEGAL)]) / len(examples),
+        'false_legal': confusion[(NOT_LEGAL, LEGAL)],
+        'missed_legal': confusion[(LEGAL, NOT_LEGAL)],
+        'accuracy': correct / decided if decided else float('nan'),
+        'confusion': confusion
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Labelled evaluation set (default: leave-one-out on the bundled examples)")
+    parser.add_argument("--legal", type=float, default=0.9, help="LEGAL threshold")
+    parser.add_argument("--not-legal", type=float, default=0.05, help="NOT_LEGAL threshold")
+    parser.add_argument("--sweep", action="store_true", help="Also show coverage/accuracy for other band widths")
+    args = parser.parse_args()
+
+    examples = load_dataset(args.data) if args.data else load_examples()
+    results = predict_all(examples, args.data, args.legal, args.not_legal)
+    summary = summarize(examples, results, args.legal, args.not_legal)
+
+    latencies_us = sorted(seconds * 1e6 for _, seconds in results)
+    print(f"{len(examples)} documents, band ({args.not_legal}, {args.legal})")
+    print(f"coverage  {summary['coverage']:.1%} answered locally, {1 - summary['coverage']:.1%} sent to the model")
+    print(f"errors    {summary['false_legal']} non-legal analysed as legal, "
+          f"{summary['missed_legal']} legal marked NOT_LEGAL (confirmed by the model)")
+    print(f"accuracy  {summary['accuracy']:.1%} of local answers")
+    print("confusion (true label -> LEGAL / NOT_LEGAL / ambiguous)")
+    for truth in (LEGAL, NOT_LEGAL):
+        counts = [summary['confusion'][(truth, answer)] for answer in (LEGAL, NOT_LEGAL, None)]
+        print(f"  {truth:<10} {counts[0]:>5} {counts[1]:>10} {counts[2]:>10}")
+    print(f"latency   p50 {statistics.median(latencies_us):.0f} us, "
+          f"max {latencies_us[-1]:.0f} us per document")
+
+    if args.sweep:
+        print("\nLEGAL threshold  coverage  non-legal as legal")
+        for legal in (0.6, 0.7, 0.8, 0.85, 0.9, 0.95):
+            row = summarize(examples, results, legal, 0.0)
+            print(f"{legal:15.2f}  {row['coverage']:8.1%}  {row['false_legal']:18d}")
+        print("\nNOT_LEGAL threshold  legal marked NOT_LEGAL")
+        for not_legal in (0.02, 0.05, 0.1, 0.15, 0.2):
+            row = summarize(examples, results, 1.0, not_legal)
+            print(f"{not_legal:19.2f}  {row['missed_legal']:21d}")
+
+
+if __name__ == "__main__":
+    main()
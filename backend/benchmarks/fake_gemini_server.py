@@ -0,0 +1,150 @@
+"""
+Local stand-in for the Gemini REST API, for exercising ResilientModel without a key or quota.
+
+Answers POST /v1beta/models/<model>:generateContent and :streamGenerateContent
+like Gemini would for the analyzer's prompt types, after a configurable delay,
+and injects the failures the client layer has to absorb:
+    --error-rate     share of requests answered 429 RESOURCE_EXHAUSTED
+    --hang-rate      share of requests that stall for --hang-seconds (deadline tests)
+    --quota-rpm      per-minute quota; requests over it get 429, like the real API
+
+Point the backend at it with:
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GEMINI_API_KEY=fake python main.py
+
+Usage (from the backend directory):
+    python benchmarks/fake_gemini_server.py [--port 8765] [--latency 0.5]
+        [--error-rate 0.1] [--hang-rate 0] [--hang-seconds 120] [--quota-rpm 0]
+"""
+
+import argparse
+import collections
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH = re.compile(r"^/v1(?:beta)?/models/[^/:]+:(generateContent|streamGenerateContent)")
+
+
+def answer(prompt: str) -> str:
+    """A plausible answer for each of the analyzer's prompt types."""
+    if "Detect the language" in prompt:
+        return "English"
+    if "Respond with only" in prompt:
+        return "LEGAL"
+    if prompt.lstrip().startswith("Translate"):
+        return prompt
+    return json.dumps({"document_type": "Lease", "summary": "A fake analysis.", "red_flags": []})
+
+
+def _candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                            "finishReason": "STOP", "index": 0}]}
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.5, error_rate: float = 0.0, hang_rate: float = 0.0,
+                 hang_seconds: float = 120.0, quota_rpm: int = 0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.quota_rpm = quota_rpm
+        self.lock = threading.Lock()
+        self.recent = collections.deque()
+        self.counts = collections.Counter()
+
+    def over_quota(self) -> bool:
+        if not self.quota_rpm:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            if len(self.recent) >= self.quota_rpm:
+                return True
+            self.recent.append(now)
+            return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeGeminiServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        match = _PATH.match(self.path)
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if match is None:
+            self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+            return
+
+        server = self.server
+        if server.over_quota() or random.random() < server.error_rate:
+            with server.lock:
+                server.counts['429'] += 1
+            self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                            "status": "RESOURCE_EXHAUSTED"}})
+            return
+        if random.random() < server.hang_rate:
+            with server.lock:
+                server.counts['hung'] += 1
+            time.sleep(server.hang_seconds)
+        else:
+            time.sleep(server.latency)
+
+        prompt = "".join(part.get("text", "") for content in request.get("contents", [])
+                         for part in content.get("parts", []))
+        text = answer(prompt)
+        with server.lock:
+            server.counts['200'] += 1
+        if match.group(1) == "streamGenerateContent":
+            # The REST stream is one JSON array, read incrementally by the client
+            middle = len(text) // 2
+            self._send_json(200, [_candidate(text[:middle]), _candidate(text[middle:])])
+        else:
+            self._send_json(200, _candidate(text))
+
+
+def start_in_thread(port: int = 0, **options) -> FakeGeminiServer:
+    """Start a server on a background thread; port 0 picks a free port (see server.server_port)."""
+    server = FakeGeminiServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per answer")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--quota-rpm", type=int, default=0, help="Requests per minute before 429 (0 = no quota)")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(("127.0.0.1", args.port), latency=args.latency, error_rate=args.error_rate,
+                              hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, quota_rpm=args.quota_rpm)
+    print(f"Fake Gemini API on http://127.0.0.1:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test: latency of a light endpoint while heavy uploads are in flight.
+
+Probes GET / at a fixed rate, first on an idle server and then while
+--uploads concurrent POST /analyze requests are running, and reports
+p50/p99 probe latency for both phases. With extraction and Gemini calls
+off the event loop, the two phases should look alike.
+
+Usage (server already running, e.g. `python main.py`):
+    python benchmarks/load_test.py scanned.pdf [--url http://localhost:8000]
+        [--uploads 4] [--probe-interval 0.05] [--idle-seconds 5]
+"""
+
+import argparse
+import mimetypes
+import os
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+from typing import List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def probe(url: str, interval: float, stop: threading.Event) -> List[float]:
+    """Request url every interval seconds until stop is set; returns latencies in ms."""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        with urllib.request.urlopen(url, timeout=60) as response:
+            response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        stop.wait(interval)
+    return latencies
+
+
+def upload(url: str, file_path: str, durations: List[float]):
+    """POST a file as multipart/form-data and record how long it took."""
+    boundary = uuid.uuid4().hex
+    filename = os.path.basename(file_path)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    with open(file_path, 'rb') as f:
+        payload = f.read()
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: {content_type}\r\n\r\n'
+    ).encode('utf-8') + payload + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+    request = urllib.request.Request(url, data=body, method='POST')
+    request.add_header('Content-Type', f'multipart/form-data; boundary={boundary}')
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=900) as response:
+            response.read()
+    except Exception as e:
+        print(f"Upload failed: {e}")
+    durations.append(time.perf_counter() - start)
+
+
+def run_phase(base_url: str, interval: float, duration: float = None, uploads: List[threading.Thread] = None):
+    """Probe the light endpoint for a fixed time, or until the upload threads finish."""
+    stop = threading.Event()
+    result = {}
+    prober = threading.Thread(target=lambda: result.setdefault('latencies', probe(base_url + '/', interval, stop)))
+    prober.start()
+    if uploads:
+        for thread in uploads:
+            thread.start()
+        for thread in uploads:
+            thread.join()
+    else:
+        time.sleep(duration)
+    stop.set()
+    prober.join()
+    return result['latencies']
+
+
+def report(label: str, latencies: List[float]):
+    print(f"{label:<22} n={len(latencies):<5} p50={statistics.median(latencies):8.1f} ms  "
+          f"p99={percentile(latencies, 99):8.1f} ms  max={max(latencies):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="Document to upload for the heavy requests")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent heavy uploads")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="Seconds between light probes")
+    parser.add_argument("--idle-seconds", type=float, default=5, help="Length of the idle baseline phase")
+    args = parser.parse_args()
+
+    idle = run_phase(args.url, args.probe_interval, duration=args.idle_seconds)
+
+    durations = []
+    threads = [threading.Thread(target=upload, args=(args.url + '/analyze', args.file, durations))
+               for _ in range(args.uploads)]
+    loaded = run_phase(args.url, args.probe_interval, uploads=threads)
+
+    report("GET / idle", idle)
+    report(f"GET / + {args.uploads} uploads", loaded)
+    print(f"Uploads finished in {min(durations):.1f}-{max(durations):.1f} s")
+
+
+if __name__ == "__main__":
+    main()
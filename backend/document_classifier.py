@@ -0,0 +1,206 @@
+"""
+Local LEGAL / NOT_LEGAL pre-screen for extracted text.
+
+Counts of cue words (obligation language, party roles, contract types,
+clause structure, employment and estate terms vs. resume, invoice, letter and
+prose vocabulary) are fed to a small logistic regression trained with NumPy on
+bundled labelled examples. Only a confident LEGAL prediction is final: it is
+answered locally in microseconds. The cues are English and the training set is
+small, so a NOT_LEGAL prediction only tells the caller that a wasted speculative
+analysis is likely; the model still confirms it, as it decides the ambiguous
+band. Thresholds are calibrated on data/document_type_heldout.json (see
+benchmarks/eval_document_classifier.py).
+"""
+
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_EXAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'document_type_examples.json')
+
+LEGAL = "LEGAL"
+NOT_LEGAL = "NOT_LEGAL"
+
+# Each group becomes one feature: log(1 + number of matching words or phrases).
+# "#" stands for any number; a trailing "*" matches any word with that prefix.
+CUE_GROUPS = {
+    'obligation': ["shall", "hereby", "agree to", "agrees to", "undertake", "undertakes", "must not",
+                   "is entitled to", "reserve the right", "reserves the right"],
+    'parties': ["party", "parties", "hereinafter", "by and between", "undersigned", "hereto", "herein", "thereof"],
+    'document': ["agreement", "agreements", "contract", "contracts", "lease", "leases", "deed", "deeds",
+                 "terms of service", "terms of use", "terms and conditions", "privacy policy", "policy",
+                 "license agreement", "licence agreement", "will and testament", "power of attorney"],
+    'legal_terms': ["indemn*", "liabilit*", "liable", "warrant*", "breach*", "terminat*", "governing law",
+                    "jurisdiction", "arbitration", "confidential*", "covenant", "covenants", "consideration",
+                    "default", "waive*", "release*", "bequeath", "executor", "title", "consent"],
+    'structure': ["section #", "clause #", "article #", "schedule", "exhibit", "whereas", "in witness whereof",
+                  "effective date", "signature", "signed"],
+    'employment': ["offer of employment", "terms of employment", "at will", "probation*", "salary",
+                   "compensation", "notice period", "start date", "contingent", "accept this offer"],
+    'estate': ["testament", "testator", "testatrix", "codicil*", "estate", "heir", "heirs", "beneficiar*",
+               "residue", "bequest*", "devise*", "revoke*", "witnesses", "guardian"],
+    'roles': ["tenant", "landlord", "lessee", "lessor", "borrower", "lender", "employer", "employee", "licensee",
+              "licensor", "buyer", "seller", "insurer", "insured", "contractor", "claimant", "partner", "partners"],
+    'resume': ["experience", "education", "skills", "resume", "curriculum vitae", "references", "btech",
+               "b tech", "degree", "objective"],
+    'invoice': ["invoice", "receipt", "subtotal", "qty", "quantity", "unit price", "total due", "bill to", "tax",
+                "balance", "paid"],
+    'letter': ["dear", "sincerely", "regards", "love", "hope you", "thank you"],
+    'prose': ["chapter", "recipe", "ingredients", "abstract", "introduction", "conclusion", "figure", "agenda",
+              "attendees", "itinerary", "diagnosis", "week #", "day #", "said", "residents"],
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+_WORDS: Dict[str, int] = {}
+_PHRASES: Dict[Tuple[str, ...], int] = {}
+_PREFIXES: List[Tuple[str, int]] = []
+for _index, _cues in enumerate(CUE_GROUPS.values()):
+    for _cue in _cues:
+        if _cue.endswith('*'):
+            _PREFIXES.append((_cue[:-1], _index))
+        elif ' ' in _cue:
+            _PHRASES[tuple(_cue.split())] = _index
+        else:
+            _WORDS[_cue] = _index
+_PHRASE_STARTS = {phrase[0] for phrase in _PHRASES}
+_PHRASE_LENGTHS = sorted({len(phrase) for phrase in _PHRASES}, reverse=True)
+
+
+@lru_cache(maxsize=65536)
+def _word_group(word: str) -> int:
+    """Cue group of a single word, or -1."""
+    group = _WORDS.get(word)
+    if group is not None:
+        return group
+    for prefix, group in _PREFIXES:
+        if word.startswith(prefix):
+            return group
+    return -1
+
+
+def extract_features(text: str) -> np.ndarray:
+    """Cue-group counts (log-scaled) for a text, from one pass over its words."""
+    counts = [0] * len(CUE_GROUPS)
+    tokens = ['#' if token.isdigit() else token for token in _WORD.findall(text.lower())]
+    i, n = 0, len(tokens)
+    while i < n:
+        token = tokens[i]
+        if token in _PHRASE_STARTS:
+            for length in _PHRASE_LENGTHS:
+                group = _PHRASES.get(tuple(tokens[i:i + length]))
+                if group is not None:
+                    counts[group] += 1
+                    i += length
+                    break
+            else:
+                group = None
+            if group is not None:
+                continue
+        group = _word_group(token)
+        if group >= 0:
+            counts[group] += 1
+        i += 1
+    return np.log1p(np.array(counts, dtype=np.float64))
+
+
+class DocumentTypeClassifier:
+    """Logistic regression over cue-group features, with an ambiguous band left undecided."""
+
+    def __init__(self, weights: np.ndarray, bias: float, legal_threshold: float = 0.9,
+                 not_legal_threshold: float = 0.05, max_chars: int = 3000):
+        """
+        Args:
+            weights, bias: Model parameters (see train())
+            legal_threshold: Probability at or above which a text is LEGAL (final)
+            not_legal_threshold: Probability at or below which a text is NOT_LEGAL
+                (a hint; callers confirm it with the model)
+            max_chars: Leading characters of the text that are scored
+        """
+        self.weights = weights
+        self.bias = bias
+        self.legal_threshold = legal_threshold
+        self.not_legal_threshold = not_legal_threshold
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self.decisions = {LEGAL: 0, NOT_LEGAL: 0, 'ambiguous': 0}
+
+    @staticmethod
+    def train(examples: Sequence[Dict[str, str]], l2: float = 0.01, learning_rate: float = 0.5,
+              iterations: int = 2000) -> Tuple[np.ndarray, float]:
+        """
+        Fit logistic regression by gradient descent.
+
+        Args:
+            examples: dicts with 'text' and 'label' (LEGAL or NOT_LEGAL)
+
+        Returns:
+            (weights, bias)
+        """
+        features = np.stack([extract_features(example['text']) for example in examples])
+        labels = np.array([example['label'] == LEGAL for example in examples], dtype=np.float64)
+        weights = np.zeros(features.shape[1])
+        bias = 0.0
+        for _ in range(iterations):
+            predictions = 1 / (1 + np.exp(-(features @ weights + bias)))
+            error = predictions - labels
+            weights -= learning_rate * (features.T @ error / len(labels) + l2 * weights)
+            bias -= learning_rate * float(error.mean())
+        return weights, bias
+
+    @classmethod
+    def from_examples(cls, path: Optional[str] = None, **kwargs) -> 'DocumentTypeClassifier':
+        """Train on a JSON list of {"text", "label"} examples (default: the bundled set)."""
+        weights, bias = cls.train(load_examples(path))
+        return cls(weights, bias, **kwargs)
+
+    @classmethod
+    def from_env(cls) -> Optional['DocumentTypeClassifier']:
+        """
+        Build the classifier from environment variables, or return None when disabled.
+
+        DOCUMENT_CLASSIFIER_ENABLED: 'false' always asks the model (default on)
+        DOCUMENT_CLASSIFIER_LEGAL_THRESHOLD / DOCUMENT_CLASSIFIER_NOT_LEGAL_THRESHOLD:
+            bounds of the ambiguous band (default 0.9 / 0.05)
+        """
+        if os.getenv('DOCUMENT_CLASSIFIER_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls.from_examples(
+            legal_threshold=float(os.getenv('DOCUMENT_CLASSIFIER_LEGAL_THRESHOLD', '0.9')),
+            not_legal_threshold=float(os.getenv('DOCUMENT_CLASSIFIER_NOT_LEGAL_THRESHOLD', '0.05'))
+        )
+
+    def probability(self, text: str) -> float:
+        """Probability that the text is a legal document."""
+        score = float(extract_features(text[:self.max_chars]) @ self.weights + self.bias)
+        return 1 / (1 + np.exp(-score))
+
+    def classify(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Returns:
+            (LEGAL, NOT_LEGAL or None when ambiguous, probability of LEGAL)
+        """
+        probability = self.probability(text)
+        if probability >= self.legal_threshold:
+            label = LEGAL
+        elif probability <= self.not_legal_threshold:
+            label = NOT_LEGAL
+        else:
+            label = None
+        with self._lock:
+            self.decisions[label or 'ambiguous'] += 1
+        return label, probability
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.decisions)
+
+
+def load_examples(path: Optional[str] = None) -> List[Dict[str, str]]:
+    """Labelled examples as a list of {"text", "label"} dicts (default: the bundled set)."""
+    with open(path or DEFAULT_EXAMPLES_PATH, encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,142 @@
+"""
+In-memory document sessions.
+
+/analyze keeps the extracted text and analysis of a document under a random id
+so follow-up requests (/qa, /explain-jargon, /assess-risks) can refer to it
+instead of resending the whole text. Sessions live in process memory only,
+expire after a TTL and are evicted least recently used first when the store is
+full. Nothing is written to disk.
+
+A session's size counts its text, its analysis (as JSON) and, once built, its
+Q&A index, so DOCUMENT_SESSION_MAX_MB bounds what the sessions really hold.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class DocumentSessionStore:
+    """Thread-safe LRU of document sessions, bounded by count, total size and age."""
+
+    def __init__(self, max_documents: int = 100, max_bytes: int = 50 * 1024 * 1024, ttl_seconds: float = 1800):
+        """
+        Args:
+            max_documents: Sessions kept at most
+            max_bytes: Upper bound on the total size of stored sessions (text, analysis, Q&A index)
+            ttl_seconds: Idle time after which a session expires
+        """
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sessions: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['DocumentSessionStore']:
+        """
+        Build a store from environment variables, or return None when sessions are disabled.
+
+        DOCUMENT_SESSION_MAX: sessions kept at most (default 100, 0 disables sessions)
+        DOCUMENT_SESSION_MAX_MB: total session size bound in megabytes (default 50)
+        DOCUMENT_SESSION_TTL_SECONDS: idle lifetime of a session (default 1800)
+        """
+        max_documents = int(os.getenv('DOCUMENT_SESSION_MAX', '100'))
+        if max_documents <= 0:
+            return None
+        return cls(
+            max_documents=max_documents,
+            max_bytes=int(float(os.getenv('DOCUMENT_SESSION_MAX_MB', '50')) * 1024 * 1024),
+            ttl_seconds=float(os.getenv('DOCUMENT_SESSION_TTL_SECONDS', '1800'))
+        )
+
+    @staticmethod
+    def _size(session: Dict[str, Any]) -> int:
+        """Approximate bytes held by a session: text, analysis as JSON and the Q&A index."""
+        size = len(session['text'].encode('utf-8'))
+        if session.get('analysis') is not None:
+            size += len(json.dumps(session['analysis'], default=str).encode('utf-8'))
+        index = session.get('qa_index')
+        if index is not None:
+            size += index.approximate_size() if hasattr(index, 'approximate_size') else len(str(index))
+        return size
+
+    def create(self, text: str, filename: Optional[str] = None, analysis: Any = None) -> str:
+        """Store a document and return its session id."""
+        now = time.time()
+        session = {
+            'id': uuid.uuid4().hex,
+            'filename': filename,
+            'text': text,
+            'analysis': analysis,
+            'created': now,
+            'accessed': now
+        }
+        session['size'] = self._size(session)
+        with self._lock:
+            self._sessions[session['id']] = session
+            self._bytes += session['size']
+            self._evict(now)
+        return session['id']
+
+    def get(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Return a session (refreshing its idle timer), or None if unknown or expired."""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(document_id)
+            if session is None:
+                return None
+            if now - session['accessed'] > self.ttl_seconds:
+                self._remove(document_id)
+                return None
+            session['accessed'] = now
+            self._sessions.move_to_end(document_id)
+            return session
+
+    def update(self, document_id: str, **fields):
+        """Set fields (e.g. analysis or qa_index) on an existing session; its size is recounted."""
+        with self._lock:
+            session = self._sessions.get(document_id)
+            if session is None:
+                return
+            session.update(fields)
+            size = self._size(session)
+            self._bytes += size - session['size']
+            session['size'] = size
+            # The grown session is the newest, so it is kept; older ones make room
+            self._sessions.move_to_end(document_id)
+            self._evict(time.time())
+
+    def delete(self, document_id: str) -> bool:
+        """Forget a session; returns whether it existed."""
+        with self._lock:
+            return self._remove(document_id) is not None
+
+    def _remove(self, document_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.pop(document_id, None)
+        if session is not None:
+            self._bytes -= session['size']
+        return session
+
+    def _evict(self, now: float):
+        """Drop expired sessions, then the least recently used until within bounds."""
+        for document_id in [document_id for document_id, session in self._sessions.items()
+                            if now - session['accessed'] > self.ttl_seconds]:
+            self._remove(document_id)
+        # The newest session is always kept, even if it alone exceeds max_bytes
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_documents or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._sessions)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'documents': len(self._sessions),
+                'max_documents': self.max_documents,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
@@ -0,0 +1,264 @@
+"""
+Streaming text extraction from Word (.docx) documents.
+
+A .docx file is a ZIP of XML parts. The main document, headers and footers are
+read with ElementTree.iterparse straight from the compressed stream, and each
+top-level paragraph or table is discarded as soon as its text has been taken,
+so memory stays flat however long the document is (python-docx builds the
+whole element tree first). Paragraphs, tables (one row per line, cells
+separated by " | "), text boxes and content controls are covered.
+
+Embedded images are decoded and checked for text-like structure first; only
+those that look like they carry text (scanned clauses, signature blocks with
+typed names) are passed to OCR. Logos, photos and rules are skipped.
+"""
+
+import io
+import posixpath
+import zipfile
+from typing import Callable, Dict, List, Optional, Union
+from xml.etree import ElementTree
+
+import cv2
+import numpy as np
+
+_REL_TYPE_HEADER = '/header'
+_REL_TYPE_FOOTER = '/footer'
+
+# Elements whose direct children are blocks that can be discarded once read
+_CONTAINERS = {'body', 'hdr', 'ftr'}
+
+# Images smaller than this (in pixels, either side) are icons or rules, never OCR'd
+MIN_IMAGE_SIDE = 32
+
+
+def _local(tag: str) -> str:
+    """Tag or attribute name without its namespace (main and strict OOXML namespaces alike)."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _relationship_id(elem: ElementTree.Element, name: str) -> Optional[str]:
+    for key, value in elem.attrib.items():
+        if _local(key) == name and key.startswith('{'):
+            return value
+    return None
+
+
+def image_has_text(image: np.ndarray, min_lines: int = 3) -> bool:
+    """
+    Cheap check for printed text in an image, run before OCR.
+
+    Character strokes give strong local gradients; closing them with a wide
+    horizontal kernel merges each line of text into one long, flat blob. The
+    image is considered to carry text if at least min_lines such blobs are found.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    scale = 1000 / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    height = gray.shape[0]
+    text_lines = 0
+    for contour in contours:
+        _, _, w, h = cv2.boundingRect(contour)
+        # A line of text: wider than tall, glyph-sized height, mostly filled by strokes
+        if w > 2.5 * h and 6 <= h <= 0.2 * height and cv2.contourArea(contour) > 0.4 * w * h:
+            text_lines += 1
+            if text_lines >= min_lines:
+                return True
+    return False
+
+
+class _PartReader:
+    """Streams the text of one XML part (document, header or footer) into a list of lines."""
+
+    def __init__(self, archive: zipfile.ZipFile, part: str, image_text: Callable[[str, str], Optional[str]],
+                 stats: Dict[str, int]):
+        self.archive = archive
+        self.part = part
+        self.image_text = image_text
+        self.stats = stats
+        self.lines: List[str] = []
+        self.paragraphs: List[List[str]] = []
+        self.cells: List[List[str]] = []
+        self.rows: List[List[str]] = []
+        self.tables: List[List[str]] = []
+        self.rels = _read_relationships(archive, part)
+
+    def _emit(self, text: str):
+        if not text.strip():
+            return
+        if self.cells:
+            self.cells[-1].append(text)
+        else:
+            self.lines.append(text)
+
+    def read(self) -> List[str]:
+        stack: List[ElementTree.Element] = []
+        # Inside mc:Fallback (the legacy copy of a text box or drawing); its text was already read
+        fallback_depth = 0
+        with self.archive.open(self.part) as stream:
+            for event, elem in ElementTree.iterparse(stream, events=('start', 'end')):
+                name = _local(elem.tag)
+                if event == 'start':
+                    stack.append(elem)
+                    if name == 'Fallback':
+                        fallback_depth += 1
+                    elif fallback_depth:
+                        pass
+                    elif name == 'p':
+                        self.paragraphs.append([])
+                    elif name == 'tc':
+                        self.cells.append([])
+                    elif name == 'tr':
+                        self.rows.append([])
+                    elif name == 'tbl':
+                        self.tables.append([])
+                    continue
+
+                stack.pop()
+                parent = _local(stack[-1].tag) if stack else None
+                if name == 'Fallback':
+                    fallback_depth -= 1
+                elif fallback_depth:
+                    pass
+                elif name == 't':
+                    if self.paragraphs:
+                        self.paragraphs[-1].append(elem.text or '')
+                elif name == 'tab' and parent == 'r':
+                    if self.paragraphs:
+                        self.paragraphs[-1].append('\t')
+                elif name in ('br', 'cr') and parent == 'r':
+                    if self.paragraphs:
+                        self.paragraphs[-1].append('\n')
+                elif name == 'p':
+                    self.stats['paragraphs'] += 1
+                    self._emit(''.join(self.paragraphs.pop()))
+                elif name == 'tc':
+                    cell = ' '.join(self.cells.pop())
+                    if self.rows:
+                        self.rows[-1].append(cell)
+                elif name == 'tr':
+                    row = self.rows.pop()
+                    if self.tables and any(cell.strip() for cell in row):
+                        self.tables[-1].append(' | '.join(row))
+                elif name == 'tbl':
+                    self.stats['tables'] += 1
+                    self._emit('\n'.join(self.tables.pop()))
+                elif name in ('blip', 'imagedata'):
+                    rel_id = _relationship_id(elem, 'embed' if name == 'blip' else 'id')
+                    target = self.rels.get(rel_id)
+                    if target is not None:
+                        text = self.image_text(target, self.part)
+                        if text:
+                            self._emit(text)
+
+                # Blocks that have been read are dropped, so the tree never grows
+                if parent in _CONTAINERS:
+                    stack[-1].clear()
+        return self.lines
+
+
+def _rels_path(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, '_rels', f'{name}.rels')
+
+
+def _read_relationships(archive: zipfile.ZipFile, part: str, rel_type: Optional[str] = None) -> Dict[str, str]:
+    """Relationship id -> target part name for a part, optionally only of one type (e.g. '/header')."""
+    try:
+        with archive.open(_rels_path(part)) as stream:
+            root = ElementTree.parse(stream).getroot()
+    except KeyError:
+        return {}
+    directory = posixpath.dirname(part)
+    rels = {}
+    for rel in root:
+        if rel.get('TargetMode') == 'External':
+            continue
+        if rel_type is not None and not rel.get('Type', '').endswith(rel_type):
+            continue
+        rels[rel.get('Id')] = posixpath.normpath(posixpath.join(directory, rel.get('Target', '')))
+    return rels
+
+
+def _main_document_part(archive: zipfile.ZipFile) -> str:
+    """Name of the main document part, from the package relationships (usually word/document.xml)."""
+    with archive.open('_rels/.rels') as stream:
+        for rel in ElementTree.parse(stream).getroot():
+            if rel.get('Type', '').endswith('/officeDocument'):
+                return rel.get('Target').lstrip('/')
+    raise ValueError("Not a Word document: no main document part")
+
+
+def extract_docx(source: Union[str, bytes], ocr: Optional[Callable[[np.ndarray], str]] = None,
+                 max_ocr_images: int = 20) -> Dict:
+    """
+    Extract the text of a .docx file.
+
+    Args:
+        source: Path to the file, or its content
+        ocr: Called with a decoded BGR image that looks like it carries text and
+            returns its text; None skips images entirely
+        max_ocr_images: Upper bound on images passed to ocr per document
+
+    Returns:
+        Dict with combined_text (headers, body and footers), header_text,
+        footer_text, image_results (one entry per OCR'd image) and stats
+    """
+    stats = {'paragraphs': 0, 'tables': 0, 'headers': 0, 'footers': 0,
+             'images_seen': 0, 'images_ocr': 0, 'images_skipped': 0}
+    image_results = []
+    image_texts: Dict[str, Optional[str]] = {}
+
+    with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as archive:
+
+        def image_text(target: str, part: str) -> Optional[str]:
+            # The same image (e.g. a letterhead logo in every header) is looked at once
+            if target in image_texts:
+                return image_texts[target]
+            stats['images_seen'] += 1
+            image_texts[target] = None
+            if ocr is None or stats['images_ocr'] >= max_ocr_images:
+                stats['images_skipped'] += 1
+                return None
+            try:
+                image = cv2.imdecode(np.frombuffer(archive.read(target), np.uint8), cv2.IMREAD_COLOR)
+            except KeyError:
+                image = None
+            # Vector formats (EMF/WMF) do not decode and are skipped with the rest
+            if image is None or min(image.shape[:2]) < MIN_IMAGE_SIDE or not image_has_text(image):
+                stats['images_skipped'] += 1
+                return None
+            stats['images_ocr'] += 1
+            text = ocr(image).strip()
+            image_results.append({'image': target, 'part': part, 'ocr_text': text})
+            image_texts[target] = text
+            return text
+
+        document = _main_document_part(archive)
+        body = _PartReader(archive, document, image_text, stats).read()
+
+        # Headers and footers usually repeat per section (first, even, default); identical text is kept once
+        sections = {}
+        for kind, rel_type in (('header', _REL_TYPE_HEADER), ('footer', _REL_TYPE_FOOTER)):
+            texts = []
+            for part in dict.fromkeys(_read_relationships(archive, document, rel_type).values()):
+                stats[f'{kind}s'] += 1
+                text = '\n'.join(_PartReader(archive, part, image_text, stats).read())
+                if text and text not in texts:
+                    texts.append(text)
+            sections[kind] = '\n'.join(texts)
+
+    return {
+        'combined_text': '\n'.join(filter(None, [sections['header'], *body, sections['footer']])),
+        'header_text': sections['header'],
+        'footer_text': sections['footer'],
+        'image_results': image_results,
+        'stats': stats
+    }
@@ -0,0 +1,215 @@
+"""
+Execution model for the API: keeps CPU-bound extraction and blocking Gemini
+calls off the asyncio event loop so light endpoints stay responsive.
+
+- Text extraction runs in a process pool (one TextExtractor per worker process).
+  Progress and page callbacks are called in the API process: the worker puts
+  their arguments on a multiprocessing.Manager queue and a relay thread reads
+  them back.
+- Gemini calls run in a thread pool.
+- Each kind of work has its own concurrency limit; excess requests wait on the
+  event loop instead of piling up inside the pools.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Union
+
+from extraction_cache import ExtractionCache
+from text_extractor import TextExtractor, available_cpu_count
+
+# Per-process extractor used by the extraction pool
+_worker_extractor = None
+
+
+def _init_extraction_worker():
+    """Pool initializer: build one TextExtractor (and cache handle) per worker process."""
+    global _worker_extractor
+    _worker_extractor = TextExtractor(cache=ExtractionCache.from_env())
+
+
+def _worker_callbacks(events, kinds: Sequence[str]) -> Dict[str, Callable]:
+    """Callbacks for the worker's extractor that send their arguments to the parent's relay."""
+    callbacks = {}
+    if events is not None and 'progress' in kinds:
+        callbacks['progress_callback'] = lambda done, total: events.put(('progress', (done, total)))
+    if events is not None and 'page' in kinds:
+        callbacks['page_callback'] = lambda page_result: events.put(('page', (page_result,)))
+    return callbacks
+
+
+def _extract_in_worker(file_path: str, output_format: str, events=None, kinds: Sequence[str] = ()
+                       ) -> Union[str, Dict]:
+    """Pool task: extract text from a file with the worker's extractor."""
+    return _worker_extractor.extract_text(file_path, output_format=output_format,
+                                          **_worker_callbacks(events, kinds))
+
+
+def _extract_bytes_in_worker(data: bytes, filename: str, output_format: str, events=None,
+                             kinds: Sequence[str] = ()) -> Union[str, Dict]:
+    """Pool task: extract text from in-memory file content with the worker's extractor."""
+    return _worker_extractor.extract_text_from_bytes(data, filename, output_format=output_format,
+                                                     **_worker_callbacks(events, kinds))
+
+
+def _relay_events(events, progress_callback: Optional[Callable[[int, int], None]],
+                  page_callback: Optional[Callable[[Dict], None]]):
+    """Call the parent's callbacks with what a worker sent, until the None sentinel."""
+    callbacks = {'progress': progress_callback, 'page': page_callback}
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        kind, args = event
+        try:
+            callbacks[kind](*args)
+        except Exception as e:
+            # Keep draining, or the worker's later events would be lost
+            logging.getLogger(__name__).error(f"Extraction {kind} callback failed: {e}")
+
+
+class BackgroundExecutor:
+    """Runs extraction in a process pool and LLM calls in a thread pool, each with a concurrency cap."""
+
+    def __init__(self, extractor: TextExtractor, extraction_workers: int = 0, llm_threads: int = 8,
+                 max_concurrent_extractions: Optional[int] = None,
+                 max_concurrent_llm_calls: Optional[int] = None):
+        """
+        Args:
+            extractor: Extractor used in-process when extraction_workers is 0
+            extraction_workers: Size of the extraction process pool (0 runs extraction
+                in the event loop's default thread pool with the given extractor instead)
+            llm_threads: Size of the thread pool for blocking Gemini calls
+            max_concurrent_extractions: Extractions allowed to run at once
+                (default: one per extraction worker)
+            max_concurrent_llm_calls: LLM calls allowed to run at once (default: llm_threads)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.extractor = extractor
+        self.extraction_workers = extraction_workers
+        self.max_concurrent_extractions = max_concurrent_extractions or max(1, extraction_workers)
+        self.max_concurrent_llm_calls = max_concurrent_llm_calls or llm_threads
+
+        self._extraction_pool = None
+        if extraction_workers > 0:
+            self._extraction_pool = ProcessPoolExecutor(
+                max_workers=extraction_workers,
+                initializer=_init_extraction_worker
+            )
+        self._llm_pool = ThreadPoolExecutor(max_workers=llm_threads, thread_name_prefix='llm')
+        # Started on the first extraction with callbacks
+        self._manager = None
+        self._manager_lock = threading.Lock()
+
+        self._extraction_slots = asyncio.Semaphore(self.max_concurrent_extractions)
+        self._llm_slots = asyncio.Semaphore(self.max_concurrent_llm_calls)
+
+    @classmethod
+    def from_env(cls, extractor: TextExtractor) -> 'BackgroundExecutor':
+        """
+        Build an executor from environment variables.
+
+        EXTRACTION_WORKERS: extraction process pool size (default: available cores, 0 = in-process)
+        LLM_THREADS: Gemini thread pool size (default 8)
+        MAX_CONCURRENT_EXTRACTIONS: concurrent extraction limit (default: EXTRACTION_WORKERS)
+        MAX_CONCURRENT_LLM_CALLS: concurrent Gemini call limit (default: LLM_THREADS)
+        """
+        workers = os.getenv('EXTRACTION_WORKERS')
+        return cls(
+            extractor=extractor,
+            extraction_workers=int(workers) if workers else available_cpu_count(),
+            llm_threads=int(os.getenv('LLM_THREADS', '8')),
+            max_concurrent_extractions=int(os.getenv('MAX_CONCURRENT_EXTRACTIONS', '0')) or None,
+            max_concurrent_llm_calls=int(os.getenv('MAX_CONCURRENT_LLM_CALLS', '0')) or None
+        )
+
+    def _event_queue(self):
+        """A queue pool workers can send callback events through (one per extraction)."""
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager.Queue()
+
+    async def _run_in_pool(self, task: Callable, *args,
+                           progress_callback: Optional[Callable[[int, int], None]] = None,
+                           page_callback: Optional[Callable[[Dict], None]] = None) -> Union[str, Dict]:
+        """Run an extraction task in the process pool, relaying its callbacks to this process."""
+        loop = asyncio.get_running_loop()
+        kinds = tuple(kind for kind, callback in (('progress', progress_callback), ('page', page_callback))
+                      if callback is not None)
+        if not kinds:
+            return await loop.run_in_executor(self._extraction_pool, task, *args)
+
+        events = await loop.run_in_executor(None, self._event_queue)
+        relay = loop.run_in_executor(None, _relay_events, events, progress_callback, page_callback)
+        try:
+            return await loop.run_in_executor(self._extraction_pool, functools.partial(task, *args, events, kinds))
+        finally:
+            # The worker's events were all queued before it returned, so the relay sees them first
+            events.put(None)
+            await relay
+
+    async def extract_text(self, file_path: str, output_format: str = 'text',
+                           progress_callback: Optional[Callable[[int, int], None]] = None,
+                           page_callback: Optional[Callable[[Dict], None]] = None) -> Union[str, Dict]:
+        """
+        Extract text from a file without blocking the event loop.
+
+        Callbacks are invoked on a thread of this process (not the event loop),
+        also when the extraction runs in the process pool.
+        """
+        loop = asyncio.get_running_loop()
+        async with self._extraction_slots:
+            if self._extraction_pool is not None:
+                return await self._run_in_pool(_extract_in_worker, file_path, output_format,
+                                               progress_callback=progress_callback, page_callback=page_callback)
+            return await loop.run_in_executor(
+                None,
+                functools.partial(self.extractor.extract_text, file_path, output_format=output_format,
+                                  progress_callback=progress_callback, page_callback=page_callback)
+            )
+
+    async def extract_bytes(self, data: bytes, filename: str, output_format: str = 'text',
+                            progress_callback: Optional[Callable[[int, int], None]] = None,
+                            page_callback: Optional[Callable[[Dict], None]] = None) -> Union[str, Dict]:
+        """Like extract_text, for file content held in memory."""
+        loop = asyncio.get_running_loop()
+        async with self._extraction_slots:
+            if self._extraction_pool is not None:
+                return await self._run_in_pool(_extract_bytes_in_worker, data, filename, output_format,
+                                               progress_callback=progress_callback, page_callback=page_callback)
+            return await loop.run_in_executor(
+                None,
+                functools.partial(self.extractor.extract_text_from_bytes, data, filename, output_format=output_format,
+                                  progress_callback=progress_callback, page_callback=page_callback)
+            )
+
+    async def call_llm(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking LLM-backed call (e.g. a LegalDocumentAnalyzer method) in the thread pool."""
+        loop = asyncio.get_running_loop()
+        async with self._llm_slots:
+            return await loop.run_in_executor(self._llm_pool, functools.partial(func, *args, **kwargs))
+
+    async def stream_llm(self, iterator: Iterator[Any]) -> AsyncIterator[Any]:
+        """Consume a blocking iterator (e.g. a streamed Gemini response) in the thread pool, item by item."""
+        loop = asyncio.get_running_loop()
+        finished = object()
+        async with self._llm_slots:
+            while True:
+                item = await loop.run_in_executor(self._llm_pool, next, iterator, finished)
+                if item is finished:
+                    return
+                yield item
+
+    def shutdown(self):
+        """Stop both pools, waiting for running work to finish."""
+        if self._extraction_pool is not None:
+            self._extraction_pool.shutdown(wait=True, cancel_futures=True)
+        self._llm_pool.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
@@ -0,0 +1,164 @@
+"""
+Content-addressed cache for text extraction results.
+Opt-in only: nothing is written to disk unless EXTRACTION_CACHE_ENABLED is set,
+and only extracted text is kept (never the uploaded file), bounded by size and age.
+The store is generic: ResponseCache keeps Gemini responses in one of its own,
+in a separate table (which may share the file), with its own TTL and size bound.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_TABLE_NAME = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file's content without loading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    Disk-backed (SQLite) store of extraction results keyed by content hash.
+
+    Entries expire after ttl_seconds. When the stored results exceed max_bytes,
+    the least recently used entries are evicted first. Size, expiry, eviction,
+    clear() and stats() only ever concern the store's own table.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024, ttl_seconds: float = 3600,
+                 table: str = 'extraction_cache'):
+        """
+        Args:
+            path: SQLite database file for the cache
+            max_bytes: Upper bound on the total size of stored results
+            ttl_seconds: Age after which an entry is no longer served
+            table: Table holding the entries, so several stores can share a file
+
+        Raises:
+            ValueError: if table is not a plain lower-case identifier
+        """
+        if not _TABLE_NAME.match(table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed)")
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['ExtractionCache']:
+        """
+        Build a cache from environment variables, or return None when caching is disabled.
+
+        EXTRACTION_CACHE_ENABLED: 'true' to enable (default off)
+        EXTRACTION_CACHE_PATH: SQLite file (default .cache/extraction_cache.sqlite3)
+        EXTRACTION_CACHE_MAX_MB: size bound in megabytes (default 100)
+        EXTRACTION_CACHE_TTL_SECONDS: entry lifetime (default 3600)
+        """
+        if os.getenv('EXTRACTION_CACHE_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        return cls(
+            path=os.getenv('EXTRACTION_CACHE_PATH', os.path.join('.cache', 'extraction_cache.sqlite3')),
+            max_bytes=int(float(os.getenv('EXTRACTION_CACHE_MAX_MB', '100')) * 1024 * 1024),
+            ttl_seconds=float(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', '3600'))
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached results for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, results: Dict[str, Any]):
+        """Store results under key, then evict expired and least recently used entries."""
+        value = json.dumps(results, ensure_ascii=False)
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            self.logger.info(f"Entry too large to cache in {self.table} ({size} bytes)")
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used ones until under max_bytes."""
+        self._conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl_seconds,))
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed").fetchall()
+        evict = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evict.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evict)
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, stored bytes and hit/miss counters."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,304 @@
+"""
+Resilient access to the Gemini API.
+
+ResilientModel wraps a GenerativeModel (or any object with a compatible
+generate_content) and is what LegalDocumentAnalyzer calls. Every request:
+
+- waits for a token from a rate limiter: a SQLite file shared by every
+  process that opens it (server workers, the batch CLI), or one bucket per
+  process,
+- holds one of a fixed number of slots while it is awaited, which caps
+  concurrent requests,
+- is abandoned after a per-attempt deadline; its slot is released at once,
+  and the call finishes on a spare thread (counted under abandoned_in_flight),
+- is retried with exponential backoff and full jitter on quota errors (429),
+  server errors, connection errors and timeouts.
+
+The google-generativeai client keeps one channel per process. It is created
+once, up front, so concurrent first calls do not each open their own.
+GEMINI_API_ENDPOINT points that client at another server, e.g. the fake one
+in benchmarks/fake_gemini_server.py.
+"""
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Union
+
+from google.api_core import exceptions as google_exceptions
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.DeadlineExceeded,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class GeminiTimeoutError(TimeoutError):
+    """A Gemini request did not complete within its deadline."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class SharedTokenBucket:
+    """
+    Token bucket kept in a SQLite file, so all processes that open the same file
+    draw from one budget (TokenBucket gives each process a budget of its own).
+    Same interface as TokenBucket.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float, name: str = 'gemini'):
+        """
+        Args:
+            path: SQLite file shared by the processes
+            rate, capacity: As for TokenBucket
+            name: Bucket in the file, so one file can hold several
+        """
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _take(self) -> float:
+        """Take a token if one is available. Returns 0, or the seconds until one will be."""
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so no other process refills in between
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Wall-clock time: monotonic clocks are not comparable across processes
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated FROM token_buckets WHERE name = ?",
+                                         (self.name,)).fetchone()
+                tokens = self.capacity if row is None else min(
+                    self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+                delay = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    delay = (1 - tokens) / self.rate
+                self._conn.execute("INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                                   (self.name, tokens, now))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return delay
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResilientModel:
+    """Drop-in wrapper for a Gemini model adding deadlines, retries, rate limiting and a concurrency cap."""
+
+    def __init__(self, model, timeout_seconds: float = 60.0, max_retries: int = 3,
+                 backoff_base_seconds: float = 1.0, backoff_max_seconds: float = 20.0,
+                 rate_limiter: Optional[Union[TokenBucket, SharedTokenBucket]] = None, max_concurrency: int = 8):
+        """
+        Args:
+            model: GenerativeModel or any object with generate_content(prompt, stream=...)
+            timeout_seconds: Deadline per attempt (for streams: until the first chunk)
+            max_retries: Retries after the first attempt for retryable errors
+            backoff_base_seconds, backoff_max_seconds: Retry n sleeps a random time
+                up to min(max, base * 2**n)
+            rate_limiter: Bucket shared by all callers; None means no rate limit
+            max_concurrency: Requests awaited at once. A request abandoned at its
+                deadline gives its slot back straight away and finishes on one of
+                max_concurrency spare threads; when those are all taken too, new
+                requests queue (within their deadline) until one returns.
+        """
+        self.model = model
+        self.model_name = getattr(model, 'model_name', None)
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.rate_limiter = rate_limiter
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=2 * max_concurrency, thread_name_prefix='gemini-request')
+        self._lock = threading.Lock()
+        self.abandoned_in_flight = 0
+        self.counters = {'requests': 0, 'attempts': 0, 'retries': 0, 'timeouts': 0, 'abandoned': 0,
+                         'failures': 0, 'rate_limited': 0, 'rate_limit_wait_seconds': 0.0}
+
+    @classmethod
+    def from_env(cls, model) -> 'ResilientModel':
+        """
+        Wrap a model with settings from environment variables.
+
+        GEMINI_TIMEOUT_SECONDS: deadline per attempt (default 60)
+        GEMINI_MAX_RETRIES: retries for quota, server and timeout errors (default 3)
+        GEMINI_RETRY_BASE_SECONDS / GEMINI_RETRY_MAX_SECONDS: backoff bounds (default 1 / 20)
+        GEMINI_REQUESTS_PER_MINUTE: rate limit (default 0 = unlimited)
+        GEMINI_RATE_BURST: requests allowed back to back before the rate applies (default 5)
+        GEMINI_RATE_LIMIT_PATH: SQLite file holding the rate limit's bucket, shared by
+            every process that uses it (default .cache/gemini_rate_limit.sqlite3);
+            empty gives each process a bucket, and so the full rate, of its own
+        GEMINI_MAX_CONCURRENT_REQUESTS: requests in flight at once (default 8)
+        """
+        requests_per_minute = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '0'))
+        rate_limiter = None
+        if requests_per_minute > 0:
+            rate, burst = requests_per_minute / 60, float(os.getenv('GEMINI_RATE_BURST', '5'))
+            path = os.getenv('GEMINI_RATE_LIMIT_PATH', os.path.join('.cache', 'gemini_rate_limit.sqlite3'))
+            rate_limiter = SharedTokenBucket(path, rate, burst) if path else TokenBucket(rate, burst)
+        return cls(
+            model,
+            timeout_seconds=float(os.getenv('GEMINI_TIMEOUT_SECONDS', '60')),
+            max_retries=int(os.getenv('GEMINI_MAX_RETRIES', '3')),
+            backoff_base_seconds=float(os.getenv('GEMINI_RETRY_BASE_SECONDS', '1')),
+            backoff_max_seconds=float(os.getenv('GEMINI_RETRY_MAX_SECONDS', '20')),
+            rate_limiter=rate_limiter,
+            max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENT_REQUESTS', '8'))
+        )
+
+    def _count(self, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _attempt(self, prompt: Any, stream: bool, kwargs: Dict[str, Any]):
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire()
+            if waited:
+                self._count('rate_limited')
+                self._count('rate_limit_wait_seconds', waited)
+
+        self._count('attempts')
+        deadline = time.monotonic() + self.timeout_seconds
+        if not self._slots.acquire(timeout=self.timeout_seconds):
+            self._count('timeouts')
+            raise GeminiTimeoutError(f"No Gemini request slot within {self.timeout_seconds:g}s")
+        try:
+            future = self._pool.submit(self.model.generate_content, prompt, stream=stream, **kwargs)
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                # A request still queued for a thread is dropped; a running one finishes in the
+                # background, without its slot
+                if not future.cancel():
+                    self._abandon(future)
+                self._count('timeouts')
+                raise GeminiTimeoutError(f"Gemini request timed out after {self.timeout_seconds:g}s") from None
+        finally:
+            self._slots.release()
+
+    def _abandon(self, future):
+        with self._lock:
+            self.counters['abandoned'] += 1
+            self.abandoned_in_flight += 1
+
+        def returned(_):
+            with self._lock:
+                self.abandoned_in_flight -= 1
+
+        future.add_done_callback(returned)
+
+    def generate_content(self, prompt: Any, stream: bool = False, **kwargs):
+        """
+        Same contract as GenerativeModel.generate_content. Streams are retried only
+        until the first chunk arrives; errors later in a stream reach the caller.
+        """
+        self._count('requests')
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(prompt, stream, kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self._count('failures')
+                    raise
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+                logger.warning(f"Gemini request failed ({type(e).__name__}: {e}); "
+                               f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                self._count('retries')
+                attempt += 1
+                time.sleep(delay)
+            except Exception:
+                self._count('failures')
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters, abandoned_in_flight=self.abandoned_in_flight)
+        stats['rate_limit_wait_seconds'] = round(stats['rate_limit_wait_seconds'], 3)
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if isinstance(self.rate_limiter, SharedTokenBucket):
+            self.rate_limiter.close()
+
+
+def configure_gemini(api_key: str):
+    """
+    Configure the google-generativeai client and open its connection once.
+
+    GEMINI_API_ENDPOINT: alternative API host, e.g. http://127.0.0.1:8765 for a fake server
+    GEMINI_TRANSPORT: 'grpc' or 'rest' (default: the library's choice, or 'rest' with an endpoint)
+    """
+    import google.generativeai as genai
+    from google.generativeai import client as genai_client
+
+    endpoint = os.getenv('GEMINI_API_ENDPOINT')
+    transport = os.getenv('GEMINI_TRANSPORT') or ('rest' if endpoint else None)
+    options = {'api_endpoint': endpoint} if endpoint else None
+    genai.configure(api_key=api_key, transport=transport, client_options=options)
+    # Models created afterwards share this client (and its connection) instead of racing to create one
+    genai_client.get_default_generative_client()
@@ -0,0 +1,79 @@
+"""
+Local glossary of common legal terms.
+
+Terms and their aliases are compiled into a word-level trie. A single pass over
+the document's tokens finds every known term (longest match wins), so boilerplate
+jargon such as "indemnify", "force majeure" or "hereinafter" is explained
+without a Gemini round trip; only the remaining terms need the model.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+DEFAULT_GLOSSARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'legal_glossary.json')
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*", re.IGNORECASE)
+_END = object()  # trie key marking the end of a term
+
+
+class LegalGlossary:
+    """Finds known legal terms in a text in one pass over its words."""
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]]):
+        """
+        Args:
+            entries: term -> {"definition": str, "aliases": [str, ...]}
+        """
+        self.entries = entries
+        self._trie: Dict[Any, Any] = {}
+        for term, entry in entries.items():
+            for phrase in [term, *entry.get('aliases', [])]:
+                node = self._trie
+                for word in _WORD.findall(phrase.lower()):
+                    node = node.setdefault(word, {})
+                node[_END] = term
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'LegalGlossary':
+        """Load a glossary JSON file (default: the bundled data/legal_glossary.json, or GLOSSARY_PATH)."""
+        path = path or os.getenv('GLOSSARY_PATH') or DEFAULT_GLOSSARY_PATH
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find_terms(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Known terms occurring in text, in order of first appearance.
+
+        Returns:
+            List of dicts with term, definition, matched (the text as it
+            appears in the document), occurrences and source='local_glossary'
+        """
+        words = [(m.group().lower(), m.start(), m.end()) for m in _WORD.finditer(text)]
+        found: Dict[str, Dict[str, Any]] = {}
+        i = 0
+        while i < len(words):
+            node, match, j = self._trie, None, i
+            while j < len(words) and words[j][0] in node:
+                node = node[words[j][0]]
+                j += 1
+                if _END in node:
+                    match = (node[_END], j)
+            if match is None:
+                i += 1
+                continue
+
+            term, end = match
+            if term in found:
+                found[term]['occurrences'] += 1
+            else:
+                found[term] = {
+                    'term': term,
+                    'definition': self.entries[term]['definition'],
+                    'matched': text[words[i][1]:words[end - 1][2]],
+                    'occurrences': 1,
+                    'source': 'local_glossary'
+                }
+            i = end
+        return list(found.values())
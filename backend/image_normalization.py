@@ -0,0 +1,225 @@
+"""
+Geometric normalisation of page images before OCR.
+
+Phone photos arrive at 12+ megapixels, often with the table around the page
+in view and the text a few degrees off horizontal. ImageNormalizer runs once
+per image, before the preprocessing variants are built:
+
+1. Page bounds: the largest four-cornered contour that covers a good part of
+   the image and is clearly lighter than what surrounds it (a page on a
+   table) is taken as the page and warped to an upright rectangle (which also
+   removes perspective). Flatbed scans, where the page fills the image, are
+   left alone, and so is a bordered form or table on a page: the margin
+   around its border is as light as the inside. Callers skip this step for
+   images that are known to be a whole page (rendered PDF pages).
+2. Resolution: the page is resampled down to target_dpi, assuming its long
+   side is page_inches long (Letter/A4). This is folded into the page warp, so
+   the full-resolution image is resampled only once.
+3. Skew: text lines are merged into blobs with a wide closing; the median
+   angle of their minimum-area rectangles is the skew, which is rotated out.
+
+Page and skew estimation run on a copy at most 1000 px on its long side.
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Long side of the copy used to estimate page bounds and skew
+ANALYSIS_SIDE = 1000
+
+
+def _gray(image: np.ndarray) -> np.ndarray:
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+
+
+def _order_corners(points: np.ndarray) -> np.ndarray:
+    """Corners as top-left, top-right, bottom-right, bottom-left."""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                     points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
+
+
+def find_page_quad(gray: np.ndarray, min_area: float = 0.25, max_area: float = 0.95,
+                   min_contrast: float = 40) -> Optional[np.ndarray]:
+    """
+    Corners of the page in a (small) grayscale image, or None if no page
+    outline covering between min_area and max_area of the image is found.
+    An outline only counts as the page if the median brightness inside it is
+    at least min_contrast above the median outside it, which a box drawn on
+    the page (a form, a table) never is.
+    """
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(edges, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    image_area = gray.shape[0] * gray.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        area = cv2.contourArea(contour)
+        if area < min_area * image_area:
+            break
+        if area > max_area * image_area:
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            mask = np.zeros(gray.shape, np.uint8)
+            cv2.fillConvexPoly(mask, approx.reshape(4, 2), 255)
+            inside, outside = gray[mask > 0], gray[mask == 0]
+            if outside.size and np.median(inside) - np.median(outside) >= min_contrast:
+                return _order_corners(approx)
+    return None
+
+
+def estimate_skew(gray: np.ndarray, min_lines: int = 3, max_degrees: float = 15.0) -> Optional[float]:
+    """
+    Skew of the text in a (small) grayscale image in degrees, counter-clockwise
+    positive, or None if too few text lines are found to tell.
+    """
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    width = max(9, gray.shape[1] // 40)
+    lines = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (width, 3)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    angles, weights = [], []
+    for contour in contours:
+        (_, _), (w, h), angle = cv2.minAreaRect(contour)
+        if w < h:
+            w, h = h, w
+            angle -= 90
+        # Text lines are long and thin; anything else (pictures, rules, noise) is ignored
+        if w < gray.shape[1] * 0.15 or h < 3 or w < 5 * h:
+            continue
+        # minAreaRect angles are clockwise in image coordinates
+        angle = -((angle + 45) % 90 - 45)
+        if abs(angle) <= max_degrees:
+            angles.append(angle)
+            weights.append(w)
+    if len(angles) < min_lines:
+        return None
+
+    order = np.argsort(angles)
+    cumulative = np.cumsum(np.array(weights)[order])
+    return float(np.array(angles)[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+
+
+def rotate(image: np.ndarray, degrees: float) -> np.ndarray:
+    """Rotate counter-clockwise by degrees, growing the canvas so nothing is cut off; new areas are white."""
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), degrees, 1.0)
+    cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+    new_width, new_height = int(height * sin + width * cos), int(height * cos + width * sin)
+    matrix[0, 2] += new_width / 2 - width / 2
+    matrix[1, 2] += new_height / 2 - height / 2
+    white = (255,) * (3 if image.ndim == 3 else 1)
+    return cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=white)
+
+
+class ImageNormalizer:
+    """Crops to the page, resamples to a target DPI and deskews, in that order."""
+
+    def __init__(self, target_dpi: int = 300, page_inches: float = 11.0, crop_page: bool = True,
+                 deskew: bool = True, min_skew_degrees: float = 0.3, min_page_contrast: float = 40):
+        """
+        Args:
+            target_dpi: Effective resolution pages are resampled down to (never up)
+            page_inches: Assumed length of the page's long side, for the DPI estimate
+            crop_page: Detect the page outline and warp it to an upright rectangle
+            deskew: Rotate text lines to horizontal
+            min_skew_degrees: Smaller skew estimates are left alone
+            min_page_contrast: How much lighter (0-255) the page must be than its
+                surroundings to be cropped to (see find_page_quad)
+        """
+        self.target_dpi = target_dpi
+        self.page_inches = page_inches
+        self.crop_page = crop_page
+        self.deskew = deskew
+        self.min_skew_degrees = min_skew_degrees
+        self.min_page_contrast = min_page_contrast
+
+    @classmethod
+    def from_env(cls) -> 'ImageNormalizer':
+        """
+        IMAGE_TARGET_DPI: effective resolution pages are resampled down to (default 300)
+        IMAGE_CROP_PAGE / IMAGE_DESKEW: 'false' turns either step off (default on)
+        """
+        enabled = lambda name: os.getenv(name, 'true').lower() in ('1', 'true', 'yes')
+        return cls(target_dpi=int(os.getenv('IMAGE_TARGET_DPI', '300')),
+                   crop_page=enabled('IMAGE_CROP_PAGE'), deskew=enabled('IMAGE_DESKEW'))
+
+    def settings(self) -> Dict[str, Any]:
+        """Parameters that affect the output, for cache keys."""
+        return {'target_dpi': self.target_dpi, 'page_inches': self.page_inches, 'crop_page': self.crop_page,
+                'deskew': self.deskew, 'min_skew_degrees': self.min_skew_degrees,
+                'min_page_contrast': self.min_page_contrast}
+
+    def normalize(self, image: np.ndarray, crop_page: bool = True) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Args:
+            image: BGR or grayscale image
+            crop_page: False skips the page search for an image that is a whole
+                page already (a rendered PDF page); crop_page=False on the
+                normaliser turns it off for every image
+
+        Returns:
+            (normalised image, report with input/output size, whether the page was
+            cropped, the resampling scale, the skew corrected and the time taken)
+        """
+        start = time.perf_counter()
+        height, width = image.shape[:2]
+        small_scale = min(1.0, ANALYSIS_SIDE / max(height, width))
+        small = _gray(image)
+        if small_scale < 1:
+            small = cv2.resize(small, None, fx=small_scale, fy=small_scale, interpolation=cv2.INTER_AREA)
+
+        # 1 + 2: page warp and resampling in a single pass over the full-resolution image
+        quad = find_page_quad(small, min_contrast=self.min_page_contrast) if self.crop_page and crop_page else None
+        if quad is not None:
+            corners = quad / small_scale
+            page_width = max(np.linalg.norm(corners[1] - corners[0]), np.linalg.norm(corners[2] - corners[3]))
+            page_height = max(np.linalg.norm(corners[3] - corners[0]), np.linalg.norm(corners[2] - corners[1]))
+        else:
+            page_width, page_height = width, height
+        scale = min(1.0, self.target_dpi * self.page_inches / max(page_width, page_height))
+        out_width, out_height = max(1, int(round(page_width * scale))), max(1, int(round(page_height * scale)))
+
+        if quad is not None:
+            target = np.array([[0, 0], [out_width - 1, 0], [out_width - 1, out_height - 1], [0, out_height - 1]],
+                              dtype=np.float32)
+            matrix = cv2.getPerspectiveTransform(corners.astype(np.float32), target)
+            normalized = cv2.warpPerspective(image, matrix, (out_width, out_height), flags=cv2.INTER_AREA
+                                             if scale < 1 else cv2.INTER_LINEAR)
+        elif scale < 1:
+            normalized = cv2.resize(image, (out_width, out_height), interpolation=cv2.INTER_AREA)
+        else:
+            normalized = image
+
+        # 3: skew, measured on the page (a warped page can still have tilted text)
+        skew = None
+        if self.deskew:
+            page_small = _gray(normalized)
+            factor = min(1.0, ANALYSIS_SIDE / max(page_small.shape[:2]))
+            if factor < 1:
+                page_small = cv2.resize(page_small, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+            skew = estimate_skew(page_small)
+            if skew is not None and abs(skew) >= self.min_skew_degrees:
+                # Rotating by the measured angle clockwise levels the text
+                normalized = rotate(normalized, -skew)
+            else:
+                skew = None
+
+        report = {
+            'input_size': [width, height],
+            'output_size': [normalized.shape[1], normalized.shape[0]],
+            'page_cropped': quad is not None,
+            'scale': round(scale, 4),
+            'skew_degrees': round(skew, 2) if skew is not None else 0.0,
+            'seconds': round(time.perf_counter() - start, 4)
+        }
+        return normalized, report
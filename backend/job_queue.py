@@ -0,0 +1,414 @@
+"""
+Background job queue for long-running document analyses.
+
+Jobs are submitted with a payload, picked up by in-process async workers and
+tracked with a status, a progress dict and a result. The queue backend is
+pluggable: InMemoryJobStore keeps everything in the process, SQLiteJobStore
+lets queued and interrupted jobs survive a restart and be shared by several
+server processes. Finished jobs are purged after a retention period.
+
+A running job is leased to the worker that claimed it (worker_id), which
+renews the lease with a heartbeat (heartbeat_at) while the job runs. Only jobs
+whose lease has expired, because their worker died, are returned to the
+queue; jobs of other live workers sharing the store are left alone.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+FINISHED_STATES = (COMPLETED, FAILED)
+
+
+def _new_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        'id': uuid.uuid4().hex,
+        'status': QUEUED,
+        'payload': payload,
+        'progress': {'stage': QUEUED},
+        'result': None,
+        'error': None,
+        'created': now,
+        'updated': now,
+        'worker_id': None,
+        'heartbeat_at': None
+    }
+
+
+class JobStore(ABC):
+    """Queue backend: stores job records and hands queued jobs to workers in FIFO order."""
+
+    @abstractmethod
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a queued job and return its record."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job record, or None if unknown."""
+
+    @abstractmethod
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically mark the oldest queued job as running, leased to worker_id, and return it."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields):
+        """Update status, progress, result or error of a job."""
+
+    @abstractmethod
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Renew a running job's lease; False if the job is no longer running under worker_id."""
+
+    @abstractmethod
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Return a running job leased to worker_id to the queue; False if it no longer holds the lease."""
+
+    @abstractmethod
+    def requeue_expired(self, older_than: float) -> List[Dict[str, Any]]:
+        """Return running jobs whose last heartbeat is before the given timestamp to the queue; returns them."""
+
+    @abstractmethod
+    def purge_finished(self, older_than: float):
+        """Delete finished jobs last updated before the given timestamp."""
+
+    def close(self):
+        """Release backend resources."""
+
+
+class InMemoryJobStore(JobStore):
+    """Job store for a single process; jobs are lost on restart."""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue = deque()
+        self._lock = threading.Lock()
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = _new_job(payload)
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._queue.append(job['id'])
+            return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            while self._queue:
+                job = self._jobs.get(self._queue.popleft())
+                if job is not None and job['status'] == QUEUED:
+                    now = time.time()
+                    job.update(status=RUNNING, updated=now, worker_id=worker_id, heartbeat_at=now)
+                    return dict(job)
+            return None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+                job['updated'] = time.time()
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != RUNNING or job['worker_id'] != worker_id:
+                return False
+            job['heartbeat_at'] = time.time()
+            return True
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] != RUNNING or job['worker_id'] != worker_id:
+                return False
+            job.update(status=QUEUED, updated=time.time(), worker_id=None, heartbeat_at=None)
+            self._queue.append(job_id)
+            return True
+
+    def requeue_expired(self, older_than: float) -> List[Dict[str, Any]]:
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job['status'] == RUNNING and (job['heartbeat_at'] or 0) < older_than]
+            for job in expired:
+                job.update(status=QUEUED, updated=time.time(), worker_id=None, heartbeat_at=None)
+                self._queue.append(job['id'])
+            return [dict(job) for job in expired]
+
+    def purge_finished(self, older_than: float):
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['status'] in FINISHED_STATES and job['updated'] < older_than]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a SQLite file, so queued jobs survive a restart."""
+
+    _COLUMNS = ('id', 'status', 'payload', 'progress', 'result', 'error', 'created', 'updated',
+                'worker_id', 'heartbeat_at')
+    _JSON_COLUMNS = ('payload', 'progress', 'result')
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT, progress TEXT, result TEXT, "
+            "error TEXT, created REAL NOT NULL, updated REAL NOT NULL, worker_id TEXT, heartbeat_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created)")
+
+    def _row_to_job(self, row) -> Dict[str, Any]:
+        job = dict(zip(self._COLUMNS, row))
+        for column in self._JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job = _new_job(payload)
+        values = [json.dumps(job[c]) if c in self._JSON_COLUMNS else job[c] for c in self._COLUMNS]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                values
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row is not None else None
+
+    def claim_next(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock, so other processes cannot claim the same job
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status = ? ORDER BY created LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated = ?, worker_id = ?, heartbeat_at = ? WHERE id = ?",
+                    (RUNNING, now, worker_id, now, row[0])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        job = self._row_to_job(row)
+        job.update(status=RUNNING, updated=now, worker_id=worker_id, heartbeat_at=now)
+        return job
+
+    def update(self, job_id: str, **fields):
+        fields['updated'] = time.time()
+        assignments = ', '.join(f"{column} = ?" for column in fields)
+        values = [json.dumps(v) if c in self._JSON_COLUMNS else v for c, v in fields.items()]
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values, job_id))
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND worker_id = ?",
+                (time.time(), job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated = ?, worker_id = NULL, heartbeat_at = NULL "
+                "WHERE id = ? AND status = ? AND worker_id = ?",
+                (QUEUED, time.time(), job_id, RUNNING, worker_id)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_expired(self, older_than: float) -> List[Dict[str, Any]]:
+        expired = "status = ? AND heartbeat_at < ?"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE {expired}", (RUNNING, older_than)
+                ).fetchall()
+                self._conn.execute(
+                    f"UPDATE jobs SET status = ?, updated = ?, worker_id = NULL, heartbeat_at = NULL WHERE {expired}",
+                    (QUEUED, time.time(), RUNNING, older_than)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [self._row_to_job(row) for row in rows]
+
+    def purge_finished(self, older_than: float):
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))}) AND updated < ?",
+                (*FINISHED_STATES, older_than)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Handler signature: (job, report_progress) -> result
+JobHandler = Callable[[Dict[str, Any], Callable[..., None]], Awaitable[Any]]
+
+
+class JobManager:
+    """Runs queued jobs on a fixed number of asyncio workers."""
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int = 2,
+                 retention_seconds: float = 3600, poll_interval: float = 1.0,
+                 lease_seconds: float = 60, maintenance_interval: float = 60,
+                 worker_id: Optional[str] = None):
+        """
+        Args:
+            store: Queue backend
+            handler: Coroutine that processes a job; it receives the job record and a
+                report_progress(**fields) function, and returns the job result
+            workers: Number of jobs processed concurrently
+            retention_seconds: How long finished jobs (and their results) are kept
+            poll_interval: How often idle workers re-check the store when not woken by submit()
+            lease_seconds: A running job whose heartbeat is older than this is taken to
+                belong to a dead process and is requeued; heartbeats are sent every
+                lease_seconds / 3
+            maintenance_interval: How often expired leases are requeued and finished
+                jobs purged
+            worker_id: Identity of this process in job leases (default host:pid:random)
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.maintenance_interval = maintenance_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.logger = logging.getLogger(__name__)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._last_maintenance = 0.0
+
+    @staticmethod
+    def store_from_env() -> JobStore:
+        """
+        Build the queue backend from JOB_QUEUE_BACKEND ('memory' or 'sqlite')
+        and JOB_QUEUE_PATH (SQLite file, default .cache/jobs.sqlite3).
+        """
+        backend = os.getenv('JOB_QUEUE_BACKEND', 'memory').lower()
+        if backend == 'memory':
+            return InMemoryJobStore()
+        if backend == 'sqlite':
+            return SQLiteJobStore(os.getenv('JOB_QUEUE_PATH', os.path.join('.cache', 'jobs.sqlite3')))
+        raise ValueError(f"Unsupported job queue backend: {backend}")
+
+    async def start(self):
+        """Requeue jobs whose worker died (expired leases) and start the workers."""
+        self._maintain()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; their running jobs go back to the queue (kept across restarts by SQLite)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    def submit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job and wake an idle worker."""
+        job = self.store.submit(payload)
+        self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _maintain(self):
+        """Requeue jobs with expired leases and purge old finished jobs, at most once per maintenance_interval."""
+        now = time.time()
+        if now - self._last_maintenance < self.maintenance_interval:
+            return
+        self._last_maintenance = now
+        for job in self.store.requeue_expired(now - self.lease_seconds):
+            self.logger.info(f"Requeued job {job['id']} after its lease by {job['worker_id']} expired")
+        self.store.purge_finished(now - self.retention_seconds)
+
+    async def _heartbeat(self, job: Dict[str, Any]):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.store.heartbeat(job['id'], self.worker_id):
+                self.logger.warning(f"Lost the lease on job {job['id']}; another worker may run it again")
+                return
+
+    async def _worker(self):
+        while True:
+            self._maintain()
+            job = self.store.claim_next(self.worker_id)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _run(self, job: Dict[str, Any]):
+        progress = dict(job.get('progress') or {})
+
+        def report_progress(**fields):
+            progress.update(fields)
+            self.store.update(job['id'], progress=dict(progress))
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            result = await self.handler(job, report_progress)
+        except asyncio.CancelledError:
+            # Stopped: hand the job back rather than wait for its lease to expire
+            self.store.release(job['id'], self.worker_id)
+            raise
+        except Exception as e:
+            self.logger.error(f"Job {job['id']} failed: {e}")
+            progress['stage'] = FAILED
+            self.store.update(job['id'], status=FAILED, error=str(e), progress=progress)
+            return
+        finally:
+            heartbeat.cancel()
+
+        progress['stage'] = COMPLETED
+        self.store.update(job['id'], status=COMPLETED, result=result, progress=progress)
@@ -5,32 +5,182 @@ Privacy-first approach - no data storage, process and forget
 
 import google.generativeai as genai
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import json
 import tempfile
 from text_extractor import TextExtractor
+from llm_pipeline import ConcurrentAnalysisPipeline, InFlightDeduplicator
+from gemini_client import ResilientModel, configure_gemini
+from response_cache import CachedResponse, ResponseCache, prompt_key
+from retrieval import BM25Index
+from map_reduce import MapReduceAnalysis
+from glossary import LegalGlossary
+from document_classifier import DocumentTypeClassifier
+from pre_extraction import extract_facts, key_parties_prompt_field, merge_facts
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+class JSONSectionStream:
+    """
+    Incremental parser for a streamed JSON object.
+    Feed it text chunks and it returns each top-level (key, value) pair as soon
+    as the value is complete. Text before the opening brace (e.g. a ```json
+    fence) is ignored.
+    """
+    
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None
+        self.done = False
+        self.decoder = json.JSONDecoder()
+    
+    def _skip(self, pos: int, chars: str) -> int:
+        while pos < len(self.buffer) and self.buffer[pos] in chars:
+            pos += 1
+        return pos
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add a chunk of text and return the sections it completed"""
+        self.buffer += chunk
+        sections = []
+        
+        if self.pos is None:
+            start = self.buffer.find("{")
+            if start < 0:
+                return sections
+            self.pos = start + 1
+        
+        while not self.done:
+            pos = self._skip(self.pos, " \t\r\n,")
+            if pos >= len(self.buffer):
+                break
+            if self.buffer[pos] == "}":
+                self.done = True
+                break
+            
+            try:
+                key, pos = self.decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                break
+            pos = self._skip(pos, " \t\r\n")
+            if pos >= len(self.buffer):
+                break
+            if self.buffer[pos] != ":":
+                # Not valid JSON; stop and let the caller fall back to the full text
+                self.done = True
+                break
+            
+            pos = self._skip(pos + 1, " \t\r\n")
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                break
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                    end >= len(self.buffer) or self.buffer[end] not in " \t\r\n,}"):
+                # A number is only complete once a delimiter follows it
+                break
+            
+            sections.append((key, value))
+            self.pos = end
+        
+        return sections
+
+
 class LegalDocumentAnalyzer:
-    def __init__(self, gemini_api_key: str = None):
+    def __init__(self, gemini_api_key: str = None, text_extractor: Optional[TextExtractor] = None, model=None,
+                 response_cache: Optional[ResponseCache] = None):
         """
         Initialize the Legal Document Analyzer with Gemini API
         
         Args:
             gemini_api_key: Optional Google Gemini API key. If not provided, will use GEMINI_API_KEY from environment
+            text_extractor: Optional extractor to share with the caller; a new one is created if not provided
+            model: Optional object with a Gemini-compatible generate_content(); when given, no API key is needed
+            response_cache: Optional cache of Gemini responses keyed by model and prompt
         """
-        # Use provided API key or get from environment
-        api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
-        
-        if not api_key:
-            raise ValueError("Gemini API key is required. Set GEMINI_API_KEY environment variable or provide api_key parameter.")
+        if model is None:
+            # Use provided API key or get from environment
+            api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
+            
+            if not api_key:
+                raise ValueError("Gemini API key is required. Set GEMINI_API_KEY environment variable or provide api_key parameter.")
+            
+            configure_gemini(api_key)
+            model = genai.GenerativeModel('gemini-1.5-flash')  # Updated model name
+        # Deadlines, jittered retries, the shared rate limit and the concurrency cap apply to every request
+        self.model = model if isinstance(model, ResilientModel) else ResilientModel.from_env(model)
+        self.text_extractor = text_extractor or TextExtractor()
+        self.response_cache = response_cache
+        
+        # Regex pre-extraction of dates, amounts and parties (PRE_EXTRACTION_ENABLED=false leaves them to Gemini)
+        self.pre_extraction_enabled = os.getenv('PRE_EXTRACTION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+        
+        # Local LEGAL/NOT_LEGAL pre-screen (DOCUMENT_CLASSIFIER_ENABLED=false always asks Gemini)
+        self.document_classifier = DocumentTypeClassifier.from_env()
+        
+        # Documents longer than one prompt's budget are analyzed with map-reduce
+        self.map_reduce_threshold_chars = int(os.getenv('ANALYSIS_MAP_REDUCE_THRESHOLD_CHARS', '60000'))
+        self.map_reduce = MapReduceAnalysis(
+            self,
+            chunk_chars=int(os.getenv('ANALYSIS_CHUNK_CHARS', '20000')),
+            max_concurrency=int(os.getenv('ANALYSIS_MAX_CONCURRENCY', '4'))
+        )
+        
+        # Common legal terms are explained locally; JARGON_USE_MODEL=false skips Gemini entirely
+        self.glossary = LegalGlossary.load()
+        self.jargon_use_model = os.getenv('JARGON_USE_MODEL', 'true').lower() in ('1', 'true', 'yes')
+        
+        # Q&A on long documents sends only the top-k retrieved clauses
+        self.qa_full_text_max_chars = int(os.getenv('QA_FULL_TEXT_MAX_CHARS', '8000'))
+        self.qa_chunk_chars = int(os.getenv('QA_CHUNK_CHARS', '1200'))
+        self.qa_top_k = int(os.getenv('QA_TOP_K', '5'))
+        
+        # Identical prompts in flight at the same time share one Gemini call
+        self.deduplicator = InFlightDeduplicator()
+        self.pipeline = ConcurrentAnalysisPipeline(
+            self,
+            max_workers=int(os.getenv('LLM_PIPELINE_WORKERS', '8')),
+            speculative=os.getenv('LLM_SPECULATIVE_ANALYSIS', 'true').lower() in ('1', 'true', 'yes')
+        )
+    
+    def _generate(self, prompt: str, stream: bool = False):
+        """
+        Send a prompt to Gemini. Every model call goes through here.
+        Answers are served from the response cache when one is configured.
+        Non-streaming calls are deduplicated against identical prompts already
+        in flight.
+        """
+        model_name = getattr(self.model, 'model_name', None)
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = prompt_key(model_name, prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return iter([CachedResponse(cached)]) if stream else CachedResponse(cached)
+        
+        if stream:
+            chunks = self.model.generate_content(prompt, stream=True)
+            return self._cache_stream(cache_key, chunks) if cache_key else chunks
+        
+        def call():
+            response = self.model.generate_content(prompt)
+            if cache_key is None:
+                return response
+            # Reading .text raises for blocked responses, which are not cached
+            self.response_cache.put(cache_key, response.text)
+            return CachedResponse(response.text)
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')  # Updated model name
-        self.text_extractor = TextExtractor()
+        return self.deduplicator.run((model_name, prompt), call)
+    
+    def _cache_stream(self, cache_key: str, chunks) -> Iterator[Any]:
+        """Pass stream chunks through and cache the full text once the stream completes"""
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk.text)
+            yield chunk
+        self.response_cache.put(cache_key, "".join(parts))
         
     def extract_text_from_document(self, file_path: str) -> str:
         """
@@ -49,10 +199,15 @@ class LegalDocumentAnalyzer:
         except Exception as e:
             return f"Error extracting text: {str(e)}"
     
-    def detect_document_type(self, document_text: str) -> str:
+    def detect_document_type(self, document_text: str, use_local: bool = True) -> str:
         """
         Quickly detect if this is a legal document or not
         """
+        # Confidently legal documents are classified locally; a local NOT_LEGAL is only
+        # a hint (the pre-screen reads English cue words), so Gemini confirms it
+        if use_local and self.classify_document_locally(document_text) == "LEGAL":
+            return "LEGAL"
+        
         try:
             prompt = f"""
             Is the following text a legal document that requires legal analysis? 
@@ -63,11 +218,21 @@ class LegalDocumentAnalyzer:
             Respond with only: "LEGAL" or "NOT_LEGAL"
             """
             
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             return response.text.strip().upper()
         except:
             return "LEGAL"  # Default to legal if unsure
     
+    def classify_document_locally(self, document_text: str) -> Optional[str]:
+        """
+        LEGAL or NOT_LEGAL from the local pre-screen, or None if it is disabled or unsure.
+        Only LEGAL is final; NOT_LEGAL means the model is expected to say so too.
+        """
+        if self.document_classifier is None:
+            return None
+        label, _ = self.document_classifier.classify(document_text)
+        return label
+    
     def simplify_legal_document(self, document_text: str, user_language: str = "English") -> Dict[str, Any]:
         """
         Simplify legal document using Gemini AI with enhanced structured analysis
@@ -80,7 +245,67 @@ class LegalDocumentAnalyzer:
             Dictionary containing simplified analysis
         """
         
-        # Check if text extraction was poor
+        # Poor extraction or non-legal documents are answered without the full analysis
+        precheck = self._precheck_analysis(document_text)
+        if precheck is not None:
+            return precheck
+        
+        return self._run_analysis_prompt(document_text, user_language)
+    
+    def _run_analysis_prompt(self, document_text: str, user_language: str) -> Dict[str, Any]:
+        """
+        Send the structured analysis prompt and parse the JSON answer, without the prechecks.
+        Documents over the single-prompt budget are analyzed section by section instead.
+        """
+        # Dates, amounts and defined parties are found locally and merged into the result
+        facts = extract_facts(document_text) if self.pre_extraction_enabled else None
+        
+        if len(document_text) > self.map_reduce_threshold_chars:
+            analysis = self.map_reduce.run(document_text, user_language, facts)
+            return merge_facts(analysis, facts) if facts and "error" not in analysis else analysis
+        
+        prompt = self._build_analysis_prompt(document_text, user_language, facts)
+        
+        try:
+            response = self._generate(prompt)
+            
+            # Try to parse as JSON, if fails return structured text
+            try:
+                analysis = json.loads(response.text)
+                if facts and isinstance(analysis, dict) and "error" not in analysis:
+                    merge_facts(analysis, facts)
+                return analysis
+            except json.JSONDecodeError:
+                return {
+                    "analysis": response.text,
+                    "note": "Analysis provided in text format due to formatting issues"
+                }
+                
+        except Exception as e:
+            return {
+                "error": f"Failed to analyze document: {str(e)}",
+                "fallback_advice": "Please consult with a qualified legal professional for accurate legal advice."
+            }
+    
+    def _precheck_analysis(self, document_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an error result if the text is too poor to analyze or is not a
+        legal document, otherwise None
+        """
+        quality_error = self._check_extraction_quality(document_text)
+        if quality_error is not None:
+            return quality_error
+        
+        # Check if this is actually a legal document
+        if self.detect_document_type(document_text) == "NOT_LEGAL":
+            return self._not_legal_result()
+        
+        return None
+    
+    def _check_extraction_quality(self, document_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an error result if the text extraction was too poor to analyze, otherwise None
+        """
         if len(document_text.strip()) < 20 or "No readable text" in document_text or "extraction quality is poor" in document_text.lower():
             return {
                 "error": "Poor text extraction quality",
@@ -93,15 +318,22 @@ class LegalDocumentAnalyzer:
                     "Use a PDF format if available instead of an image"
                 ]
             }
-        
-        # Check if this is actually a legal document
-        doc_type = self.detect_document_type(document_text)
-        if doc_type == "NOT_LEGAL":
-            return {
-                "error": "Not a legal document",
-                "message": "This appears to be a non-legal document (like a resume, invoice, personal letter, etc.) that does not require legal analysis.",
-                "document_type": "Non-legal document"
-            }
+        return None
+    
+    def _not_legal_result(self) -> Dict[str, Any]:
+        return {
+            "error": "Not a legal document",
+            "message": "This appears to be a non-legal document (like a resume, invoice, personal letter, etc.) that does not require legal analysis.",
+            "document_type": "Non-legal document"
+        }
+    
+    def _build_analysis_prompt(self, document_text: str, user_language: str,
+                               facts: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the structured JSON analysis prompt used by simplify_legal_document.
+        Fields that pre-extraction (facts) clearly covers are left out of the requested JSON.
+        """
+        key_parties_field = key_parties_prompt_field(facts, "List of main parties involved")
         
         prompt = f"""
         You are a legal expert AI assistant helping people understand complex legal documents. 
@@ -122,8 +354,7 @@ class LegalDocumentAnalyzer:
         
         If this IS a legal document, analyze it and respond in {user_language} language with the following JSON format:
         {{
-            "document_type": "Type of legal document (e.g., Rental Agreement, Loan Contract, Terms of Service)",
-            "key_parties": ["List of main parties involved"],
+            "document_type": "Type of legal document (e.g., Rental Agreement, Loan Contract, Terms of Service)",{key_parties_field}
             "main_purpose": "Brief explanation of what this document is for",
             "complete_gist": "A comprehensive 2-3 paragraph summary explaining the entire document in simple terms",
             "key_terms_simplified": [
@@ -207,26 +438,79 @@ class LegalDocumentAnalyzer:
         - Be helpful and protective of the user's interests
         - Provide structured, actionable information
         """
+        return prompt
+    
+    def stream_legal_analysis(self, document_text: str, user_language: str = "English") -> Iterator[Tuple[str, Any]]:
+        """
+        Streaming variant of simplify_legal_document
         
-        try:
-            response = self.model.generate_content(prompt)
+        Args:
+            document_text: The extracted text from legal document
+            user_language: Preferred language for explanation
             
-            # Try to parse as JSON, if fails return structured text
+        Yields:
+            (section, value) pairs as each top-level section of the JSON analysis
+            arrives from Gemini. Collecting them into a dict gives the same result
+            as simplify_legal_document, including its error and text fallbacks.
+        """
+        precheck = self._precheck_analysis(document_text)
+        if precheck is not None:
+            yield from precheck.items()
+            return
+        
+        if len(document_text) > self.map_reduce_threshold_chars:
+            # Sections are analyzed concurrently; the merged result arrives at once
+            yield from self._run_analysis_prompt(document_text, user_language).items()
+            return
+        
+        facts = extract_facts(document_text) if self.pre_extraction_enabled else None
+        prompt = self._build_analysis_prompt(document_text, user_language, facts)
+        parser = JSONSectionStream()
+        full_text = ""
+        collected = {}
+        
+        try:
+            for chunk in self._generate(prompt, stream=True):
+                full_text += chunk.text
+                for key, value in parser.feed(chunk.text):
+                    collected[key] = value
+                    yield key, value
+        except Exception as e:
+            if not collected:
+                yield "error", f"Failed to analyze document: {str(e)}"
+                yield "fallback_advice", "Please consult with a qualified legal professional for accurate legal advice."
+            return
+        
+        if not collected:
+            # Not a JSON object we could follow; fall back like simplify_legal_document
             try:
-                return json.loads(response.text)
+                parsed = json.loads(full_text)
             except json.JSONDecodeError:
-                return {
-                    "analysis": response.text,
-                    "note": "Analysis provided in text format due to formatting issues"
-                }
-                
-        except Exception as e:
-            return {
-                "error": f"Failed to analyze document: {str(e)}",
-                "fallback_advice": "Please consult with a qualified legal professional for accurate legal advice."
-            }
+                parsed = None
+            if not isinstance(parsed, dict):
+                yield "analysis", full_text
+                yield "note", "Analysis provided in text format due to formatting issues"
+                return
+            collected = parsed
+            yield from collected.items()
+        
+        if facts and "error" not in collected:
+            # Sections filled or extended by pre-extraction follow the model's sections
+            before = {key: list(value) if isinstance(value, list) else value for key, value in collected.items()}
+            merge_facts(collected, facts)
+            for key, value in collected.items():
+                if key not in before or before[key] != value:
+                    yield key, value
+    
+    def build_qa_index(self, document_text: str) -> BM25Index:
+        """
+        Build the retrieval index used by ask_question_about_document; callers
+        asking several questions about one document can build it once and reuse it
+        """
+        return BM25Index.from_text(document_text, self.qa_chunk_chars)
     
-    def ask_question_about_document(self, document_text: str, question: str, user_language: str = "English") -> str:
+    def ask_question_about_document(self, document_text: str, question: str, user_language: str = "English",
+                                    index: Optional[BM25Index] = None) -> str:
         """
         Answer specific questions about the legal document
         
@@ -234,17 +518,27 @@ class LegalDocumentAnalyzer:
             document_text: The extracted text from legal document
             question: User's specific question
             user_language: Preferred language for response
+            index: Optional prebuilt index from build_qa_index
             
         Returns:
             Answer to the user's question
         """
         
+        # Short documents are sent whole; long ones only with the clauses relevant to the question
+        if len(document_text) <= self.qa_full_text_max_chars:
+            document_section = f"""Document Text:
+        {document_text}"""
+        else:
+            index = index or self.build_qa_index(document_text)
+            excerpts = "\n\n[...]\n\n".join(index.retrieve(question, self.qa_top_k))
+            document_section = f"""Relevant excerpts from the document (other parts omitted):
+        {excerpts}"""
+        
         prompt = f"""
         You are a legal expert helping someone understand their legal document. 
         Answer their question in simple, clear terms in {user_language}.
         
-        Document Text:
-        {document_text}
+        {document_section}
         
         User's Question: {question}
         
@@ -258,7 +552,7 @@ class LegalDocumentAnalyzer:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             return response.text
         except Exception as e:
             return f"I'm sorry, I couldn't process your question due to: {str(e)}. Please consult with a qualified legal professional."
@@ -281,7 +575,7 @@ class LegalDocumentAnalyzer:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             return response.text.strip()
         except Exception as e:
             return "Unknown"
@@ -306,7 +600,7 @@ class LegalDocumentAnalyzer:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             return response.text
         except Exception as e:
             return f"Translation failed: {str(e)}"
@@ -501,7 +795,8 @@ class LegalDocumentAnalyzer:
         """
         Main document analysis method for API compatibility
         """
-        analysis = self.simplify_legal_document(document_text)
+        # Classification and analysis run concurrently; same result as simplify_legal_document
+        analysis = self.pipeline.run(document_text, detect_language=False)['analysis']
         if "error" in analysis:
             return analysis.get("message", "Error analyzing document")
         
@@ -511,10 +806,47 @@ class LegalDocumentAnalyzer:
         """
         Extract and explain legal jargon from the document
         """
+        return self.format_jargon_explanation(self.explain_jargon_detailed(document_text))
+    
+    def format_jargon_explanation(self, result: Dict[str, Any]) -> str:
+        """
+        Render explain_jargon_detailed output as "TERM: explanation" text,
+        marking the definitions that came from the local glossary
+        """
+        lines = [f"{entry['term'].upper()}: {entry['definition']} [local glossary]" for entry in result['local_definitions']]
+        if result['model_explanation']:
+            lines.append(result['model_explanation'])
+        return "\n".join(lines)
+    
+    def explain_jargon_detailed(self, document_text: str) -> Dict[str, Any]:
+        """
+        Explain legal jargon, answering known terms from the local glossary and
+        asking Gemini only for the rest
+        
+        Args:
+            document_text: The extracted text from legal document
+            
+        Returns:
+            Dict with local_definitions (terms found in the glossary, each marked
+            source='local_glossary') and model_explanation (Gemini's text for
+            other terms, None when the model was not asked)
+        """
+        local_definitions = self.glossary.find_terms(document_text) if self.glossary is not None else []
+        result = {"local_definitions": local_definitions, "model_explanation": None}
+        if not self.jargon_use_model:
+            return result
+        
+        known_terms = ""
+        if local_definitions:
+            known_terms = f"""
+        These terms are already explained; do not include them:
+        {", ".join(entry['matched'] for entry in local_definitions)}
+        """
+        
         prompt = f"""
         Analyze the following legal document text and identify all legal jargon, technical terms, and complex phrases.
         For each term, provide a simple explanation in everyday language.
-        
+        {known_terms}
         Document Text:
         {document_text}
         
@@ -525,10 +857,11 @@ class LegalDocumentAnalyzer:
         """
         
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            response = self._generate(prompt)
+            result["model_explanation"] = response.text
         except Exception as e:
-            return f"Error explaining jargon: {str(e)}"
+            result["model_explanation"] = f"Error explaining jargon: {str(e)}"
+        return result
     
     def assess_risks(self, document_text: str) -> str:
         """
@@ -556,16 +889,16 @@ class LegalDocumentAnalyzer:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             return response.text
         except Exception as e:
             return f"Error assessing risks: {str(e)}"
     
-    def answer_question(self, question: str, document_text: str) -> str:
+    def answer_question(self, question: str, document_text: str, index: Optional[BM25Index] = None) -> str:
         """
         Answer specific questions about the document
         """
-        return self.ask_question_about_document(document_text, question)
+        return self.ask_question_about_document(document_text, question, index=index)
 
     def process_document_complete(self, file_path: str, user_language: str = "English") -> Dict[str, Any]:
         """
@@ -587,19 +920,21 @@ class LegalDocumentAnalyzer:
         if "Error extracting text" in extracted_text:
             return {"error": extracted_text}
         
-        # Step 2: Detect language
-        print("🌐 Detecting document language...")
-        detected_language = self.detect_language(extracted_text)
+        # Steps 2-4: Detect language, translate if needed (for better analysis), check the
+        # document type and analyze it. Independent Gemini calls run concurrently.
+        stage_messages = {
+            "detecting_language": "🌐 Detecting document language...",
+            "translating": "🔄 Translating to English for analysis...",
+            "analyzing": "🧠 Analyzing document with AI..."
+        }
         
-        # Step 3: Translate if needed (for better analysis)
-        analysis_text = extracted_text
-        if detected_language.lower() != "english" and user_language.lower() == "english":
-            print(f"🔄 Translating from {detected_language} to English for analysis...")
-            analysis_text = self.translate_document(extracted_text, "English")
+        def print_stage(stage: str):
+            if stage in stage_messages:
+                print(stage_messages[stage])
         
-        # Step 4: Analyze document
-        print("🧠 Analyzing document with AI...")
-        analysis = self.simplify_legal_document(analysis_text, user_language)
+        outcome = self.pipeline.run(extracted_text, user_language, on_stage=print_stage)
+        detected_language = outcome['detected_language']
+        analysis = outcome['analysis']
         
         # Handle non-legal documents
         if "error" in analysis and analysis.get("error") == "Not a legal document":
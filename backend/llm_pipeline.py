@@ -0,0 +1,182 @@
+"""
+Concurrent orchestration of the Gemini calls behind a document analysis.
+
+The analysis needs up to four round trips: language detection, an optional
+translation, the legal/non-legal classifier and the main analysis prompt.
+Only the translation has to wait for anything, so the pipeline runs language
+detection and classification side by side and starts the main analysis
+speculatively while the classifier is still in flight. Identical prompts that
+are in flight at the same time share one model call (see InFlightDeduplicator).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class InFlightDeduplicator:
+    """
+    Single-flight execution: while a call for a key is running, other callers
+    with the same key wait for and share its result instead of repeating it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+                self.calls += 1
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {'calls': self.calls, 'deduplicated': self.deduplicated, 'in_flight': len(self._inflight)}
+
+
+class ConcurrentAnalysisPipeline:
+    """Runs the Gemini calls of one document analysis concurrently on a thread pool."""
+
+    def __init__(self, analyzer, max_workers: int = 4, speculative: bool = True):
+        """
+        Args:
+            analyzer: LegalDocumentAnalyzer whose calls are orchestrated
+            max_workers: Threads available for concurrent Gemini calls
+            speculative: Start the main analysis before the classifier has answered.
+                Saves a round trip on legal documents, at the cost of a wasted call
+                on non-legal ones.
+        """
+        self.analyzer = analyzer
+        self.speculative = speculative
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemini')
+
+    def run(self, document_text: str, user_language: str = "English", detect_language: bool = True,
+            on_stage: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze extracted text.
+
+        Args:
+            document_text: The extracted text from legal document
+            user_language: Preferred language for the analysis
+            detect_language: Detect the document language (and translate to English
+                for analysis when the user wants English)
+            on_stage: Called with the name of each stage as it starts
+
+        Returns:
+            Dict with detected_language (None if not detected), analysis_text
+            (the text that was analyzed), analysis (same shape as
+            simplify_legal_document) and per-stage timings in seconds
+        """
+        analyzer = self.analyzer
+        timings = {}
+        start = time.perf_counter()
+
+        def stage(name: str):
+            if on_stage is not None:
+                on_stage(name)
+
+        def timed(name: str, func: Callable, *args) -> Callable[[], Any]:
+            def call():
+                call_start = time.perf_counter()
+                try:
+                    return func(*args)
+                finally:
+                    timings[name] = round(time.perf_counter() - call_start, 4)
+            return call
+
+        language_future = None
+        if detect_language:
+            stage("detecting_language")
+            language_future = self._pool.submit(timed("detect_language", analyzer.detect_language, document_text))
+
+        # Poor extraction is detected locally; no point asking the model
+        quality_error = analyzer._check_extraction_quality(document_text)
+        if quality_error is not None:
+            detected_language = language_future.result() if language_future else None
+            return self._outcome(detected_language, document_text, quality_error, timings, start)
+
+        stage("classifying")
+        # A confident local LEGAL needs no Gemini call. A local NOT_LEGAL is only a hint
+        # (the cue words are English and the training set is small): Gemini confirms it,
+        # but the analysis is not started speculatively
+        local_type = analyzer.classify_document_locally(document_text)
+        type_future = None
+        if local_type != "LEGAL":
+            type_future = self._pool.submit(
+                timed("detect_document_type", analyzer.detect_document_type, document_text, False)
+            )
+        analysis_future = None
+        if self.speculative and local_type != "NOT_LEGAL":
+            stage("analyzing")
+            analysis_future = self._pool.submit(
+                timed("analysis", analyzer._run_analysis_prompt, document_text, user_language)
+            )
+
+        detected_language = language_future.result() if language_future else None
+        analysis_text = document_text
+        if detected_language and detected_language.lower() != "english" and user_language.lower() == "english":
+            # The speculative analysis used the untranslated text; redo it on the translation
+            stage("translating")
+            if analysis_future is not None:
+                analysis_future.cancel()
+                analysis_future = None
+            analysis_text = timed("translate_document", analyzer.translate_document, document_text, "English")()
+            if type_future is not None:
+                # The pre-screen can read the translation; a confident LEGAL settles the type
+                local_type = analyzer.classify_document_locally(analysis_text)
+                if local_type == "LEGAL":
+                    type_future.cancel()
+                    type_future = None
+            if self.speculative and local_type != "NOT_LEGAL":
+                stage("analyzing")
+                analysis_future = self._pool.submit(
+                    timed("analysis", analyzer._run_analysis_prompt, analysis_text, user_language)
+                )
+
+        if type_future is not None and type_future.result() == "NOT_LEGAL":
+            if analysis_future is not None:
+                analysis_future.cancel()
+            return self._outcome(detected_language, analysis_text, analyzer._not_legal_result(), timings, start)
+
+        if analysis_future is None:
+            stage("analyzing")
+            analysis = timed("analysis", analyzer._run_analysis_prompt, analysis_text, user_language)()
+        else:
+            analysis = analysis_future.result()
+        return self._outcome(detected_language, analysis_text, analysis, timings, start)
+
+    def _outcome(self, detected_language: Optional[str], analysis_text: str, analysis: Dict[str, Any],
+                 timings: Dict[str, float], start: float) -> Dict[str, Any]:
+        timings['total'] = round(time.perf_counter() - start, 4)
+        return {
+            'detected_language': detected_language,
+            'analysis_text': analysis_text,
+            'analysis': analysis,
+            'timings': timings
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
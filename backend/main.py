@@ -1,10 +1,27 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import functools
+import hashlib
+import json
 import os
+import shutil
 import tempfile
+import time
+import uuid
+import zipfile
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 from text_extractor import TextExtractor
+from extraction_cache import ExtractionCache, file_sha256
+from response_cache import ResponseCache
+from document_store import DocumentSessionStore
+from executors import BackgroundExecutor
+import ocr_engines
 from legal_document_analyzer import LegalDocumentAnalyzer
+from job_queue import JobManager
+from request_coalescing import AsyncSingleFlight
+import batch
 
 app = FastAPI(title="LexiLingua API", version="1.0.0")
 
@@ -18,13 +35,251 @@ app.add_middleware(
 )
 
 # Initialize components
-text_extractor = TextExtractor()
-legal_analyzer = LegalDocumentAnalyzer()
+# Extraction cache is opt-in (EXTRACTION_CACHE_ENABLED); None keeps "process and forget"
+extraction_cache = ExtractionCache.from_env()
+text_extractor = TextExtractor(cache=extraction_cache)
+# Gemini response cache is opt-in as well (LLM_CACHE_ENABLED)
+response_cache = ResponseCache.from_env()
+legal_analyzer = LegalDocumentAnalyzer(text_extractor=text_extractor, response_cache=response_cache)
+
+# Extracted text of analyzed documents, kept in memory so follow-up requests can send an id
+document_store = DocumentSessionStore.from_env()
+
+# Concurrent analyses of the same content share one extraction and analysis
+# (ANALYZE_COALESCING=false runs each request on its own)
+analysis_coalescing = (AsyncSingleFlight()
+                       if os.getenv('ANALYZE_COALESCING', 'true').lower() in ('1', 'true', 'yes') else None)
+
+# OCR models load on first use; OCR_PRELOAD loads them now so forked workers share them
+if os.getenv('OCR_PRELOAD', 'false').lower() in ('1', 'true', 'yes'):
+    ocr_engines.preload()
+
+# Extraction runs in a process pool and Gemini calls in a thread pool, off the event loop
+executor = BackgroundExecutor.from_env(text_extractor)
+
+@app.on_event("startup")
+async def startup():
+    await job_manager.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await job_manager.stop()
+    executor.shutdown()
+    legal_analyzer.pipeline.shutdown()
+    legal_analyzer.model.shutdown()
+    text_extractor.close()
+    if extraction_cache is not None:
+        extraction_cache.close()
+    if response_cache is not None:
+        response_cache.close()
 
 @app.get("/")
 async def root():
     return {"message": "LexiLingua API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    """Cache hit/miss counters, in-flight deduplication and coalescing, Gemini retry/rate-limit counts"""
+    return {
+        "extraction_cache": extraction_cache.stats() if extraction_cache is not None else None,
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+        "llm_deduplication": legal_analyzer.deduplicator.stats(),
+        "analysis_coalescing": analysis_coalescing.stats() if analysis_coalescing is not None else None,
+        "gemini_requests": legal_analyzer.model.stats(),
+        "document_sessions": document_store.stats() if document_store is not None else None,
+        "document_classifier": (legal_analyzer.document_classifier.stats()
+                                if legal_analyzer.document_classifier is not None else None)
+    }
+
+ALLOWED_EXTENSIONS = ['.pdf', '.docx', '.jpg', '.jpeg', '.png']
+
+def validate_file_extension(filename: str) -> str:
+    """Return the lower-cased extension of an upload, or raise a 400 if it is not supported"""
+    file_extension = os.path.splitext(filename)[1].lower()
+    
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail="Unsupported file type. Please upload PDF, DOCX, JPG, JPEG, or PNG files."
+        )
+    return file_extension
+
+# Upload limits: the maximum size is enforced while streaming, and uploads up to
+# IN_MEMORY_UPLOAD_MAX_MB (default 0 = never) are extracted from memory without a temp file
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(float(os.getenv('MAX_UPLOAD_MB', '50')) * 1024 * 1024)
+IN_MEMORY_UPLOAD_BYTES = int(float(os.getenv('IN_MEMORY_UPLOAD_MAX_MB', '0')) * 1024 * 1024)
+
+def upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. The maximum upload size is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB."
+    )
+
+async def save_upload(file: UploadFile, destination: str, batch_bytes_left: Optional[int] = None) -> int:
+    """
+    Stream an upload to disk chunk by chunk, enforcing MAX_UPLOAD_BYTES (and, for a
+    file of a batch, what is left of BATCH_MAX_BYTES) as it goes; returns the bytes written
+    """
+    limit = MAX_UPLOAD_BYTES if batch_bytes_left is None else min(MAX_UPLOAD_BYTES, batch_bytes_left)
+    too_large = upload_too_large if limit == MAX_UPLOAD_BYTES else batch_too_large
+    if (getattr(file, 'size', None) or 0) > limit:
+        raise too_large()
+    
+    written = 0
+    try:
+        with open(destination, 'wb') as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > limit:
+                    raise too_large()
+                out.write(chunk)
+    except BaseException:
+        discard_upload(destination)
+        raise
+    return written
+
+async def save_temp_upload(file: UploadFile, suffix: str) -> str:
+    """Stream an upload to a new temporary file and return its path"""
+    fd, tmp_file_path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    await save_upload(file, tmp_file_path)
+    return tmp_file_path
+
+async def read_small_upload(file: UploadFile) -> Optional[bytes]:
+    """Read an upload into memory if it is small enough to skip the temp file, otherwise return None"""
+    size = getattr(file, 'size', None)
+    if size is None or size > min(IN_MEMORY_UPLOAD_BYTES, MAX_UPLOAD_BYTES):
+        return None
+    return await file.read()
+
+def discard_upload(file_path: str):
+    if os.path.exists(file_path):
+        os.unlink(file_path)
+
+async def extract_upload(source: Union[str, bytes], filename: str, **callbacks) -> Dict[str, Any]:
+    """Extract detailed results from a saved upload (path) or an in-memory one (bytes)"""
+    if isinstance(source, bytes):
+        return await executor.extract_bytes(source, filename, output_format='detailed', **callbacks)
+    return await executor.extract_text(source, output_format='detailed', **callbacks)
+
+def create_document_session(text: str, filename: str, analysis: Any) -> Optional[str]:
+    """Keep an analyzed document for follow-up requests; returns its id (None if sessions are disabled)"""
+    if document_store is None:
+        return None
+    return document_store.create(text, filename=filename, analysis=analysis)
+
+def resolve_document_text(text: Optional[str], document_id: Optional[str]) -> str:
+    """Return the text a follow-up request refers to, given inline or as a document id"""
+    if document_id:
+        session = document_store.get(document_id) if document_store is not None else None
+        if session is None:
+            raise HTTPException(status_code=404, detail="Document not found. It may have expired; analyze it again.")
+        return session['text']
+    if not text:
+        raise HTTPException(status_code=400, detail="Provide either document_id or the document text.")
+    return text
+
+async def document_qa_index(document_id: Optional[str], text: str):
+    """
+    Retrieval index of a document session, built on its first question and
+    kept with the session so follow-up questions skip re-tokenising the text
+    """
+    if not document_id or len(text) <= legal_analyzer.qa_full_text_max_chars:
+        return None
+    session = document_store.get(document_id)
+    if session is None:
+        return None
+    if session.get('qa_index') is None:
+        index = await executor.call_llm(legal_analyzer.build_qa_index, text)
+        document_store.update(document_id, qa_index=index)
+        return index
+    return session['qa_index']
+
+async def upload_hash(source: Union[str, bytes]) -> str:
+    """SHA-256 of an upload's content, hashed off the event loop when it is a file"""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    return await asyncio.get_running_loop().run_in_executor(None, file_sha256, source)
+
+def claim_upload(file_path: str) -> str:
+    """
+    A path of its own to a saved upload: a hard link next to it (a copy if linking
+    fails), deleted by whoever claimed it independently of the original
+    """
+    root, extension = os.path.splitext(file_path)
+    claimed = f"{root}-{uuid.uuid4().hex[:8]}{extension}"
+    try:
+        os.link(file_path, claimed)
+    except OSError:
+        shutil.copyfile(file_path, claimed)
+    return claimed
+
+def start_shared_analysis(source: Union[str, bytes], filename: str,
+                          report_progress: Callable[..., None]) -> asyncio.Task:
+    """
+    Start an analysis that may outlive the request that started it: the request
+    deletes its temp file when it finishes or is cancelled, while coalesced
+    requests still wait, so the analysis works on its own claim of the file
+    """
+    if isinstance(source, bytes):
+        return asyncio.ensure_future(analyze_upload(source, filename, report_progress))
+    # Claimed before returning, so the file cannot be gone by the time the task first runs
+    claimed = claim_upload(source)
+    task = asyncio.ensure_future(analyze_upload(claimed, filename, report_progress))
+    task.add_done_callback(lambda _: discard_upload(claimed))
+    return task
+
+async def run_analysis(source: Union[str, bytes], filename: str,
+                       report_progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+    """
+    Extract and analyze an upload (temp file path or in-memory content),
+    returning the /analyze response body.
+    report_progress, if given, receives stage and page progress updates.
+    A request for content that is already being analyzed waits for that
+    analysis instead of starting its own, and receives its progress too.
+    """
+    if analysis_coalescing is None:
+        return await analyze_upload(source, filename, report_progress)
+    
+    key = (await upload_hash(source), os.path.splitext(filename)[1].lower())
+    result = await analysis_coalescing.run(
+        key, lambda report: start_shared_analysis(source, filename, report), on_progress=report_progress
+    )
+    return result if result['filename'] == filename else {**result, "filename": filename}
+
+async def analyze_upload(source: Union[str, bytes], filename: str,
+                         report_progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+    """Extract and analyze one upload; see run_analysis"""
+    on_pages = None
+    if report_progress is not None:
+        report_progress(stage="extracting")
+        on_pages = lambda done, total: report_progress(stage="extracting", pages_done=done, pages_total=total)
+    
+    # Extract text from the document (served from the cache on a repeat upload)
+    extraction = await extract_upload(source, filename, progress_callback=on_pages)
+    extracted_text = extraction['combined_text']
+    
+    if not extracted_text.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Could not extract text from the document. Please ensure the file is readable."
+        )
+    
+    # Analyze the document
+    if report_progress is not None:
+        report_progress(stage="analyzing")
+    analysis_result = await executor.call_llm(legal_analyzer.analyze_document, extracted_text)
+    
+    return {
+        "status": "success",
+        "filename": filename,
+        "analysis": analysis_result,
+        "document_id": create_document_session(extracted_text, filename, analysis_result),
+        "extracted_text_length": len(extracted_text),
+        "extraction_cached": extraction.get('cache_hit', False)
+    }
+
 @app.post("/analyze")
 async def analyze_document(file: UploadFile = File(...)):
     """
@@ -32,72 +287,359 @@ async def analyze_document(file: UploadFile = File(...)):
     """
     try:
         # Validate file type
-        allowed_extensions = ['.pdf', '.docx', '.jpg', '.jpeg', '.png']
-        file_extension = os.path.splitext(file.filename)[1].lower()
+        file_extension = validate_file_extension(file.filename)
         
-        if file_extension not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, 
-                detail="Unsupported file type. Please upload PDF, DOCX, JPG, JPEG, or PNG files."
-            )
+        # Small uploads can be analyzed straight from memory
+        content = await read_small_upload(file)
+        if content is not None:
+            return JSONResponse(content=await run_analysis(content, file.filename))
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # Stream uploaded file to a temporary file
+        tmp_file_path = await save_temp_upload(file, file_extension)
         
         try:
-            # Extract text from the document
-            extracted_text = text_extractor.extract_text(tmp_file_path)
-            
-            if not extracted_text.strip():
-                raise HTTPException(
-                    status_code=400,
-                    detail="Could not extract text from the document. Please ensure the file is readable."
-                )
-            
-            # Analyze the document
-            analysis_result = legal_analyzer.analyze_document(extracted_text)
-            
-            return JSONResponse(content={
-                "status": "success",
-                "filename": file.filename,
-                "analysis": analysis_result,
-                "extracted_text_length": len(extracted_text)
-            })
+            return JSONResponse(content=await run_analysis(tmp_file_path, file.filename))
             
         finally:
             # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
+            discard_upload(tmp_file_path)
                 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_analysis_events(source: Union[str, bytes], filename: str, user_language: str) -> AsyncIterator[str]:
+    """
+    Run the extract / detect language / translate / analyze / report pipeline,
+    yielding SSE events as each result becomes available. Deletes a saved upload when done.
+    """
+    loop = asyncio.get_running_loop()
+    pages = asyncio.Queue()
+    
+    def on_page(page_result: Dict[str, Any]):
+        # Called on the extraction thread
+        loop.call_soon_threadsafe(pages.put_nowait, page_result)
+    
+    extraction_task = None
+    try:
+        yield sse_event("stage", {"stage": "extracting"})
+        extraction_task = asyncio.create_task(extract_upload(source, filename, page_callback=on_page))
+        extraction_task.add_done_callback(lambda _: pages.put_nowait(None))
+        
+        # PDF pages arrive in the order they finish
+        pages_sent = 0
+        while (page_result := await pages.get()) is not None:
+            pages_sent += 1
+            yield sse_event("page", {
+                "page_number": page_result['page_number'],
+                "text": page_result['ocr_text'] or page_result['direct_text']
+            })
+        
+        extraction = await extraction_task
+        extracted_text = extraction['combined_text']
+        if not pages_sent:
+            yield sse_event("page", {"page_number": 1, "text": extracted_text})
+        
+        if not extracted_text.strip():
+            yield sse_event("error", {"detail": "Could not extract text from the document. Please ensure the file is readable."})
+            return
+        yield sse_event("extracted", {
+            "extracted_text_length": len(extracted_text),
+            "extraction_cached": extraction.get('cache_hit', False)
+        })
+        
+        yield sse_event("stage", {"stage": "detecting_language"})
+        detected_language = await executor.call_llm(legal_analyzer.detect_language, extracted_text)
+        yield sse_event("language", {"detected_language": detected_language})
+        
+        # Translate if needed (for better analysis)
+        analysis_text = extracted_text
+        if detected_language.lower() != "english" and user_language.lower() == "english":
+            yield sse_event("stage", {"stage": "translating"})
+            analysis_text = await executor.call_llm(legal_analyzer.translate_document, extracted_text, "English")
+        
+        yield sse_event("stage", {"stage": "analyzing"})
+        analysis = {}
+        async for section, value in executor.stream_llm(legal_analyzer.stream_legal_analysis(analysis_text, user_language)):
+            analysis[section] = value
+            yield sse_event("section", {"section": section, "value": value})
+        
+        summary_report = legal_analyzer.generate_summary_report(analysis, user_language)
+        yield sse_event("report", {"summary_report": summary_report})
+        yield sse_event("done", {
+            "filename": filename,
+            "document_id": create_document_session(extracted_text, filename, summary_report)
+        })
+        
+    except Exception as e:
+        yield sse_event("error", {"detail": f"An error occurred: {str(e)}"})
+    finally:
+        if extraction_task is not None:
+            # If the client went away mid-extraction, stop it; the upload is deleted once it has finished
+            extraction_task.cancel()
+            extraction_task.add_done_callback(lambda task: finish_extraction(task, source))
+        elif isinstance(source, str):
+            discard_upload(source)
+
+def finish_extraction(task: asyncio.Task, source: Union[str, bytes]):
+    """Done-callback of a streamed extraction: retrieve its outcome, then delete the upload"""
+    if not task.cancelled():
+        # A client that went away never reads the result; retrieving an error keeps asyncio from reporting it
+        task.exception()
+    if isinstance(source, str):
+        discard_upload(source)
+
+@app.post("/analyze/stream")
+async def analyze_document_stream(file: UploadFile = File(...), user_language: str = "English"):
+    """
+    Analyze a legal document, streaming progress as Server-Sent Events:
+    page, language, section (one per analysis JSON section), report, done or error
+    """
+    file_extension = validate_file_extension(file.filename)
+    
+    try:
+        source = await read_small_upload(file)
+        if source is None:
+            source = await save_temp_upload(file, file_extension)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    
+    return StreamingResponse(
+        stream_analysis_events(source, file.filename, user_language),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Batch uploads: documents per request (ZIP entries included), their total size
+# (uploaded files and uncompressed ZIP content) and how many are analyzed at once
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '200'))
+BATCH_MAX_BYTES = int(float(os.getenv('BATCH_MAX_MB', '200')) * 1024 * 1024)
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+
+def batch_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Batch too large. The maximum total size is {BATCH_MAX_BYTES // (1024 * 1024)} MB per request."
+    )
+
+async def save_batch_uploads(files: List[UploadFile], directory: str) -> List[Tuple[str, str]]:
+    """
+    Save a batch's uploads into directory, expanding ZIP archives; returns (name, path) per document.
+    Neither the bytes received (archives as uploaded) nor the documents on disk (archives
+    unpacked) may exceed BATCH_MAX_BYTES, on top of MAX_UPLOAD_BYTES per uploaded file
+    """
+    documents = []
+    received = 0
+    stored = 0
+    for file in files:
+        extension = os.path.splitext(file.filename)[1].lower()
+        if extension != '.zip':
+            validate_file_extension(file.filename)
+        path = os.path.join(directory, f"upload-{uuid.uuid4().hex}{extension}")
+        size = await save_upload(file, path, batch_bytes_left=BATCH_MAX_BYTES - received)
+        received += size
+        if extension != '.zip':
+            documents.append((file.filename, path))
+            stored += size
+            continue
+        try:
+            unpacked = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(batch.unpack_zip, path, directory, extensions=ALLOWED_EXTENSIONS,
+                                        max_files=BATCH_MAX_FILES - len(documents), max_bytes=BATCH_MAX_BYTES,
+                                        prefix=f"{file.filename}/", used_bytes=stored)
+            )
+            documents.extend(unpacked)
+            stored += sum(os.path.getsize(document_path) for _, document_path in unpacked)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid ZIP archive.")
+        except ValueError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        finally:
+            discard_upload(path)
+    if len(documents) > BATCH_MAX_FILES:
+        raise HTTPException(status_code=413, detail=f"Too many documents: at most {BATCH_MAX_FILES} per batch")
+    if not documents:
+        raise HTTPException(status_code=400, detail="No supported documents in the upload.")
+    return documents
+
+async def analyze_batch_document(name: str, path: str) -> Dict[str, Any]:
+    """Extract and analyze one document of a batch into its JSON line record"""
+    start = time.time()
+    sha256 = await upload_hash(path)
+    try:
+        extraction = await extract_upload(path, name)
+        text = extraction['combined_text']
+        outcome = await executor.call_llm(batch.analyze_text, legal_analyzer, text)
+    except Exception as e:
+        return batch.failure_record(name, sha256, e, time.time() - start)
+    document_id = create_document_session(text, name, outcome['analysis']) if outcome['status'] == batch.SUCCESS else None
+    return batch.make_record(name, sha256, outcome, len(text), time.time() - start, document_id=document_id)
+
+async def stream_batch_records(documents: List[Tuple[str, str]], directory: str) -> AsyncIterator[str]:
+    """Analyze a batch's documents concurrently, yielding one JSON line per document as each finishes"""
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run(name: str, path: str) -> Dict[str, Any]:
+        async with slots:
+            return await analyze_batch_document(name, path)
+    
+    tasks = [asyncio.create_task(run(name, path)) for name, path in documents]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield json.dumps(await finished, ensure_ascii=False) + "\n"
+    finally:
+        # Also reached when the client disconnects: stop the remaining work and delete the uploads
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+@app.post("/analyze/batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    Analyze several documents, uploaded together and/or as ZIP archives.
+    Streams JSON lines (application/x-ndjson), one per document in the order they finish:
+    file, sha256, status (success, rejected or failed), analysis, details, error and document_id
+    """
+    directory = tempfile.mkdtemp(prefix='lexilingua-batch-')
+    try:
+        documents = await save_batch_uploads(files, directory)
+    except HTTPException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    except Exception as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    
+    return StreamingResponse(stream_batch_records(documents, directory), media_type="application/x-ndjson")
+
+async def process_job(job: Dict[str, Any], report_progress: Callable[..., None]) -> Dict[str, Any]:
+    """Job handler: run the /analyze pipeline on a queued upload, then delete the upload"""
+    file_path = job['payload']['file_path']
+    try:
+        result = await run_analysis(file_path, job['payload']['filename'], report_progress)
+    except asyncio.CancelledError:
+        # Interrupted by shutdown: keep the upload so the job can be requeued
+        raise
+    except HTTPException as e:
+        discard_upload(file_path)
+        raise RuntimeError(e.detail)
+    except Exception:
+        discard_upload(file_path)
+        raise
+    discard_upload(file_path)
+    return result
+
+# Background jobs for documents that take longer than a proxy timeout
+JOB_UPLOAD_DIR = os.getenv('JOB_UPLOAD_DIR', os.path.join(tempfile.gettempdir(), 'lexilingua-jobs'))
+os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+job_manager = JobManager(
+    JobManager.store_from_env(),
+    process_job,
+    workers=int(os.getenv('JOB_WORKERS', '2')),
+    retention_seconds=float(os.getenv('JOB_RETENTION_SECONDS', '3600')),
+    lease_seconds=float(os.getenv('JOB_LEASE_SECONDS', '60')),
+    maintenance_interval=float(os.getenv('JOB_MAINTENANCE_SECONDS', '60'))
+)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)):
+    """
+    Queue a document for analysis and return a job id to poll
+    """
+    file_extension = validate_file_extension(file.filename)
+    
+    try:
+        file_path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}{file_extension}")
+        await save_upload(file, file_path)
+        
+        job = job_manager.submit({"file_path": file_path, "filename": file.filename})
+        return {
+            "status": "accepted",
+            "job_id": job['id'],
+            "status_url": f"/jobs/{job['id']}"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Return the status, progress and (once completed) result of a job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found. It may have expired.")
+    
+    return {
+        "job_id": job['id'],
+        "status": job['status'],
+        "progress": job['progress'],
+        "result": job['result'],
+        "error": job['error'],
+        "created": job['created'],
+        "updated": job['updated']
+    }
+
+@app.get("/documents/{document_id}")
+async def get_document(document_id: str):
+    """
+    Return the stored analysis of a document session
+    """
+    session = document_store.get(document_id) if document_store is not None else None
+    if session is None:
+        raise HTTPException(status_code=404, detail="Document not found. It may have expired.")
+    
+    return {
+        "document_id": session['id'],
+        "filename": session['filename'],
+        "analysis": session['analysis'],
+        "extracted_text_length": len(session['text']),
+        "created": session['created']
+    }
+
+@app.delete("/documents/{document_id}")
+async def delete_document(document_id: str):
+    """
+    Forget a document session and its text before it expires
+    """
+    if document_store is None or not document_store.delete(document_id):
+        raise HTTPException(status_code=404, detail="Document not found. It may have expired.")
+    return {"status": "deleted", "document_id": document_id}
+
 @app.post("/explain-jargon")
-async def explain_jargon(text: str):
+async def explain_jargon(text: Optional[str] = None, document_id: Optional[str] = None):
     """
-    Explain legal jargon in the provided text
+    Explain legal jargon in the provided text, or in a previously analyzed document
     """
+    text = resolve_document_text(text, document_id)
     try:
-        jargon_explanation = legal_analyzer.explain_jargon(text)
+        result = await executor.call_llm(legal_analyzer.explain_jargon_detailed, text)
         return JSONResponse(content={
             "status": "success",
-            "jargon_explanation": jargon_explanation
+            "jargon_explanation": legal_analyzer.format_jargon_explanation(result),
+            "local_definitions": result['local_definitions']
         })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 @app.post("/assess-risks")
-async def assess_risks(text: str):
+async def assess_risks(text: Optional[str] = None, document_id: Optional[str] = None):
     """
-    Assess risks in the legal document
+    Assess risks in the legal document (given as text or as a document id)
     """
+    text = resolve_document_text(text, document_id)
     try:
-        risk_assessment = legal_analyzer.assess_risks(text)
+        risk_assessment = await executor.call_llm(legal_analyzer.assess_risks, text)
         return JSONResponse(content={
             "status": "success",
             "risk_assessment": risk_assessment
@@ -106,12 +648,14 @@ async def assess_risks(text: str):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 @app.post("/qa")
-async def document_qa(question: str, document_text: str):
+async def document_qa(question: str, document_text: Optional[str] = None, document_id: Optional[str] = None):
     """
-    Answer questions about the document using AI
+    Answer questions about the document (given as text or as a document id) using AI
     """
+    document_text = resolve_document_text(document_text, document_id)
     try:
-        answer = legal_analyzer.answer_question(question, document_text)
+        index = await document_qa_index(document_id, document_text)
+        answer = await executor.call_llm(legal_analyzer.answer_question, question, document_text, index)
         return JSONResponse(content={
             "status": "success",
             "question": question,
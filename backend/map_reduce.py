@@ -0,0 +1,250 @@
+"""
+Map-reduce analysis for documents too long for a single analysis prompt.
+
+The text is split into clause-aware sections. Each section is analysed
+concurrently into partial key terms, jargon, risks and obligations (map);
+the partial results are merged and deduplicated locally, and one short
+overview prompt over the per-section summaries fills in the document-level
+fields (reduce). The result has the same schema as simplify_legal_document.
+"""
+
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from pre_extraction import key_parties_prompt_field
+from retrieval import split_into_chunks
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ('high_risk_items', 'medium_risk_items', 'low_risk_items')
+LIST_FIELDS = ('key_parties', 'important_dates', 'red_flags', 'exit_clauses')
+RIGHTS_FIELDS = ('your_rights', 'your_responsibilities', 'other_party_rights', 'other_party_responsibilities')
+IMPORTANCE_RANK = {'high': 0, 'medium': 1, 'low': 2}
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Parse the JSON object in a model answer, tolerating code fences or prose around it."""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    try:
+        value = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def _norm(value: Any) -> str:
+    """Comparison key for deduplication: lowercase words only."""
+    return _NON_WORD.sub(' ', str(value).lower()).strip()
+
+
+def _dedupe(items: List[Any], key) -> List[Any]:
+    seen, unique = set(), []
+    for item in items:
+        k = key(item)
+        if k and k not in seen:
+            seen.add(k)
+            unique.append(item)
+    return unique
+
+
+def _dicts(value: Any) -> List[Dict[str, Any]]:
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _strings(value: Any) -> List[Any]:
+    return [item for item in value if item] if isinstance(value, list) else []
+
+
+def merge_partial_analyses(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-section analyses into one, deduplicating repeated terms, risks and
+    list entries. A risk reported at several levels is kept at the highest one.
+    """
+    merged: Dict[str, Any] = {field: [] for field in LIST_FIELDS}
+    key_terms, jargons, points, obligations = [], [], [], []
+    risks = {level: [] for level in RISK_LEVELS}
+    rights = {field: [] for field in RIGHTS_FIELDS}
+
+    for partial in partials:
+        key_terms.extend(_dicts(partial.get('key_terms_simplified')))
+        jargons.extend(_dicts(partial.get('legal_jargons')))
+        points.extend(_dicts(partial.get('important_points')))
+        obligations.extend(_dicts(partial.get('financial_obligations')))
+        for field in LIST_FIELDS:
+            merged[field].extend(_strings(partial.get(field)))
+        partial_risks = partial.get('risk_assessment') or {}
+        if isinstance(partial_risks, dict):
+            for level in RISK_LEVELS:
+                risks[level].extend(_dicts(partial_risks.get(level)))
+        partial_rights = partial.get('rights_and_responsibilities') or {}
+        if isinstance(partial_rights, dict):
+            for field in RIGHTS_FIELDS:
+                rights[field].extend(_strings(partial_rights.get(field)))
+
+    # Most important key terms first, so the first copy of a duplicate is the one kept
+    key_terms.sort(key=lambda term: IMPORTANCE_RANK.get(str(term.get('importance_level', '')).lower(), 3))
+    merged['key_terms_simplified'] = _dedupe(
+        key_terms, lambda term: _norm(term.get('original_clause') or term.get('simplified_explanation', ''))
+    )
+    merged['legal_jargons'] = _dedupe(jargons, lambda jargon: _norm(jargon.get('term', '')))
+    merged['important_points'] = _dedupe(points, lambda point: _norm(point.get('point', '')))
+    merged['financial_obligations'] = _dedupe(
+        obligations, lambda obligation: _norm(f"{obligation.get('description', '')} {obligation.get('amount', '')}")
+    )
+    for field in LIST_FIELDS:
+        merged[field] = _dedupe(merged[field], _norm)
+
+    seen_risks = set()
+    merged['risk_assessment'] = {}
+    for level in RISK_LEVELS:
+        merged['risk_assessment'][level] = _dedupe(
+            [risk for risk in risks[level] if _norm(risk.get('risk', '')) not in seen_risks],
+            lambda risk: _norm(risk.get('risk', ''))
+        )
+        seen_risks.update(_norm(risk.get('risk', '')) for risk in merged['risk_assessment'][level])
+
+    merged['rights_and_responsibilities'] = {field: _dedupe(rights[field], _norm) for field in RIGHTS_FIELDS}
+    return merged
+
+
+class MapReduceAnalysis:
+    """Analyses long documents section by section with a bounded number of concurrent Gemini calls."""
+
+    def __init__(self, analyzer, chunk_chars: int = 20000, max_concurrency: int = 4):
+        """
+        Args:
+            analyzer: LegalDocumentAnalyzer whose model is used
+            chunk_chars: Target section size in characters
+            max_concurrency: Sections analysed at the same time
+        """
+        self.analyzer = analyzer
+        self.chunk_chars = chunk_chars
+        self.max_concurrency = max_concurrency
+
+    def run(self, document_text: str, user_language: str = "English",
+            facts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyse a long document; same result schema as simplify_legal_document.
+        Fields that pre-extracted facts clearly cover are not requested per section.
+        """
+        sections = split_into_chunks(document_text, self.chunk_chars)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(sections))),
+                                thread_name_prefix='analysis-map') as pool:
+            results = list(pool.map(
+                lambda numbered: self._analyze_section(numbered[1], numbered[0] + 1, len(sections), user_language, facts),
+                enumerate(sections)
+            ))
+
+        partials = [result for result in results if result is not None]
+        if not partials:
+            return {
+                "error": "Failed to analyze document: no section could be analyzed",
+                "fallback_advice": "Please consult with a qualified legal professional for accurate legal advice."
+            }
+
+        analysis = self._overview(partials, user_language)
+        analysis.update(merge_partial_analyses(partials))
+        analysis['map_reduce'] = {'sections': len(sections), 'failed_sections': len(sections) - len(partials)}
+        return analysis
+
+    def _analyze_section(self, section_text: str, number: int, total: int, user_language: str,
+                         facts: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        key_parties_field = key_parties_prompt_field(facts, "Parties named in this section")
+        prompt = f"""
+        You are a legal expert AI assistant. Below is section {number} of {total} of a long legal document.
+        Analyze only this section and respond in {user_language} language with the following JSON format
+        (use empty lists for anything this section does not contain):
+        {{
+            "section_summary": "1-2 sentences on what this section covers",{key_parties_field}
+            "key_terms_simplified": [
+                {{
+                    "original_clause": "Original complex legal text",
+                    "simplified_explanation": "Easy-to-understand explanation",
+                    "importance_level": "High/Medium/Low",
+                    "potential_risk": "What could go wrong if you don't understand this",
+                    "is_jargon": true,
+                    "plain_english": "Simple everyday language explanation"
+                }}
+            ],
+            "legal_jargons": [
+                {{
+                    "term": "Legal term or phrase",
+                    "definition": "Simple explanation in everyday language",
+                    "example": "How it applies in this document",
+                    "why_important": "Why you need to understand this"
+                }}
+            ],
+            "important_points": [
+                {{
+                    "point": "Key important point",
+                    "why_important": "Why this matters to you",
+                    "action_required": "What you need to do about this"
+                }}
+            ],
+            "risk_assessment": {{
+                "high_risk_items": [{{"risk": "", "risk_factor": "High", "potential_impact": "", "mitigation": ""}}],
+                "medium_risk_items": [{{"risk": "", "risk_factor": "Medium", "potential_impact": "", "mitigation": ""}}],
+                "low_risk_items": [{{"risk": "", "risk_factor": "Low", "potential_impact": "", "mitigation": ""}}]
+            }},
+            "important_dates": ["Deadlines or dates"],
+            "financial_obligations": [
+                {{"description": "What you need to pay", "amount": "How much", "when": "When it's due", "consequences": "What happens if you don't pay"}}
+            ],
+            "rights_and_responsibilities": {{
+                "your_rights": [], "your_responsibilities": [], "other_party_rights": [], "other_party_responsibilities": []
+            }},
+            "red_flags": ["Potentially problematic clauses"],
+            "exit_clauses": ["How to get out of this agreement"]
+        }}
+
+        Section text:
+        {section_text}
+        """
+        try:
+            return parse_json_object(self.analyzer._generate(prompt).text)
+        except Exception as e:
+            logger.error(f"Section {number}/{total} analysis failed: {e}")
+            return None
+
+    def _overview(self, partials: List[Dict[str, Any]], user_language: str) -> Dict[str, Any]:
+        """Document-level fields from the section summaries (one short prompt)."""
+        summaries = "\n".join(
+            f"{i}. {partial.get('section_summary', '')}" for i, partial in enumerate(partials, 1)
+        )
+        red_flags = "\n".join(f"- {flag}" for flag in _dedupe(
+            [flag for partial in partials for flag in _strings(partial.get('red_flags'))], _norm
+        )[:20])
+        prompt = f"""
+        You are a legal expert AI assistant. A long legal document was analyzed section by section.
+        Section summaries:
+        {summaries}
+
+        Red flags found:
+        {red_flags or "None"}
+
+        Respond in {user_language} language with the following JSON format:
+        {{
+            "document_type": "Type of legal document (e.g., Rental Agreement, Loan Contract, Terms of Service)",
+            "main_purpose": "Brief explanation of what this document is for",
+            "complete_gist": "A comprehensive 2-3 paragraph summary explaining the entire document in simple terms",
+            "summary": "3-sentence summary of the entire document in simple terms",
+            "recommendation": "Should you sign this? What should you negotiate?",
+            "questions_to_ask": ["Important questions you should ask before signing"]
+        }}
+        """
+        try:
+            overview = parse_json_object(self.analyzer._generate(prompt).text)
+        except Exception as e:
+            logger.error(f"Overview of sectioned analysis failed: {e}")
+            overview = None
+        if overview is None:
+            # Still usable without the overview: fall back to the section summaries
+            overview = {"complete_gist": " ".join(partial.get('section_summary', '') for partial in partials)}
+        return overview
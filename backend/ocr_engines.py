@@ -0,0 +1,132 @@
+"""
+Process-wide registry of OCR engines.
+
+Each engine is loaded at most once per process, on first use, and shared by
+every TextExtractor in that process. Call preload() before forking workers
+(e.g. gunicorn --preload, or before a process pool starts) to load models once
+in the parent and share them with the children copy-on-write.
+
+In-process Tesseract engines (tesseract_api) are the exception: the C API is
+not thread-safe, so there is one per thread and configuration, created on
+first use in that thread and never carried over into a forked child.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import pytesseract
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_easyocr_readers: Dict[tuple, Optional[Any]] = {}
+_tesseract_ready: Optional[bool] = None
+_tesseract_api_ready: Optional[bool] = None
+_tesseract_apis = threading.local()
+
+
+def get_easyocr_reader(languages: Sequence[str] = ('en',)):
+    """
+    Return the shared EasyOCR reader for the given languages, loading it on first use.
+    Returns None if EasyOCR is unavailable; the failure is remembered so it is not retried.
+    """
+    key = tuple(languages)
+    if key in _easyocr_readers:
+        return _easyocr_readers[key]
+
+    with _lock:
+        if key not in _easyocr_readers:
+            try:
+                # Imported here: easyocr pulls in torch, which dominates import time
+                import easyocr
+                _easyocr_readers[key] = easyocr.Reader(list(languages))
+                logger.info("EasyOCR initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize EasyOCR: {e}")
+                _easyocr_readers[key] = None
+    return _easyocr_readers[key]
+
+
+def ensure_tesseract() -> bool:
+    """Locate and probe the Tesseract binary once per process. Returns whether it is usable."""
+    global _tesseract_ready
+    if _tesseract_ready is not None:
+        return _tesseract_ready
+
+    with _lock:
+        if _tesseract_ready is None:
+            # Set Tesseract path (you may need to adjust this based on your installation)
+            # For Windows: Download from https://github.com/UB-Mannheim/tesseract/wiki
+            try:
+                # Common Windows paths for Tesseract
+                possible_paths = [
+                    r'C:\Program Files\Tesseract-OCR\tesseract.exe',
+                    r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
+                    r'C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe'.format(os.getenv('USERNAME'))
+                ]
+
+                for path in possible_paths:
+                    if os.path.exists(path):
+                        pytesseract.pytesseract.tesseract_cmd = path
+                        break
+
+                # Test Tesseract
+                pytesseract.get_tesseract_version()
+                logger.info("Tesseract initialized successfully")
+                _tesseract_ready = True
+            except Exception as e:
+                logger.warning(f"Tesseract setup issue: {e}")
+                _tesseract_ready = False
+    return _tesseract_ready
+
+
+def get_tesseract_api(config: str = '', language: str = 'eng'):
+    """
+    Return this thread's in-process Tesseract engine for a configuration, creating it on first use.
+    Returns None if libtesseract is unavailable (remembered, so it is not retried)
+    or the engine cannot run this configuration; callers then use pytesseract.
+    """
+    global _tesseract_api_ready
+    if _tesseract_api_ready is False:
+        return None
+
+    # Engines inherited through fork belong to the parent and are left alone
+    if getattr(_tesseract_apis, 'pid', None) != os.getpid():
+        _tesseract_apis.pid = os.getpid()
+        _tesseract_apis.engines = {}
+    engines = _tesseract_apis.engines
+    key = (config, language)
+    if key not in engines:
+        # Imported here so a missing libtesseract only matters when the API backend is used
+        import tesseract_api
+        try:
+            engines[key] = tesseract_api.TesseractAPI(config, language)
+            if not _tesseract_api_ready:
+                logger.info(f"In-process Tesseract {tesseract_api.version()} initialized")
+                _tesseract_api_ready = True
+        except OSError as e:
+            logger.error(f"In-process Tesseract unavailable, using the tesseract executable: {e}")
+            _tesseract_api_ready = False
+            return None
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"In-process Tesseract cannot run config '{config}', using the tesseract executable: {e}")
+            engines[key] = None
+    return engines[key]
+
+
+def preload(languages: Sequence[str] = ('en',)):
+    """Load every engine now instead of on first use."""
+    ensure_tesseract()
+    get_easyocr_reader(languages)
+
+
+def loaded_engines() -> Dict[str, bool]:
+    """Which engines have been loaded in this process (and whether they are usable)."""
+    engines = {f"easyocr:{'+'.join(key)}": reader is not None for key, reader in _easyocr_readers.items()}
+    if _tesseract_ready is not None:
+        engines['tesseract'] = _tesseract_ready
+    if _tesseract_api_ready is not None:
+        engines['tesseract_api'] = _tesseract_api_ready
+    return engines
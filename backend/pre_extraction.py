@@ -0,0 +1,270 @@
+"""
+Deterministic pre-extraction of facts from legal text.
+
+Currency amounts, dates, durations and defined parties ("... (hereinafter the
+'Tenant')") are found with compiled patterns in a single pass over the text.
+The results are merged into key_parties, important_dates and
+financial_obligations alongside what the model found. A field is only left out
+of the analysis prompt when the local extraction clearly covers it (see
+covered_fields).
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Set
+
+_MONTHS = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+           r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_NUMBER_WORDS = (r"(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|fifteen|twenty|"
+                 r"thirty|forty[- ]?five|forty|sixty|ninety|hundred)")
+_CURRENCY_SYMBOL = r"(?:US\$|\$|€|£|₹|¥|Rs\.?|INR|USD|EUR|GBP|AUD|CAD)"
+_QUOTED_ROLE = r"[\"“'‘](?P<role>(?-i:[A-Z])[\w .&-]{1,40}?)[\"”'’]"
+
+PATTERNS = {
+    'amount': (
+        rf"{_CURRENCY_SYMBOL}\s?\d{{1,3}}(?:[,\s]\d{{2,3}})*(?:\.\d{{1,2}})?(?:\s?(?:million|billion|lakh|crore|k)\b)?"
+        rf"|\b\d{{1,3}}(?:,\d{{3}})*(?:\.\d{{1,2}})?\s?(?:dollars|euros|pounds|rupees|USD|EUR|GBP|INR)\b"
+    ),
+    'date': (
+        rf"\b\d{{1,2}}(?:st|nd|rd|th)?(?:\s+day)?(?:\s+of)?\s+{_MONTHS}\.?,?\s+\d{{4}}\b"
+        rf"|\b{_MONTHS}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b"
+        r"|\b\d{4}-\d{2}-\d{2}\b"
+        r"|\b\d{1,2}[/.-]\d{1,2}[/.-]\d{4}\b"
+    ),
+    'duration': (
+        rf"\b(?:{_NUMBER_WORDS}\s*(?:\(\d+\)\s*)?|\d+\s+)(?:business\s+|calendar\s+|working\s+)?"
+        r"(?:days?|weeks?|months?|years?)\b"
+    ),
+    'party': (
+        rf"(?:\b(?:hereinafter|herein)\s+(?:referred\s+to\s+as\s+|called\s+)?(?:the\s+)?|\((?:the\s+)?){_QUOTED_ROLE}"
+    ),
+}
+
+_FACTS = re.compile('|'.join(f"(?P<{name}>{pattern})" for name, pattern in PATTERNS.items()), re.IGNORECASE)
+_SENTENCE_BREAK = re.compile(r"[.;](?=\s)|\n")
+# Sentence ends, but not abbreviations such as "Pvt." or "Ltd." inside company names
+_NAME_SENTENCE_BREAK = re.compile(r"(?<=[a-z]{3})[.;]\s|\n")
+_PARTY_SEPARATOR = re.compile(r"\b(?:between|and)\b|[:;]", re.IGNORECASE)
+# Trailing run of capitalised words, e.g. "John Smith" or "Acme Holdings Pvt. Ltd."
+_CAPITALISED_RUN = re.compile(r"((?:[A-Z][\w.&'-]*\s+)*[A-Z][\w.&'-]*)\s*$")
+_PARTY_INTRO = re.compile(r"\b(?:between|among|by)\b", re.IGNORECASE)
+_ENTITY_SUFFIX = re.compile(
+    r"\b(?:Inc|Incorporated|LLC|L\.L\.C|Ltd|Limited|Corp|Corporation|Company|Co|LLP|LP|PLC|GmbH|AG|S\.A|"
+    r"Pvt|Private|N\.A|Bank|Trust|Partners|Holdings|Group)\.?$"
+)
+
+# Roles that name a party to the agreement; any other quoted defined term
+# ("Agreement", "Premises", "Effective Date") only counts as a party when it
+# follows a company name or a person introduced with "between"/"by"
+PARTY_ROLES = {
+    'landlord', 'tenant', 'lessor', 'lessee', 'licensor', 'licensee', 'employer', 'employee',
+    'buyer', 'seller', 'purchaser', 'vendor', 'borrower', 'lender', 'creditor', 'debtor',
+    'contractor', 'subcontractor', 'client', 'customer', 'supplier', 'provider', 'service provider',
+    'consultant', 'company', 'guarantor', 'owner', 'agent', 'principal', 'franchisor', 'franchisee',
+    'disclosing party', 'receiving party', 'discloser', 'recipient', 'assignor', 'assignee',
+    'mortgagor', 'mortgagee', 'pledgor', 'pledgee', 'grantor', 'grantee', 'trustee', 'beneficiary',
+    'executor', 'testator', 'testatrix', 'shareholder', 'investor', 'partner', 'distributor',
+    'manufacturer', 'developer', 'publisher', 'author', 'insurer', 'insured', 'member', 'landowner',
+    'occupant', 'sublessor', 'sublessee', 'subtenant', 'user', 'you', 'we', 'us',
+}
+
+# Local results for a field are used instead of asking the model only with at
+# least this many named parties
+MIN_COMPLETE_PARTIES = 2
+
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?(?:\s?(million|billion|lakh|crore|k)\b)?", re.IGNORECASE)
+_MULTIPLIERS = {'k': 1000, 'lakh': 100000, 'million': 1000000, 'crore': 10000000, 'billion': 1000000000}
+_DATE_ONLY = re.compile(PATTERNS['date'], re.IGNORECASE)
+_DATE_FORMATS = ['%d %B %Y', '%d %b %Y', '%B %d %Y', '%b %d %Y', '%Y-%m-%d', '%m/%d/%Y', '%d.%m.%Y', '%m-%d-%Y']
+
+
+def _context(text: str, start: int, end: int, width: int = 100) -> str:
+    """The clause around a match, trimmed to sentence boundaries where possible."""
+    left = text[max(0, start - width):start]
+    right = text[end:end + width]
+    breaks = list(_SENTENCE_BREAK.finditer(left))
+    if breaks:
+        left = left[breaks[-1].end():]
+    match = _SENTENCE_BREAK.search(right)
+    if match:
+        right = right[:match.start()]
+    return " ".join(f"{left}{text[start:end]}{right}".split())
+
+
+def _party_name(before: str) -> Optional[str]:
+    """
+    The name a defined term refers to, from the text just before it:
+    "by and between John Smith, residing at ... (hereinafter the 'Landlord')" -> "John Smith"
+    """
+    segment = _NAME_SENTENCE_BREAK.split(before.rstrip())[-1]
+    segment = _PARTY_SEPARATOR.split(segment)[-1]
+    segment = segment.split(',')[0].strip(' ,(')
+    match = _CAPITALISED_RUN.search(segment)
+    return match.group(1) if match else None
+
+
+def _is_party(role: str, name: Optional[str], before: str) -> bool:
+    """
+    Whether a quoted defined term names a party: a role from PARTY_ROLES, a
+    company name, or a person's name that makes up the whole clause after
+    "between"/"by" ("by and between John Smith ("Smith") and ...").
+    """
+    if role.lower().removeprefix('the ').strip() in PARTY_ROLES:
+        return True
+    if name is None:
+        return False
+    if _ENTITY_SUFFIX.search(name):
+        return True
+    sentence = _NAME_SENTENCE_BREAK.split(before.rstrip())[-1]
+    if not _PARTY_INTRO.search(sentence):
+        return False
+    clause = _PARTY_SEPARATOR.split(sentence)[-1].split(',')[0].strip(' ,(')
+    return clause == name
+
+
+def extract_facts(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find amounts, dates, durations and defined parties in one pass.
+
+    Returns:
+        Dict with lists 'amounts', 'dates', 'durations' (each item: text and
+        context) and 'parties' (role, name and context), deduplicated in order
+        of first appearance
+    """
+    facts = {'amounts': [], 'dates': [], 'durations': [], 'parties': []}
+    seen = set()
+    for match in _FACTS.finditer(text):
+        kind = match.lastgroup
+        context = _context(text, match.start(), match.end())
+        if kind == 'party':
+            role = match.group('role').strip()
+            before = text[max(0, match.start() - 200):match.start()]
+            name = _party_name(before)
+            if not _is_party(role, name, before):
+                continue
+            key = ('party', role.lower())
+            if key not in seen:
+                seen.add(key)
+                facts['parties'].append({'role': role, 'name': name, 'context': context})
+            continue
+
+        value = " ".join(match.group().split())
+        key = (kind, value.lower())
+        if key not in seen:
+            seen.add(key)
+            facts[f"{kind}s"].append({'text': value, 'context': context})
+    return facts
+
+
+def format_parties(facts: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    """key_parties entries, e.g. "John Smith (the Landlord)"."""
+    return [f"{party['name']} (the {party['role']})" if party['name'] else party['role'] for party in facts['parties']]
+
+
+def format_dates(facts: Dict[str, List[Dict[str, Any]]]) -> List[str]:
+    """important_dates entries: each date with the clause it appears in (durations are not dates)."""
+    return [f"{item['text']}: {item['context']}" for item in facts['dates']]
+
+
+def covered_fields(facts: Optional[Dict[str, List[Dict[str, Any]]]]) -> Set[str]:
+    """
+    Analysis fields the local extraction covers well enough to leave out of the prompt.
+
+    Only key_parties qualifies, and only with at least MIN_COMPLETE_PARTIES
+    parties that all have names. Dates are always requested: deadlines such as
+    "within 30 days of termination" are beyond the patterns.
+    """
+    if facts and len(facts['parties']) >= MIN_COMPLETE_PARTIES and all(p['name'] for p in facts['parties']):
+        return {'key_parties'}
+    return set()
+
+
+def key_parties_prompt_field(facts: Optional[Dict[str, List[Dict[str, Any]]]], description: str) -> str:
+    """
+    The "key_parties" line of an analysis prompt's JSON format, or "" when the
+    pre-extracted parties cover it (see covered_fields).
+    """
+    if 'key_parties' in covered_fields(facts):
+        return ""
+    return f"""
+            "key_parties": ["{description}"],"""
+
+
+def _amount_value(text: str) -> Optional[Decimal]:
+    """Value of the first number in text, e.g. "$1,500.00" -> 1500, "Rs. 2 lakh" -> 200000."""
+    # Digit groups separated by spaces ("€ 1 500") are one number
+    match = _NUMBER.search(re.sub(r"(?<=\d)\s(?=\d{3}\b)", "", text))
+    if match is None:
+        return None
+    try:
+        value = Decimal(re.match(r"[\d,]*(?:\.\d+)?", match.group()).group().replace(',', ''))
+    except InvalidOperation:
+        return None
+    if match.group(1):
+        value *= _MULTIPLIERS[match.group(1).lower()]
+    return value
+
+
+def _amount_values(text: str) -> Set[Decimal]:
+    """Values of every number in free text, such as the model's amount fields."""
+    values = {_amount_value(match.group()) for match in _NUMBER.finditer(text)}
+    values.discard(None)
+    return values
+
+
+def _date_key(text: str) -> str:
+    """A date in a comparable form: ISO when it parses, else its normalised text."""
+    cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", text, flags=re.IGNORECASE)
+    cleaned = re.sub(r"\b(?:day\s+of|of)\b|,", " ", cleaned, flags=re.IGNORECASE)
+    cleaned = " ".join(cleaned.replace('Sept', 'Sep').split())
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(cleaned, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return cleaned.lower()
+
+
+def merge_facts(analysis: Dict[str, Any], facts: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Merge locally extracted facts into an analysis: parties, dates and amounts
+    that the model's key_parties, important_dates and financial_obligations do
+    not already mention are appended to them. The raw facts are kept under
+    extracted_facts.
+    """
+    model_parties = " ".join(str(entry) for entry in analysis.get('key_parties') or []).lower()
+    parties = [entry for party, entry in zip(facts['parties'], format_parties(facts))
+               if (party['name'] or party['role']).lower() not in model_parties]
+    if parties:
+        analysis['key_parties'] = list(analysis.get('key_parties') or []) + parties
+
+    seen_dates = {_date_key(match.group()) for entry in analysis.get('important_dates') or []
+                  for match in _DATE_ONLY.finditer(str(entry))}
+    dates = []
+    for item, entry in zip(facts['dates'], format_dates(facts)):
+        key = _date_key(item['text'])
+        if key not in seen_dates:
+            seen_dates.add(key)
+            dates.append(entry)
+    if dates:
+        analysis['important_dates'] = list(analysis.get('important_dates') or []) + dates
+
+    obligations = analysis.get('financial_obligations')
+    if facts['amounts'] and isinstance(obligations, list):
+        mentioned = set()
+        for obligation in obligations:
+            if isinstance(obligation, dict):
+                mentioned |= _amount_values(str(obligation.get('amount', '')))
+        for amount in facts['amounts']:
+            value = _amount_value(amount['text'])
+            if value is not None and value not in mentioned:
+                mentioned.add(value)
+                obligations.append({
+                    'description': amount['context'],
+                    'amount': amount['text'],
+                    'source': 'local_extraction'
+                })
+
+    analysis['extracted_facts'] = facts
+    return analysis
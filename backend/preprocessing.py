@@ -0,0 +1,144 @@
+"""
+Preprocessing variants of page images for OCR.
+
+PreprocessingPipeline holds what is expensive to set up or allocate and can be
+shared across images: the CLAHE object, the morphology kernel and one output
+buffer per variant for the most recent image shapes (consecutive PDF pages
+usually share one). Variants are built on first access only, straight into
+those buffers, so OCRing a multi-page document allocates them once instead of
+once per page.
+
+Buffers are overwritten by the next image of the same shape, so the variants of
+an image are only valid until the pipeline's next image is processed, and a
+pipeline must not be shared between threads (TextExtractor keeps one per
+thread). Pass reuse_buffers=False for variants the caller keeps.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Names of the preprocessing variants, in the order preprocess_image returns them
+PREPROCESS_VARIANTS = ['original', 'gray', 'blurred', 'threshold', 'morph', 'enhanced']
+
+
+class PreprocessedVariants:
+    """
+    Lazily computed preprocessing variants of a single image.
+    Each variant is built on first access and reused afterwards.
+    """
+
+    def __init__(self, image: np.ndarray, pipeline: Optional['PreprocessingPipeline'] = None,
+                 reuse_buffers: bool = False):
+        self.image = image
+        self.pipeline = pipeline or PreprocessingPipeline()
+        self.reuse_buffers = reuse_buffers
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._cache:
+            self._cache[name] = self._build(name)
+        return self._cache[name]
+
+    @property
+    def computed(self) -> List[str]:
+        """Names of the variants that have been built so far."""
+        return list(self._cache)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the variants built so far, beyond the image itself."""
+        return sum(array.nbytes for array in self._cache.values() if array is not self.image)
+
+    def _out(self, name: str) -> Optional[np.ndarray]:
+        """Output buffer for a single-channel variant, or None to let OpenCV allocate one."""
+        if not self.reuse_buffers:
+            return None
+        return self.pipeline.buffer(name, self.image.shape[:2])
+
+    def _build(self, name: str) -> np.ndarray:
+        if name == 'original':
+            return self.image
+        if name == 'gray':
+            # Convert to grayscale
+            if len(self.image.shape) == 3:
+                return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY, dst=self._out(name))
+            return self.image
+        if name == 'blurred':
+            # Apply Gaussian blur to reduce noise
+            return cv2.GaussianBlur(self['gray'], (3, 3), 0, dst=self._out(name))
+        if name == 'threshold':
+            # Apply threshold to get binary image
+            _, thresh = cv2.threshold(self['gray'], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU,
+                                      dst=self._out(name))
+            return thresh
+        if name == 'morph':
+            # Morphological operations to clean up the image
+            return cv2.morphologyEx(self['threshold'], cv2.MORPH_CLOSE, self.pipeline.kernel, dst=self._out(name))
+        if name == 'enhanced':
+            # Enhance contrast
+            return self.pipeline.clahe.apply(self['gray'], dst=self._out(name))
+        raise KeyError(f"Unknown preprocessing variant: {name}")
+
+
+class PreprocessingPipeline:
+    """Shared CLAHE and kernel objects plus reusable output buffers for PreprocessedVariants."""
+
+    def __init__(self, max_shapes: int = 2, clahe_clip_limit: float = 2.0,
+                 clahe_tile_grid: Tuple[int, int] = (8, 8)):
+        """
+        Args:
+            max_shapes: Image shapes to keep buffers for; the least recently used
+                shape's buffers are released beyond that
+            clahe_clip_limit: Contrast limit of the 'enhanced' variant
+            clahe_tile_grid: CLAHE tile grid of the 'enhanced' variant
+        """
+        self.max_shapes = max_shapes
+        self.kernel = np.ones((2, 2), np.uint8)
+        self.clahe = cv2.createCLAHE(clipLimit=clahe_clip_limit, tileGridSize=clahe_tile_grid)
+        self._buffers: 'OrderedDict[Tuple[int, int], Dict[str, np.ndarray]]' = OrderedDict()
+        self.buffers_allocated = 0
+        self.buffers_reused = 0
+
+    def variants(self, image: np.ndarray, reuse_buffers: bool = True) -> PreprocessedVariants:
+        """
+        Variants of image, built on request.
+
+        Args:
+            image: BGR or grayscale image
+            reuse_buffers: Build into the pipeline's buffers, valid until the next
+                image of the same shape; False allocates arrays the caller can keep
+        """
+        return PreprocessedVariants(image, self, reuse_buffers)
+
+    def buffer(self, name: str, shape: Tuple[int, int]) -> np.ndarray:
+        """The uint8 output buffer of a variant for images of this height and width."""
+        buffers = self._buffers.get(shape)
+        if buffers is None:
+            buffers = self._buffers[shape] = {}
+            while len(self._buffers) > self.max_shapes:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(shape)
+        array = buffers.get(name)
+        if array is None:
+            array = buffers[name] = np.empty(shape, np.uint8)
+            self.buffers_allocated += 1
+        else:
+            self.buffers_reused += 1
+        return array
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held in buffers across all shapes."""
+        return sum(array.nbytes for buffers in self._buffers.values() for array in buffers.values())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'shapes': len(self._buffers),
+            'buffer_bytes': self.buffer_bytes,
+            'buffers_allocated': self.buffers_allocated,
+            'buffers_reused': self.buffers_reused
+        }
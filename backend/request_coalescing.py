@@ -0,0 +1,91 @@
+"""
+Single-flight coalescing of identical requests on the event loop.
+
+A double-clicked "Analyze" or a team uploading the same contract at once
+would otherwise extract and analyze the same content several times. The first
+request for a key starts the work as a task; requests for the same key that
+arrive while it runs await that task instead of starting their own, and all
+of them receive its result (or its exception). Progress the task reports is
+passed on to every caller still waiting, not just the one that started it.
+The task outlives the caller that started it while others wait, so it must
+not depend on anything that caller cleans up when it leaves.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+ProgressCallback = Callable[..., None]
+
+
+class _Flight:
+    __slots__ = ('task', 'waiters', 'listeners', 'progress')
+
+    def __init__(self):
+        self.task: Optional[asyncio.Future] = None
+        self.waiters = 0
+        self.listeners: List[ProgressCallback] = []
+        self.progress: Dict[str, Any] = {}
+
+    def report(self, **fields):
+        """Pass progress on to every waiting caller; may be called from another thread."""
+        self.progress.update(fields)
+        for listener in tuple(self.listeners):
+            listener(**fields)
+
+
+class AsyncSingleFlight:
+    """
+    Shares one in-flight task between concurrent callers with the same key.
+    Use from a single event loop. The shared task is cancelled only once every
+    caller waiting for it has been cancelled.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[[ProgressCallback], Awaitable[Any]],
+                  on_progress: Optional[ProgressCallback] = None) -> Any:
+        """
+        Args:
+            key: Identity of the work, e.g. a content hash
+            func: Starts the work; called only if no call for key is in flight, with a
+                report(**fields) function that passes progress on to every waiting caller
+            on_progress: Receives the progress of the (possibly shared) work; a caller
+                that joins late first receives the progress reported so far
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(func(flight.report))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            if on_progress is not None and flight.progress:
+                on_progress(**flight.progress)
+
+        flight.waiters += 1
+        if on_progress is not None:
+            flight.listeners.append(on_progress)
+        try:
+            # Shielded so one caller going away does not cancel the work for the others
+            return await asyncio.shield(flight.task)
+        finally:
+            if on_progress is not None:
+                flight.listeners.remove(on_progress)
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {'started': self.started, 'coalesced': self.coalesced, 'in_flight': len(self._inflight)}
@@ -0,0 +1,165 @@
+"""
+Cache of Gemini responses keyed by model name and normalised prompt.
+Opt-in only: nothing is kept unless LLM_CACHE_ENABLED is set. Responses are held
+in an in-memory LRU and, when LLM_CACHE_PATH is set, in a SQLite tier that
+survives restarts. Both tiers expire entries after the same TTL (LLM_CACHE_TTL_SECONDS).
+The SQLite tier has its own table, response_cache, and size bound (LLM_CACHE_MAX_MB),
+so pointing LLM_CACHE_PATH at the extraction cache's file shares the file only:
+neither cache evicts, expires or clears the other's entries.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from extraction_cache import ExtractionCache
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Table of the SQLite tier, apart from the extraction cache's even in a shared file
+RESPONSE_CACHE_TABLE = 'response_cache'
+
+
+class CachedResponse:
+    """Stands in for a Gemini response (or stream chunk) served from the cache."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def prompt_key(model_name: Optional[str], prompt: str) -> str:
+    """
+    Hash of model name plus prompt. Runs of whitespace are collapsed, so prompts
+    that differ only in indentation or line breaks share an entry.
+    """
+    normalised = _WHITESPACE.sub(' ', prompt).strip()
+    digest = hashlib.sha256()
+    digest.update((model_name or '').encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalised.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU in front of an optional SQLite store.
+    A disk hit is promoted to the memory tier.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600, disk: Optional[ExtractionCache] = None):
+        """
+        Args:
+            max_entries: Responses kept in the memory tier
+            ttl_seconds: Age after which a memory entry is no longer served
+            disk: Optional SQLite tier (its own TTL and size limit apply), normally
+                with table RESPONSE_CACHE_TABLE
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk = disk
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['ResponseCache']:
+        """
+        Build a cache from environment variables, or return None when caching is disabled.
+
+        LLM_CACHE_ENABLED: 'true' to enable (default off)
+        LLM_CACHE_MEMORY_ENTRIES: size of the in-memory LRU (default 256)
+        LLM_CACHE_TTL_SECONDS: entry lifetime in both tiers (default 3600)
+        LLM_CACHE_PATH: SQLite file for the disk tier (default empty = memory only);
+            may be the extraction cache's file, the tiers use separate tables
+        LLM_CACHE_MAX_MB: size bound of the disk tier in megabytes (default 50),
+            separate from EXTRACTION_CACHE_MAX_MB
+        """
+        if os.getenv('LLM_CACHE_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+            return None
+        ttl_seconds = float(os.getenv('LLM_CACHE_TTL_SECONDS', '3600'))
+        disk = None
+        path = os.getenv('LLM_CACHE_PATH', '')
+        if path:
+            disk = ExtractionCache(
+                path=path,
+                max_bytes=int(float(os.getenv('LLM_CACHE_MAX_MB', '50')) * 1024 * 1024),
+                ttl_seconds=ttl_seconds,
+                table=RESPONSE_CACHE_TABLE
+            )
+        return cls(
+            max_entries=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', '256')),
+            ttl_seconds=ttl_seconds,
+            disk=disk
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text for key, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+        if self.disk is not None:
+            stored = self.disk.get(key)
+            if stored is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, stored['text'], stored.get('created', now))
+                return stored['text']
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str):
+        """Store a response text in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now)
+        if self.disk is not None:
+            self.disk.put(key, {'text': text, 'created': now})
+
+    def _remember(self, key: str, text: str, created: float):
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        """Remove every cached response from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and hit/miss counters per tier."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            stats = {
+                'memory_entries': len(self._memory),
+                'max_memory_entries': self.max_entries,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+            }
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+        return stats
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,174 @@
+"""
+Local lexical retrieval over a document's text.
+
+The text is split into clause-aware chunks and indexed with BM25 so that a
+question only needs the few most relevant clauses in its prompt instead of the
+whole document. Everything runs in-process with NumPy; nothing leaves the server.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# A clause usually starts on a new line with a numbered or lettered marker or a heading
+_CLAUSE_START = re.compile(
+    r'^\s*(?:'
+    r'(?:section|article|clause|schedule|annex(?:ure)?|exhibit|appendix)\s+[\w.]+'
+    r'|\d+(?:\.\d+)*[.)]?\s'
+    r'|\([a-z0-9]{1,4}\)\s'
+    r'|(?-i:[A-Z][A-Z0-9 ,&/\'-]{3,})$'
+    r')',
+    re.IGNORECASE | re.MULTILINE
+)
+_SENTENCE_END = re.compile(r'(?<=[.;:!?])\s+')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does for from had has have he her his how i if in into is it its
+may me my no not of on or our shall she should so such that the their them then there these they this
+those to under upon was we were what when where which who whom why will with would you your
+""".split())
+
+
+# Crude suffix stripping so that e.g. "terminate", "termination" and "terminated" match
+_SUFFIXES = ('ations', 'ation', 'ments', 'ment', 'ings', 'ated', 'ates', 'ing', 'ate', 'ies', 'ed', 'es', 'ly', 's')
+
+
+def stem(token: str) -> str:
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, stemmed word tokens without stopwords."""
+    return [stem(token) for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _split_long(piece: str, max_chars: int) -> List[str]:
+    """Split an oversized clause on sentence boundaries (or hard-wrap a single huge sentence)."""
+    parts, current = [], ""
+    for sentence in _SENTENCE_END.split(piece):
+        while len(sentence) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_into_chunks(text: str, max_chars: int = 1200) -> List[str]:
+    """
+    Split text into chunks of at most max_chars that follow clause boundaries.
+
+    Clause and paragraph starts are preferred split points; consecutive short
+    clauses are packed into one chunk and long ones are split by sentence.
+    """
+    starts = sorted({0, *(m.start() for m in _CLAUSE_START.finditer(text)),
+                     *(m.end() for m in re.finditer(r'\n\s*\n', text))})
+    pieces = [text[start:end].strip() for start, end in zip(starts, starts[1:] + [len(text)])]
+
+    chunks, current = [], ""
+    for piece in pieces:
+        if not piece:
+            continue
+        if len(piece) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_long(piece, max_chars))
+        elif current and len(current) + len(piece) + 1 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of chunks.
+
+    Postings are kept per term as NumPy arrays of chunk ids and term
+    frequencies, so a query only touches the chunks containing its terms.
+    """
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = np.zeros(len(chunks), dtype=np.float32)
+        for chunk_id, chunk in enumerate(chunks):
+            tokens = tokenize(chunk)
+            lengths[chunk_id] = len(tokens)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[chunk_id] = counts.get(chunk_id, 0) + 1
+
+        average_length = float(lengths.mean()) if len(chunks) and lengths.mean() > 0 else 1.0
+        # Per-chunk length normalisation of the BM25 denominator
+        self._norm = (k1 * (1 - b + b * lengths / average_length)).astype(np.float32)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray, float]] = {}
+        n = len(chunks)
+        for term, counts in postings.items():
+            ids = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            idf = float(np.log(1 + (n - len(counts) + 0.5) / (len(counts) + 0.5)))
+            self._postings[term] = (ids, tf, idf)
+
+    @classmethod
+    def from_text(cls, text: str, max_chars: int = 1200) -> 'BM25Index':
+        return cls(split_into_chunks(text, max_chars))
+
+    def approximate_size(self) -> int:
+        """Rough memory footprint in bytes: chunk text, postings arrays and per-term overhead."""
+        size = sum(len(chunk.encode('utf-8')) for chunk in self.chunks) + self._norm.nbytes
+        for term, (ids, tf, _) in self._postings.items():
+            # Dict slot, key string, tuple and two array headers, about 300 bytes
+            size += len(term) + ids.nbytes + tf.nbytes + 300
+        return size
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for the query."""
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            ids, tf, idf = posting
+            scores[ids] += idf * tf * (self.k1 + 1) / (tf + self._norm[ids])
+        return scores
+
+    def top_k(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """The k best matching chunks as (chunk index, score), best first."""
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(i), float(scores[i])) for i in best]
+
+    def retrieve(self, query: str, k: int = 5) -> List[str]:
+        """
+        Text of the k best matching chunks, in document order so the model reads
+        clauses in their original sequence. Chunks with no matching term are
+        dropped unless nothing matches at all.
+        """
+        ranked = self.top_k(query, k)
+        matching = [i for i, score in ranked if score > 0] or [i for i, _ in ranked]
+        return [self.chunks[i] for i in sorted(matching)]
@@ -0,0 +1,235 @@
+"""
+In-process Tesseract through its C API (libtesseract, loaded with ctypes).
+
+pytesseract runs the tesseract executable for every call: the image is written
+to a temporary PNG, a new process starts and loads the language model again.
+TesseractAPI keeps one initialised engine and hands it the pixels of a numpy
+array directly. An engine serves one configuration and must only be used by
+one thread at a time; ocr_engines keeps one per thread and configuration.
+
+The library is the one installed with the tesseract executable (libtesseract5
+on Debian/Ubuntu, the tesseract formula on Homebrew), found by name or at the
+path in TESSERACT_LIBRARY. Language data is found as the executable finds it
+(TESSDATA_PREFIX).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import shlex
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Tesseract's own defaults for the command line, which pytesseract configs are written against
+DEFAULT_OEM = 3  # OEM_DEFAULT
+DEFAULT_PSM = 3  # PSM_AUTO (the C API itself defaults to PSM_SINGLE_BLOCK)
+
+# Column names of Tesseract's TSV output, as in pytesseract.image_to_data
+TSV_COLUMNS = ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+               'left', 'top', 'width', 'height', 'conf', 'text']
+
+_lock = threading.Lock()
+_library: Optional[ctypes.CDLL] = None
+
+
+def _declare(lib: ctypes.CDLL):
+    handle, text = ctypes.c_void_p, ctypes.c_void_p  # text is freed with TessDeleteText, so not c_char_p
+    signatures = {
+        'TessVersion': ([], ctypes.c_char_p),
+        'TessBaseAPICreate': ([], handle),
+        'TessBaseAPIDelete': ([handle], None),
+        'TessBaseAPIInit2': ([handle, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int], ctypes.c_int),
+        'TessBaseAPIEnd': ([handle], None),
+        'TessBaseAPISetPageSegMode': ([handle, ctypes.c_int], None),
+        'TessBaseAPISetVariable': ([handle, ctypes.c_char_p, ctypes.c_char_p], ctypes.c_int),
+        'TessBaseAPISetImage': ([handle, ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int],
+                                None),
+        'TessBaseAPISetSourceResolution': ([handle, ctypes.c_int], None),
+        'TessBaseAPIRecognize': ([handle, ctypes.c_void_p], ctypes.c_int),
+        'TessBaseAPIGetUTF8Text': ([handle], text),
+        'TessBaseAPIGetTsvText': ([handle, ctypes.c_int], text),
+        'TessBaseAPIClear': ([handle], None),
+        'TessDeleteText': ([text], None),
+    }
+    for name, (argtypes, restype) in signatures.items():
+        function = getattr(lib, name)
+        function.argtypes = argtypes
+        function.restype = restype
+
+
+def load_library() -> ctypes.CDLL:
+    """
+    Load libtesseract once per process.
+
+    Raises:
+        OSError: if the library cannot be found or lacks the C API
+    """
+    global _library
+    if _library is not None:
+        return _library
+    with _lock:
+        if _library is None:
+            candidates = [os.getenv('TESSERACT_LIBRARY'), ctypes.util.find_library('tesseract'),
+                          'libtesseract.so.5', 'libtesseract.so.4']
+            errors = []
+            for candidate in filter(None, candidates):
+                try:
+                    lib = ctypes.CDLL(candidate)
+                    _declare(lib)
+                except (OSError, AttributeError) as e:
+                    errors.append(f"{candidate}: {e}")
+                    continue
+                _library = lib
+                break
+            else:
+                raise OSError("libtesseract not found" + (f" ({'; '.join(errors)})" if errors else ""))
+    return _library
+
+
+def version() -> str:
+    return load_library().TessVersion().decode('utf-8')
+
+
+def parse_config(config: str) -> Tuple[int, int, Optional[int], Optional[str], Dict[str, str]]:
+    """
+    Split a pytesseract config string into (oem, psm, dpi, language, variables).
+
+    Raises:
+        ValueError: for options the executable would take but the engine cannot
+    """
+    oem, psm, dpi, language, variables = DEFAULT_OEM, DEFAULT_PSM, None, None, {}
+    # Split like pytesseract does (so a trailing space inside a value is dropped the same way)
+    args = shlex.split(config)
+    i = 0
+    while i < len(args):
+        option = args[i]
+        if option in ('--oem', '--psm', '--dpi', '-l', '-c') and i + 1 < len(args):
+            value = args[i + 1]
+            i += 2
+            if option == '--oem':
+                oem = int(value)
+            elif option == '--psm':
+                psm = int(value)
+            elif option == '--dpi':
+                dpi = int(value)
+            elif option == '-l':
+                language = value
+            else:
+                name, sep, setting = value.partition('=')
+                if not sep:
+                    raise ValueError(f"Invalid Tesseract variable: {value}")
+                variables[name] = setting
+        else:
+            raise ValueError(f"Unsupported Tesseract option for the in-process engine: {option}")
+    return oem, psm, dpi, language, variables
+
+
+def _pixels(image: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Contiguous 8-bit pixels in the layout Tesseract reads (gray, or RGB), and bytes per pixel."""
+    if image.dtype != np.uint8:
+        image = cv2.convertScaleAbs(image)
+    if image.ndim == 3 and image.shape[2] == 1:
+        image = image[:, :, 0]
+    if image.ndim == 2:
+        return np.ascontiguousarray(image), 1
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2RGB), 3
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB), 3
+
+
+class TesseractAPI:
+    """A persistent Tesseract engine for one configuration, fed OpenCV (BGR or grayscale) images."""
+
+    def __init__(self, config: str = '', language: str = 'eng'):
+        """
+        Args:
+            config: pytesseract-style options (--oem, --psm, --dpi, -l, -c name=value)
+            language: Language(s) to load, e.g. 'eng' or 'eng+deu'; -l in config wins
+
+        Raises:
+            OSError: if libtesseract cannot be loaded
+            ValueError: if config has options the engine does not support
+            RuntimeError: if the engine cannot be initialised (e.g. missing language data)
+        """
+        oem, psm, self.dpi, config_language, variables = parse_config(config)
+        self.language = config_language or language
+        self._lib = load_library()
+        self._handle = self._lib.TessBaseAPICreate()
+        if self._lib.TessBaseAPIInit2(self._handle, None, self.language.encode('utf-8'), oem) != 0:
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+            raise RuntimeError(f"Could not initialise Tesseract for '{self.language}' (check TESSDATA_PREFIX)")
+        self._lib.TessBaseAPISetPageSegMode(self._handle, psm)
+        # The executable's diagnostics ("Estimating resolution as ...") end up in pytesseract's
+        # captured stderr; in-process they would go to ours
+        variables.setdefault('debug_file', os.devnull)
+        for name, value in variables.items():
+            if not self._lib.TessBaseAPISetVariable(self._handle, name.encode('utf-8'), value.encode('utf-8')):
+                self.close()
+                raise ValueError(f"Tesseract variable cannot be set after initialisation: {name}")
+
+    def _recognize(self, image: np.ndarray):
+        pixels, bytes_per_pixel = _pixels(image)
+        height, width = pixels.shape[:2]
+        # Tesseract copies the pixels, so the array only has to live through this call
+        self._lib.TessBaseAPISetImage(self._handle, pixels.ctypes.data, width, height, bytes_per_pixel,
+                                      pixels.strides[0])
+        if self.dpi:
+            self._lib.TessBaseAPISetSourceResolution(self._handle, self.dpi)
+        if self._lib.TessBaseAPIRecognize(self._handle, None) != 0:
+            raise RuntimeError("Tesseract recognition failed")
+
+    def _take_text(self, pointer: Optional[int]) -> str:
+        if not pointer:
+            return ""
+        try:
+            return ctypes.string_at(pointer).decode('utf-8', errors='replace')
+        finally:
+            self._lib.TessDeleteText(pointer)
+
+    def image_to_string(self, image: np.ndarray) -> str:
+        """Recognised text, as pytesseract.image_to_string returns it for the same config."""
+        try:
+            self._recognize(image)
+            return self._take_text(self._lib.TessBaseAPIGetUTF8Text(self._handle))
+        finally:
+            self._lib.TessBaseAPIClear(self._handle)
+
+    def image_to_data(self, image: np.ndarray) -> Dict[str, List]:
+        """Word boxes and confidences, like pytesseract.image_to_data(output_type=Output.DICT)."""
+        try:
+            self._recognize(image)
+            tsv = self._take_text(self._lib.TessBaseAPIGetTsvText(self._handle, 0))
+        finally:
+            self._lib.TessBaseAPIClear(self._handle)
+
+        data: Dict[str, List] = {column: [] for column in TSV_COLUMNS}
+        for line in tsv.splitlines():
+            fields = line.split('\t', len(TSV_COLUMNS) - 1)
+            if len(fields) < len(TSV_COLUMNS) - 1:
+                continue
+            fields += [''] * (len(TSV_COLUMNS) - len(fields))
+            for column, value in zip(TSV_COLUMNS, fields):
+                if column == 'text':
+                    data[column].append(value)
+                elif column == 'conf':
+                    data[column].append(float(value))
+                else:
+                    data[column].append(int(value))
+        return data
+
+    def close(self):
+        """Free the engine. Called automatically when it is garbage collected."""
+        if self._handle is not None:
+            self._lib.TessBaseAPIEnd(self._handle)
+            self._lib.TessBaseAPIDelete(self._handle)
+            self._handle = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,35 @@
+import asyncio
+import os
+
+import pytest
+
+
+def test_disconnect_cancels_extraction_before_deleting_the_upload(tmp_path, monkeypatch):
+    pytest.importorskip('fastapi')
+    monkeypatch.setenv('GEMINI_API_KEY', os.getenv('GEMINI_API_KEY', 'test'))
+    main = pytest.importorskip('main')
+    upload = tmp_path / 'upload.pdf'
+    upload.write_bytes(b'%PDF')
+    seen = {}
+
+    async def slow_extract_upload(source, filename, **callbacks):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # Still there while the extraction winds down
+            seen['upload_during_cancel'] = os.path.exists(source)
+            raise
+
+    monkeypatch.setattr(main, 'extract_upload', slow_extract_upload)
+
+    async def scenario():
+        events = main.stream_analysis_events(str(upload), upload.name, 'English')
+        await events.__anext__()
+        # The client disconnects while waiting for the first page
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(events.__anext__(), timeout=0.05)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert seen == {'upload_during_cancel': True}
+    assert not upload.exists()
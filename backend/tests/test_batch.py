@@ -0,0 +1,46 @@
+import asyncio
+import io
+import os
+import zipfile
+
+import pytest
+
+import batch
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+
+def test_unpack_zip_counts_what_the_batch_already_holds(tmp_path):
+    archive = tmp_path / 'docs.zip'
+    make_zip(archive, {'a.pdf': b'x' * 60})
+    assert len(batch.unpack_zip(str(archive), str(tmp_path), max_bytes=100, used_bytes=30)) == 1
+    with pytest.raises(ValueError):
+        batch.unpack_zip(str(archive), str(tmp_path), max_bytes=100, used_bytes=50)
+
+
+def test_batch_limit_covers_the_whole_request(tmp_path, monkeypatch):
+    pytest.importorskip('fastapi')
+    monkeypatch.setenv('GEMINI_API_KEY', os.getenv('GEMINI_API_KEY', 'test'))
+    main = pytest.importorskip('main')
+    from fastapi import HTTPException, UploadFile
+
+    monkeypatch.setattr(main, 'BATCH_MAX_BYTES', 100)
+    archive = io.BytesIO()
+    make_zip(archive, {'a.pdf': b'x' * 40})
+
+    def uploads():
+        # Each file is far below MAX_UPLOAD_MB, but together they are over the batch limit
+        return [UploadFile(io.BytesIO(b'y' * 40), filename='one.pdf'),
+                UploadFile(io.BytesIO(archive.getvalue()), filename='docs.zip'),
+                UploadFile(io.BytesIO(b'z' * 40), filename='two.pdf')]
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.save_batch_uploads(uploads(), str(tmp_path)))
+    assert error.value.status_code == 413
+
+    monkeypatch.setattr(main, 'BATCH_MAX_BYTES', 1000)
+    assert len(asyncio.run(main.save_batch_uploads(uploads(), str(tmp_path)))) == 3
@@ -0,0 +1,114 @@
+import json
+import os
+
+import pytest
+
+from document_classifier import DEFAULT_EXAMPLES_PATH, LEGAL, NOT_LEGAL, DocumentTypeClassifier
+from llm_pipeline import ConcurrentAnalysisPipeline
+
+HELDOUT_PATH = os.path.join(os.path.dirname(DEFAULT_EXAMPLES_PATH), 'document_type_heldout.json')
+
+WILL = ("I, Samuel Ortiz, of Austin, Texas, declare this my will and revoke all prior wills. I name my "
+        "brother as guardian of my minor children. All my property I leave to my wife Maria.")
+OFFER_LETTER = ("Dear Ms. Patel, We are pleased to offer you the position of Senior Analyst, starting on "
+                "3 March. Your annual salary will be $92,000. Your employment is at-will. This offer is "
+                "contingent upon verification of your eligibility to work. Sincerely, Human Resources")
+SPANISH_LEASE = ("CONTRATO DE ARRENDAMIENTO. Entre el arrendador Juan Pérez y el arrendatario Ana López se "
+                 "celebra el presente contrato. El arrendatario pagará una renta mensual de 800 euros.")
+ENGLISH_LEASE = ("RESIDENTIAL LEASE AGREEMENT. This Lease Agreement is made by and between the Landlord and "
+                 "the Tenant. The Tenant shall pay the rent on the first day of each month. Either party "
+                 "may terminate this Agreement upon thirty days written notice. Governed by the laws of Spain.")
+RECIPE = ("How to Make Banana Bread. Ingredients: 3 ripe bananas, 1 cup sugar, 1 egg, 1.5 cups flour. "
+          "Preheat the oven. Mash the bananas, mix in the remaining ingredients and bake for 60 minutes.")
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return DocumentTypeClassifier.from_examples()
+
+
+@pytest.mark.parametrize('text', [WILL, OFFER_LETTER, SPANISH_LEASE])
+def test_legal_documents_are_never_screened_out(classifier, text):
+    assert classifier.classify(text)[0] != NOT_LEGAL
+
+
+def test_heldout_set_has_no_confident_mistakes(classifier):
+    with open(HELDOUT_PATH, encoding='utf-8') as f:
+        examples = json.load(f)
+    for example in examples:
+        label, probability = classifier.classify(example['text'])
+        assert label in (None, example['label']), (example['text'][:40], probability)
+
+
+class FakeAnalyzer:
+    """Records the calls ConcurrentAnalysisPipeline makes, with canned answers."""
+
+    def __init__(self, classifier, language='English', model_type=LEGAL, translation=None):
+        self.classifier = classifier
+        self.language = language
+        self.model_type = model_type
+        self.translation = translation
+        self.calls = []
+
+    def detect_language(self, text):
+        return self.language
+
+    def _check_extraction_quality(self, text):
+        return None
+
+    def classify_document_locally(self, text):
+        return self.classifier.classify(text)[0]
+
+    def detect_document_type(self, text, use_local=True):
+        self.calls.append('detect_document_type')
+        return self.model_type
+
+    def translate_document(self, text, language):
+        self.calls.append('translate_document')
+        return self.translation
+
+    def _run_analysis_prompt(self, text, language):
+        self.calls.append('analysis')
+        return {'document_type': 'analysed'}
+
+    def _not_legal_result(self):
+        return {'document_type': NOT_LEGAL}
+
+
+def run_pipeline(analyzer, text):
+    pipeline = ConcurrentAnalysisPipeline(analyzer, max_workers=2)
+    try:
+        return pipeline.run(text)
+    finally:
+        pipeline.shutdown()
+
+
+def test_local_not_legal_is_confirmed_by_the_model(classifier):
+    assert classifier.classify(RECIPE)[0] == NOT_LEGAL
+    analyzer = FakeAnalyzer(classifier, model_type=LEGAL)
+    outcome = run_pipeline(analyzer, RECIPE)
+    assert analyzer.calls[0] == 'detect_document_type'
+    assert outcome['analysis'] == {'document_type': 'analysed'}
+
+
+def test_local_not_legal_agreed_by_the_model_skips_analysis(classifier):
+    analyzer = FakeAnalyzer(classifier, model_type=NOT_LEGAL)
+    outcome = run_pipeline(analyzer, RECIPE)
+    assert analyzer.calls == ['detect_document_type']
+    assert outcome['analysis'] == {'document_type': NOT_LEGAL}
+
+
+def test_confident_legal_skips_the_model_type_check(classifier):
+    assert classifier.classify(ENGLISH_LEASE)[0] == LEGAL
+    analyzer = FakeAnalyzer(classifier, model_type=NOT_LEGAL)
+    outcome = run_pipeline(analyzer, ENGLISH_LEASE)
+    assert 'detect_document_type' not in analyzer.calls
+    assert outcome['analysis'] == {'document_type': 'analysed'}
+
+
+def test_non_english_text_is_screened_after_translation(classifier):
+    analyzer = FakeAnalyzer(classifier, language='Spanish', model_type=NOT_LEGAL, translation=ENGLISH_LEASE)
+    outcome = run_pipeline(analyzer, SPANISH_LEASE)
+    # The translation is confidently legal, so the model's type answer is not used
+    assert outcome['analysis'] == {'document_type': 'analysed'}
+    assert outcome['analysis_text'] == ENGLISH_LEASE
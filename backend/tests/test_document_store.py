@@ -0,0 +1,34 @@
+import pytest
+
+from document_store import DocumentSessionStore
+
+pytest.importorskip('numpy')
+
+from retrieval import BM25Index  # noqa: E402
+
+
+def test_analysis_counts_towards_the_size_bound():
+    store = DocumentSessionStore(max_documents=10, max_bytes=2000)
+    first = store.create('short text', analysis={'summary': 'x' * 1500})
+    assert store.stats()['bytes'] > 1500
+
+    store.create('short text', analysis={'summary': 'y' * 1500})
+    # Both texts are tiny, but the two analyses do not fit together
+    assert store.get(first) is None
+    assert store.stats()['documents'] == 1
+
+
+def test_qa_index_is_counted_when_it_is_added():
+    store = DocumentSessionStore(max_documents=10, max_bytes=1024 * 1024)
+    text = '\n\n'.join(f'{n}. The tenant shall pay clause {n} charges monthly.' for n in range(300))
+    older = store.create('another document')
+    document_id = store.create(text)
+    before = store.stats()['bytes']
+
+    index = BM25Index.from_text(text, 400)
+    store.update(document_id, qa_index=index)
+    assert store.stats()['bytes'] >= before + index.approximate_size()
+
+    store.update(document_id, qa_index=None)
+    assert store.stats()['bytes'] == before
+    assert store.get(older) is not None
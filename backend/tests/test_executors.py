@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+fitz = pytest.importorskip('fitz')
+
+from executors import BackgroundExecutor  # noqa: E402
+from text_extractor import TextExtractor  # noqa: E402
+
+
+def make_pdf(path: str, pages: int = 3):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {number + 1}. The Tenant shall pay the rent on the first day of the month.")
+    doc.save(path)
+    doc.close()
+
+
+def test_callbacks_are_relayed_from_the_process_pool(tmp_path):
+    path = str(tmp_path / 'lease.pdf')
+    make_pdf(path)
+    progress, pages = [], []
+
+    def on_progress(done, total):
+        progress.append((done, total))
+
+    def on_page(page_result):
+        pages.append(page_result['page_number'])
+
+    async def scenario():
+        executor = BackgroundExecutor(TextExtractor(), extraction_workers=1)
+        try:
+            # The in-process extractor must not be used when there is a pool
+            executor.extractor = None
+            return await executor.extract_text(path, output_format='detailed',
+                                               progress_callback=on_progress, page_callback=on_page)
+        finally:
+            executor.shutdown()
+
+    result = asyncio.run(scenario())
+    assert 'Page 3' in result['combined_text']
+    assert progress == [(3, 3)]
+    assert sorted(pages) == [1, 2, 3]
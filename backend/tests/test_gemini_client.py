@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('google.api_core')
+
+from gemini_client import GeminiTimeoutError, ResilientModel, SharedTokenBucket  # noqa: E402
+
+
+def test_shared_bucket_is_one_budget_across_instances(tmp_path):
+    path = str(tmp_path / 'rate.sqlite3')
+    # Two instances stand in for two worker processes opening the same file
+    first = SharedTokenBucket(path, rate=0.01, capacity=2)
+    second = SharedTokenBucket(path, rate=0.01, capacity=2)
+    try:
+        assert first._take() == 0
+        assert second._take() == 0
+        assert first._take() > 0
+        assert second._take() > 0
+    finally:
+        first.close()
+        second.close()
+
+
+def test_shared_bucket_refills_at_its_rate(tmp_path):
+    bucket = SharedTokenBucket(str(tmp_path / 'rate.sqlite3'), rate=50, capacity=1)
+    try:
+        assert bucket.acquire() == 0
+        waited = bucket.acquire()
+        assert 0 < waited < 0.5
+    finally:
+        bucket.close()
+
+
+class HangingModel:
+    """generate_content blocks on the first call until released; later calls answer at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        if self.calls == 1:
+            self.release.wait(5)
+        return prompt
+
+
+def test_abandoned_request_gives_its_slot_back():
+    model = HangingModel()
+    client = ResilientModel(model, timeout_seconds=0.2, max_retries=0, max_concurrency=1)
+    try:
+        with pytest.raises(GeminiTimeoutError):
+            client.generate_content("slow")
+        assert client.stats()['abandoned_in_flight'] == 1
+        # The only slot is free again although the first call is still running
+        assert client.generate_content("fast") == "fast"
+
+        model.release.set()
+        for _ in range(50):
+            if client.stats()['abandoned_in_flight'] == 0:
+                break
+            time.sleep(0.01)
+        stats = client.stats()
+        assert stats['abandoned'] == 1 and stats['abandoned_in_flight'] == 0
+    finally:
+        model.release.set()
+        client.shutdown()
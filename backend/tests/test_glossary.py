@@ -0,0 +1,11 @@
+from glossary import LegalGlossary
+
+
+def test_governing_law_and_jurisdiction_are_separate_terms():
+    glossary = LegalGlossary.load()
+    found = {entry['term']: entry for entry in glossary.find_terms(
+        "This Agreement is governed by the laws of England. "
+        "The parties submit to the exclusive jurisdiction of the courts of London."
+    )}
+    assert set(found) == {'governing law', 'jurisdiction'}
+    assert found['governing law']['definition'] != found['jurisdiction']['definition']
@@ -0,0 +1,62 @@
+import cv2
+import numpy as np
+import pytest
+
+from image_normalization import ImageNormalizer
+
+
+def bordered_form(dpi: int = 100) -> np.ndarray:
+    """A Letter page with a heading, a thick-bordered form box and a signature line below it."""
+    width, height = int(8.5 * dpi), int(11 * dpi)
+    page = np.full((height, width, 3), 250, np.uint8)
+    cv2.putText(page, "APPLICATION FOR TENANCY", (dpi, dpi), cv2.FONT_HERSHEY_SIMPLEX, dpi / 100, (20, 20, 20), 2)
+    top_left, bottom_right = (dpi // 2, int(1.5 * dpi)), (width - dpi // 2, int(8.5 * dpi))
+    cv2.rectangle(page, top_left, bottom_right, (0, 0, 0), 4)
+    for row in range(1, 7):
+        y = top_left[1] + row * dpi
+        cv2.line(page, (top_left[0], y), (bottom_right[0], y), (0, 0, 0), 2)
+        cv2.putText(page, f"Field {row}: ________", (top_left[0] + 20, y - dpi // 3),
+                    cv2.FONT_HERSHEY_SIMPLEX, dpi / 150, (20, 20, 20), 1)
+    cv2.putText(page, "Signature of applicant: ____________", (dpi, int(9.5 * dpi)),
+                cv2.FONT_HERSHEY_SIMPLEX, dpi / 150, (20, 20, 20), 1)
+    return page
+
+
+def photo_of(page: np.ndarray) -> np.ndarray:
+    """The page lying slightly rotated on a dark table."""
+    h, w = page.shape[:2]
+    table = np.full((int(h * 1.3), int(h * 1.3 * 4 / 3), 3), 80, np.uint8)
+    matrix = cv2.getRotationMatrix2D((w / 2, h / 2), 3, 1.0)
+    matrix[:, 2] += [(table.shape[1] - w) / 2, (table.shape[0] - h) / 2]
+    mask = cv2.warpAffine(np.full((h, w), 255, np.uint8), matrix, table.shape[1::-1])
+    warped = cv2.warpAffine(page, matrix, table.shape[1::-1])
+    table[mask > 0] = warped[mask > 0]
+    return table
+
+
+def test_bordered_form_is_not_cropped_to_its_box():
+    form = bordered_form()
+    normalized, report = ImageNormalizer().normalize(form)
+    assert not report['page_cropped']
+    assert normalized.shape[:2] == form.shape[:2]
+
+
+def test_photo_is_cropped_to_the_page():
+    _, report = ImageNormalizer().normalize(photo_of(bordered_form()))
+    assert report['page_cropped']
+
+
+def test_crop_page_false_skips_the_page_search():
+    _, report = ImageNormalizer().normalize(photo_of(bordered_form()), crop_page=False)
+    assert not report['page_cropped']
+
+
+def test_pdf_pages_are_never_cropped(monkeypatch):
+    text_extractor = pytest.importorskip('text_extractor')
+    extractor = text_extractor.TextExtractor(normalize_images=True, ocr_mode='cascade')
+    monkeypatch.setattr(extractor, '_run_cascade', lambda variants, results: [])
+    photo = photo_of(bordered_form())
+
+    # extract_from_image_array OCRs rendered PDF pages and images in Word documents
+    assert not extractor.extract_from_image_array(photo)['normalization']['page_cropped']
+    assert extractor._extract_from_loaded_image(photo, 'photo.jpg')['normalization']['page_cropped']
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from job_queue import COMPLETED, QUEUED, RUNNING, InMemoryJobStore, JobManager, SQLiteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    store = InMemoryJobStore() if request.param == 'memory' else SQLiteJobStore(str(tmp_path / 'jobs.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_only_expired_leases_are_requeued(store):
+    alive = store.submit({'n': 1})
+    dead = store.submit({'n': 2})
+    store.claim_next('worker-a')
+    store.claim_next('worker-b')
+    time.sleep(0.02)
+    assert store.heartbeat(alive['id'], 'worker-a')
+
+    requeued = store.requeue_expired(time.time() - 0.01)
+    assert [job['id'] for job in requeued] == [dead['id']]
+    assert store.get(alive['id'])['status'] == RUNNING
+    assert store.get(dead['id'])['status'] == QUEUED
+    # worker-b lost its lease; a later claim gets the job with a new one
+    assert not store.heartbeat(dead['id'], 'worker-b')
+    assert store.claim_next('worker-c')['id'] == dead['id']
+
+
+class CountingStore(InMemoryJobStore):
+    def __init__(self):
+        super().__init__()
+        self.purges = 0
+
+    def purge_finished(self, older_than: float):
+        self.purges += 1
+        super().purge_finished(older_than)
+
+
+def test_manager_heartbeats_and_throttles_maintenance():
+    async def scenario():
+        store = CountingStore()
+        release = asyncio.Event()
+
+        async def handler(job, report_progress):
+            await release.wait()
+            return 'done'
+
+        manager = JobManager(store, handler, workers=1, poll_interval=0.01, lease_seconds=0.06,
+                             maintenance_interval=60, worker_id='me')
+        await manager.start()
+        job = manager.submit({})
+        await asyncio.sleep(0.15)
+        # Heartbeats kept the lease fresh for longer than lease_seconds
+        assert store.requeue_expired(time.time() - 0.06) == []
+        release.set()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+        return store.get(job['id']), store.purges
+
+    job, purges = asyncio.run(scenario())
+    assert job['status'] == COMPLETED and job['worker_id'] == 'me'
+    # Idle polling every 10 ms did not purge on every loop
+    assert purges == 1
+
+
+def test_job_interrupted_by_stop_is_finished_by_the_next_manager(store, monkeypatch):
+    # Both managers share the store; stop() must not close it under the second one
+    monkeypatch.setattr(store, 'close', lambda: None)
+
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def handler(job, report_progress):
+            started.set()
+            await release.wait()
+            return 'done'
+
+        first = JobManager(store, handler, workers=1, poll_interval=0.01, worker_id='first')
+        await first.start()
+        job = first.submit({})
+        await started.wait()
+        await first.stop()
+        assert store.get(job['id'])['status'] == QUEUED
+
+        release.set()
+        second = JobManager(store, handler, workers=1, poll_interval=0.01, worker_id='second')
+        await second.start()
+        for _ in range(100):
+            if store.get(job['id'])['status'] == COMPLETED:
+                break
+            await asyncio.sleep(0.01)
+        await second.stop()
+        return store.get(job['id'])
+
+    job = asyncio.run(scenario())
+    assert job['status'] == COMPLETED and job['worker_id'] == 'second'
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from pre_extraction import covered_fields, extract_facts, key_parties_prompt_field, merge_facts, _amount_value
+
+LEASE = (
+    'This Residential Lease Agreement ("Agreement") is made on January 5, 2024 ("Effective Date") '
+    'by and between John Smith ("Landlord") and Acme Holdings Ltd. ("Acme"). '
+    'The Landlord leases the apartment at 12 Main Street ("Premises") to Acme. '
+    'Confidential Information ("CI") shall not be disclosed. '
+    'Rent is $1,500 per month and a separate cleaning fee of $500 is due within 30 days.'
+)
+
+
+def test_defined_terms_are_not_parties():
+    roles = [party['role'] for party in extract_facts(LEASE)['parties']]
+    assert 'Agreement' not in roles
+    assert 'Effective Date' not in roles
+    assert 'Premises' not in roles
+    assert 'CI' not in roles
+
+
+def test_parties_from_roles_and_entities():
+    parties = {party['role']: party['name'] for party in extract_facts(LEASE)['parties']}
+    assert parties == {'Landlord': 'John Smith', 'Acme': 'Acme Holdings Ltd.'}
+
+
+def test_person_named_after_between_is_a_party():
+    text = 'This Agreement is entered into between Jane Roe ("Roe") and Richard Poe ("Poe").'
+    assert [party['role'] for party in extract_facts(text)['parties']] == ['Roe', 'Poe']
+
+
+def test_hereinafter_requires_party_context():
+    text = 'The leased flat (hereinafter the "Property") is let to Mary Major (hereinafter the "Tenant").'
+    assert [party['role'] for party in extract_facts(text)['parties']] == ['Tenant']
+
+
+def test_merge_keeps_model_parties_and_dates():
+    facts = extract_facts(LEASE)
+    analysis = {
+        'key_parties': ['John Smith (Landlord)', 'Bob Jones (Guarantor)'],
+        'important_dates': ['Lease starts 5 January 2024', 'Rent due on the 1st of each month'],
+        'financial_obligations': [],
+    }
+    merge_facts(analysis, facts)
+    assert analysis['key_parties'] == ['John Smith (Landlord)', 'Bob Jones (Guarantor)',
+                                       'Acme Holdings Ltd. (the Acme)']
+    # January 5, 2024 is the same date the model already listed; durations are not dates
+    assert analysis['important_dates'] == ['Lease starts 5 January 2024', 'Rent due on the 1st of each month']
+
+
+def test_merge_fills_fields_the_model_did_not_return():
+    facts = extract_facts(LEASE)
+    analysis = merge_facts({'financial_obligations': []}, facts)
+    assert analysis['key_parties'] == ['John Smith (the Landlord)', 'Acme Holdings Ltd. (the Acme)']
+    assert [entry.split(':')[0] for entry in analysis['important_dates']] == ['January 5, 2024']
+
+
+def test_amounts_are_compared_exactly():
+    facts = extract_facts(LEASE)
+    analysis = {'financial_obligations': [{'description': 'Monthly rent', 'amount': '$1,500'}]}
+    merge_facts(analysis, facts)
+    added = [item['amount'] for item in analysis['financial_obligations'] if item.get('source') == 'local_extraction']
+    assert added == ['$500']
+
+
+def test_amount_values():
+    assert _amount_value('$1,500.00') == Decimal('1500')
+    assert _amount_value('€ 1 500') == Decimal('1500')
+    assert _amount_value('Rs. 2 lakh') == Decimal('200000')
+    assert _amount_value('$2 million') == Decimal('2000000')
+
+
+def test_only_complete_parties_leave_the_prompt():
+    assert covered_fields(extract_facts(LEASE)) == {'key_parties'}
+    assert covered_fields(extract_facts('The Tenant ("Tenant") shall pay on March 1, 2024.')) == set()
+    assert covered_fields(None) == set()
+    assert key_parties_prompt_field(extract_facts(LEASE), "Parties") == ""
+    assert '"key_parties": ["Parties"]' in key_parties_prompt_field(None, "Parties")
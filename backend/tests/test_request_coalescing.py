@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+import pytest
+
+from request_coalescing import AsyncSingleFlight
+
+
+def test_progress_reaches_every_waiter():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+        first, second = [], []
+
+        async def work(report):
+            report(stage="extracting")
+            await release.wait()
+            report(stage="analyzing")
+            return "done"
+
+        leader = asyncio.create_task(flight.run('key', work, on_progress=lambda **f: first.append(f)))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run('key', work, on_progress=lambda **f: second.append(f)))
+        await asyncio.sleep(0)
+        release.set()
+        return await leader, await follower, first, second
+
+    leader, follower, first, second = asyncio.run(scenario())
+    assert leader == follower == "done"
+    assert first == [{'stage': 'extracting'}, {'stage': 'analyzing'}]
+    # The late joiner is first told where the shared work already is
+    assert second == [{'stage': 'extracting'}, {'stage': 'analyzing'}]
+
+
+def test_work_survives_a_cancelled_leader():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def work(report):
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.run('key', work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.run('key', work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(scenario()) == ("done", True)
+
+
+def test_shared_analysis_owns_its_upload(tmp_path, monkeypatch):
+    pytest.importorskip('fastapi')
+    monkeypatch.setenv('GEMINI_API_KEY', os.getenv('GEMINI_API_KEY', 'test'))
+    main = pytest.importorskip('main')
+    monkeypatch.setattr(main, 'analysis_coalescing', AsyncSingleFlight())
+
+    async def scenario():
+        release = asyncio.Event()
+        progress = []
+
+        async def fake_analyze_upload(source, filename, report_progress=None):
+            report_progress(stage="extracting")
+            await release.wait()
+            with open(source, 'rb') as f:
+                return {"filename": filename, "content": f.read()}
+
+        monkeypatch.setattr(main, 'analyze_upload', fake_analyze_upload)
+
+        # Two requests with their own temp files of the same content, as /analyze saves them
+        leader_path, follower_path = tmp_path / 'a.pdf', tmp_path / 'b.pdf'
+        leader_path.write_bytes(b'%PDF contract')
+        follower_path.write_bytes(b'%PDF contract')
+
+        async def request(path, **kwargs):
+            try:
+                return await main.run_analysis(str(path), path.name, **kwargs)
+            finally:
+                main.discard_upload(str(path))
+
+        leader = asyncio.create_task(request(leader_path))
+        await asyncio.sleep(0.05)
+        follower = asyncio.create_task(request(follower_path, report_progress=lambda **f: progress.append(f)))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        await asyncio.sleep(0.05)
+        assert not leader_path.exists()
+        release.set()
+        return await follower, progress
+
+    result, progress = asyncio.run(scenario())
+    assert result == {"filename": "b.pdf", "content": b'%PDF contract'}
+    assert progress == [{'stage': 'extracting'}]
+    # The analysis' own link to the upload is gone with it
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,31 @@
+import pytest
+
+from extraction_cache import ExtractionCache
+from response_cache import RESPONSE_CACHE_TABLE, ResponseCache
+
+
+def test_response_tier_shares_a_file_but_not_a_table(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    extraction = ExtractionCache(path, max_bytes=1024 * 1024, ttl_seconds=3600)
+    disk = ExtractionCache(path, max_bytes=200, ttl_seconds=3600, table=RESPONSE_CACHE_TABLE)
+    responses = ResponseCache(max_entries=1, disk=disk)
+    try:
+        extraction.put('doc', {'text': 'extracted'})
+        for n in range(5):
+            responses.put(f'prompt-{n}', 'x' * 60)
+
+        # The response tier evicted down to its own bound without touching extraction entries
+        assert disk.stats()['bytes'] <= 200
+        assert extraction.get('doc') == {'text': 'extracted'}
+        assert extraction.stats()['entries'] == 1
+
+        disk.clear()
+        assert extraction.get('doc') == {'text': 'extracted'}
+    finally:
+        extraction.close()
+        disk.close()
+
+
+def test_table_name_must_be_an_identifier(tmp_path):
+    with pytest.raises(ValueError):
+        ExtractionCache(str(tmp_path / 'cache.sqlite3'), table='x; DROP TABLE y')
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+text_extractor = pytest.importorskip('text_extractor')
+
+
+def test_concurrent_requests_share_one_page_pool():
+    extractor = text_extractor.TextExtractor(page_workers=2)
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def get_pool():
+        barrier.wait()
+        pools.append(extractor._get_page_pool())
+
+    threads = [threading.Thread(target=get_pool) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    try:
+        assert len({id(pool) for pool in pools}) == 1
+    finally:
+        extractor.close()
+    assert extractor._page_pool is None
+
+
+def test_discarding_a_replaced_pool_keeps_the_new_one():
+    extractor = text_extractor.TextExtractor(page_workers=2)
+    old = extractor._get_page_pool()
+    extractor._discard_page_pool(old)
+    new = extractor._get_page_pool()
+    # A second request that saw the old pool break must not shut down the fresh one
+    extractor._discard_page_pool(old)
+    try:
+        assert new is not old and extractor._page_pool is new
+    finally:
+        extractor.close()
+
+
+def test_close_keeps_the_page_pool_lock():
+    extractor = text_extractor.TextExtractor(page_workers=2)
+    lock = extractor._page_pool_lock
+    extractor._get_page_pool()
+    extractor.close()
+    # Threads waiting on the lock during close() must still exclude later callers
+    assert extractor._page_pool_lock is lock
@@ -2,13 +2,94 @@ import cv2
 import numpy as np
 from PIL import Image
 import pytesseract
-import easyocr
 import fitz  # PyMuPDF
 from pdf2image import convert_from_path
 import os
+import time
 import logging
-from typing import List, Dict, Union, Optional
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Dict, Union, Optional, Tuple
 import json
+import hashlib
+from extraction_cache import ExtractionCache, file_sha256
+from docx_extractor import extract_docx
+from image_normalization import ImageNormalizer
+from preprocessing import PREPROCESS_VARIANTS, PreprocessedVariants, PreprocessingPipeline
+import ocr_engines
+
+# File extensions handled by extract_from_image
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']
+
+# File extensions handled by extract_from_docx
+DOCX_EXTENSIONS = ['.docx']
+
+# Named Tesseract configurations used by the OCR passes
+TESSERACT_CONFIGS = {
+    'default': '',
+    'handwriting': '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz ',
+}
+
+# Pass order for cascade mode ("engine:variant[:config]"), cheapest and most reliable first
+DEFAULT_CASCADE_ORDER = [
+    'tesseract:gray:default',
+    'tesseract:threshold:default',
+    'tesseract:enhanced:default',
+    'tesseract:morph:default',
+    'tesseract:original:default',
+    'tesseract:blurred:default',
+    'easyocr:original',
+    'easyocr:threshold',
+    'tesseract:gray:handwriting',
+    'tesseract:threshold:handwriting',
+    'tesseract:enhanced:handwriting',
+    'tesseract:morph:handwriting',
+    'tesseract:original:handwriting',
+    'tesseract:blurred:handwriting',
+]
+
+# Zoom factor used when rasterising PDF pages for OCR
+PDF_RENDER_ZOOM = 2
+
+
+def available_cpu_count() -> int:
+    """Number of CPU cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def pixmap_to_array(pix: "fitz.Pixmap") -> np.ndarray:
+    """
+    Convert a PyMuPDF Pixmap to an OpenCV-style image array without a PNG
+    encode/decode round trip.
+    
+    The pixmap's sample buffer is wrapped in place and converted straight to
+    BGR (or kept as a single grayscale channel). An alpha channel is dropped and
+    other colorspaces (e.g. CMYK) are converted to RGB first. The returned array
+    owns its memory, so it stays valid after the pixmap is freed.
+    """
+    if pix.colorspace is not None and pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    
+    channels = pix.n
+    samples = getattr(pix, 'samples_mv', None) or pix.samples
+    buffer = np.frombuffer(samples, dtype=np.uint8)
+    
+    # Rows can be padded beyond width * channels
+    rows = buffer.reshape(pix.height, pix.stride)[:, :pix.width * channels]
+    pixels = rows.reshape(pix.height, pix.width, channels)
+    
+    if channels == 1:
+        return pixels[:, :, 0].copy()
+    if channels == 2:  # gray + alpha
+        return np.ascontiguousarray(pixels[:, :, 0])
+    if channels == 3:
+        return cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR)
+    return cv2.cvtColor(pixels, cv2.COLOR_RGBA2BGR)
+
 
 class TextExtractor:
     """
@@ -16,38 +97,97 @@ class TextExtractor:
     including handwritten content using multiple OCR engines.
     """
     
-    def __init__(self):
-        """Initialize the TextExtractor with OCR engines."""
+    def __init__(self, ocr_mode: Optional[str] = None, cascade_order: Optional[List[str]] = None,
+                 cascade_threshold: Optional[float] = None, cascade_min_chars: int = 20,
+                 parallel_pages: Optional[bool] = None, page_workers: Optional[int] = None,
+                 max_pages_in_flight: Optional[int] = None, cache: Optional[ExtractionCache] = None,
+                 docx_ocr_images: Optional[bool] = None, normalize_images: Optional[bool] = None,
+                 tesseract_backend: Optional[str] = None):
+        """
+        Initialize the TextExtractor. OCR engines are shared by every extractor
+        in the process and loaded on first use (see ocr_engines).
+        
+        Args:
+            ocr_mode: 'exhaustive' runs every OCR pass and keeps the longest text,
+                'cascade' runs passes in order and stops at the first one that clears
+                cascade_threshold. Defaults to the OCR_MODE environment variable.
+            cascade_order: Pass specs ("engine:variant[:config]") tried in cascade mode
+            cascade_threshold: Quality score (0-1) at which cascade mode stops early.
+                Defaults to the OCR_CASCADE_THRESHOLD environment variable, or 0.8.
+            cascade_min_chars: Minimum text length for a pass to end the cascade
+            parallel_pages: OCR scanned PDF pages in a process pool. Defaults to the
+                PDF_PARALLEL_OCR environment variable, or False.
+            page_workers: Size of the page OCR pool. Defaults to PDF_OCR_WORKERS, or
+                the number of available cores.
+            max_pages_in_flight: Upper bound on pages submitted to the pool at once,
+                which bounds memory. Defaults to PDF_OCR_MAX_IN_FLIGHT, or 2 x page_workers.
+            cache: Optional content-hash cache consulted by extract_text
+            docx_ocr_images: OCR images embedded in Word documents when they look like
+                they carry text. Defaults to the DOCX_OCR_IMAGES environment variable, or True.
+            normalize_images: Crop to the page, resample to IMAGE_TARGET_DPI and deskew
+                each image once before OCR (see image_normalization). Only image
+                uploads are cropped to the page; rendered PDF pages and images in
+                Word documents are not. Defaults to the IMAGE_NORMALIZE environment
+                variable, or True.
+            tesseract_backend: 'subprocess' runs the tesseract executable per call
+                (pytesseract), 'api' keeps an in-process engine per thread and
+                configuration (libtesseract, see tesseract_api) and falls back to the
+                executable where it is unavailable. Defaults to the TESSERACT_BACKEND
+                environment variable, or 'subprocess'.
+        """
         self.setup_logging()
         
-        # Initialize EasyOCR reader (supports handwritten text better)
-        try:
-            self.easyocr_reader = easyocr.Reader(['en'])
-            self.logger.info("EasyOCR initialized successfully")
-        except Exception as e:
-            self.logger.error(f"Failed to initialize EasyOCR: {e}")
-            self.easyocr_reader = None
+        self.ocr_mode = (ocr_mode or os.getenv('OCR_MODE', 'exhaustive')).lower()
+        if self.ocr_mode not in ('exhaustive', 'cascade'):
+            raise ValueError(f"Unsupported OCR mode: {self.ocr_mode}")
+        self.tesseract_backend = (tesseract_backend or os.getenv('TESSERACT_BACKEND', 'subprocess')).lower()
+        if self.tesseract_backend not in ('subprocess', 'api'):
+            raise ValueError(f"Unsupported Tesseract backend: {self.tesseract_backend}")
+        self.cascade_order = list(cascade_order or DEFAULT_CASCADE_ORDER)
+        for spec in self.cascade_order:
+            self._parse_pass(spec)
+        if cascade_threshold is None:
+            cascade_threshold = float(os.getenv('OCR_CASCADE_THRESHOLD', '0.8'))
+        self.cascade_threshold = cascade_threshold
+        self.cascade_min_chars = cascade_min_chars
         
-        # Set Tesseract path (you may need to adjust this based on your installation)
-        # For Windows: Download from https://github.com/UB-Mannheim/tesseract/wiki
-        try:
-            # Common Windows paths for Tesseract
-            possible_paths = [
-                r'C:\Program Files\Tesseract-OCR\tesseract.exe',
-                r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
-                r'C:\Users\{}\AppData\Local\Tesseract-OCR\tesseract.exe'.format(os.getenv('USERNAME'))
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    pytesseract.pytesseract.tesseract_cmd = path
-                    break
-            
-            # Test Tesseract
-            pytesseract.get_tesseract_version()
-            self.logger.info("Tesseract initialized successfully")
-        except Exception as e:
-            self.logger.warning(f"Tesseract setup issue: {e}")
+        if parallel_pages is None:
+            parallel_pages = os.getenv('PDF_PARALLEL_OCR', 'false').lower() in ('1', 'true', 'yes')
+        self.parallel_pages = parallel_pages
+        self.page_workers = max(1, page_workers or int(os.getenv('PDF_OCR_WORKERS', '0')) or available_cpu_count())
+        self.max_pages_in_flight = max(1, max_pages_in_flight or int(os.getenv('PDF_OCR_MAX_IN_FLIGHT', '0'))
+                                       or 2 * self.page_workers)
+        self._page_pool = None
+        # Requests on several threads share the page pool (and may replace a broken one)
+        self._page_pool_lock = threading.Lock()
+        self.cache = cache
+        
+        if docx_ocr_images is None:
+            docx_ocr_images = os.getenv('DOCX_OCR_IMAGES', 'true').lower() in ('1', 'true', 'yes')
+        self.docx_ocr_images = docx_ocr_images
+        
+        if normalize_images is None:
+            normalize_images = os.getenv('IMAGE_NORMALIZE', 'true').lower() in ('1', 'true', 'yes')
+        self.normalizer = ImageNormalizer.from_env() if normalize_images else None
+        
+        # Preprocessing buffers are reused from image to image, so each thread gets its own pipeline
+        self._local = threading.local()
+        
+        # OCR engines are loaded lazily, once per process, by the shared registry
+        self.easyocr_languages = ['en']
+    
+    @property
+    def easyocr_reader(self):
+        """Shared EasyOCR reader (supports handwritten text better), or None if unavailable."""
+        return ocr_engines.get_easyocr_reader(self.easyocr_languages)
+    
+    @property
+    def preprocessing(self) -> PreprocessingPipeline:
+        """This thread's preprocessing pipeline."""
+        pipeline = getattr(self._local, 'pipeline', None)
+        if pipeline is None:
+            pipeline = self._local.pipeline = PreprocessingPipeline()
+        return pipeline
     
     def setup_logging(self):
         """Set up logging configuration."""
@@ -62,37 +202,28 @@ class TextExtractor:
         Preprocess image to improve OCR accuracy.
         Returns multiple versions of the processed image.
         """
-        processed_images = []
-        
-        # Original image
-        processed_images.append(image)
-        
-        # Convert to grayscale
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = image
-        processed_images.append(gray)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-        processed_images.append(blurred)
-        
-        # Apply threshold to get binary image
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        processed_images.append(thresh)
-        
-        # Morphological operations to clean up the image
-        kernel = np.ones((2, 2), np.uint8)
-        morph = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        processed_images.append(morph)
-        
-        # Enhance contrast
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
-        processed_images.append(enhanced)
-        
-        return processed_images
+        variants = self.preprocessing.variants(image, reuse_buffers=False)
+        return [variants[name] for name in PREPROCESS_VARIANTS]
+    
+    def _tesseract_engine(self, config: str):
+        """The in-process engine for config when the 'api' backend is on and available, else None."""
+        if self.tesseract_backend != 'api':
+            return None
+        return ocr_engines.get_tesseract_api(config)
+    
+    def _tesseract_to_string(self, image: np.ndarray, config: str = '') -> str:
+        engine = self._tesseract_engine(config)
+        if engine is not None:
+            return engine.image_to_string(image)
+        ocr_engines.ensure_tesseract()
+        return pytesseract.image_to_string(image, config=config)
+    
+    def _tesseract_to_data(self, image: np.ndarray, config: str = '') -> Dict[str, List]:
+        engine = self._tesseract_engine(config)
+        if engine is not None:
+            return engine.image_to_data(image)
+        ocr_engines.ensure_tesseract()
+        return pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
     
     def extract_text_tesseract(self, image: np.ndarray, config: str = '') -> Dict[str, str]:
         """Extract text using Tesseract OCR with different configurations."""
@@ -100,7 +231,7 @@ class TextExtractor:
         
         # Default configuration
         try:
-            text = pytesseract.image_to_string(image, config=config)
+            text = self._tesseract_to_string(image, config)
             results['default'] = text.strip()
         except Exception as e:
             self.logger.error(f"Tesseract default extraction failed: {e}")
@@ -108,8 +239,7 @@ class TextExtractor:
         
         # Configuration for better handwriting recognition
         try:
-            handwriting_config = '--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz '
-            text = pytesseract.image_to_string(image, config=handwriting_config)
+            text = self._tesseract_to_string(image, TESSERACT_CONFIGS['handwriting'])
             results['handwriting'] = text.strip()
         except Exception as e:
             self.logger.error(f"Tesseract handwriting extraction failed: {e}")
@@ -133,35 +263,124 @@ class TextExtractor:
             self.logger.error(f"EasyOCR extraction failed: {e}")
             return ""
     
-    def extract_from_image(self, image_path: str) -> Dict[str, str]:
+    def _tesseract_with_confidence(self, image: np.ndarray, config: str = '') -> Tuple[str, float]:
         """
-        Extract text from an image file using multiple methods.
+        Run a single Tesseract pass and return its text with a 0-1 confidence.
+        The confidence is the mean word confidence weighted by word length.
         """
-        self.logger.info(f"Processing image: {image_path}")
+        try:
+            data = self._tesseract_to_data(image, config)
+        except Exception as e:
+            self.logger.error(f"Tesseract extraction failed: {e}")
+            return "", 0.0
         
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image file not found: {image_path}")
+        lines = {}
+        weighted_conf = 0.0
+        total_chars = 0
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            if not word:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+            conf = float(data['conf'][i])
+            if conf >= 0:
+                weighted_conf += (conf / 100.0) * len(word)
+                total_chars += len(word)
         
-        # Load image
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
+        text = '\n'.join(' '.join(words) for words in lines.values())
+        confidence = weighted_conf / total_chars if total_chars else 0.0
+        return text, confidence
+    
+    def _easyocr_with_confidence(self, image: np.ndarray) -> Tuple[str, float]:
+        """Run a single EasyOCR pass and return its text with a 0-1 confidence."""
+        if self.easyocr_reader is None:
+            return "", 0.0
         
-        # Preprocess image
-        processed_images = self.preprocess_image(image)
+        try:
+            detections = self.easyocr_reader.readtext(image)
+        except Exception as e:
+            self.logger.error(f"EasyOCR extraction failed: {e}")
+            return "", 0.0
         
-        results = {
-            'file_path': image_path,
-            'tesseract_results': {},
-            'easyocr_results': {},
-            'combined_text': ''
-        }
+        text_parts = []
+        weighted_conf = 0.0
+        total_chars = 0
+        for (bbox, text, confidence) in detections:
+            if confidence > 0.1:  # Same cut-off as extract_text_easyocr
+                text_parts.append(text)
+                weighted_conf += confidence * len(text)
+                total_chars += len(text)
+        
+        return ' '.join(text_parts), (weighted_conf / total_chars if total_chars else 0.0)
+    
+    def _parse_pass(self, spec: str) -> Tuple[str, str, Optional[str]]:
+        """Split an "engine:variant[:config]" pass spec and validate its parts."""
+        parts = spec.split(':')
+        engine = parts[0]
+        variant = parts[1] if len(parts) > 1 else 'original'
+        config = parts[2] if len(parts) > 2 else None
+        
+        if engine not in ('tesseract', 'easyocr') or variant not in PREPROCESS_VARIANTS or len(parts) > 3:
+            raise ValueError(f"Invalid OCR pass: {spec}")
+        if engine == 'tesseract':
+            config = config or 'default'
+            if config not in TESSERACT_CONFIGS:
+                raise ValueError(f"Unknown Tesseract config in OCR pass: {spec}")
+        elif config is not None:
+            raise ValueError(f"EasyOCR passes do not take a config: {spec}")
+        return engine, variant, config
+    
+    def _score_pass(self, text: str, confidence: float) -> float:
+        """Quality score (0-1) of an OCR pass: engine confidence scaled by the share of clean characters."""
+        if not text or not text.strip():
+            return 0.0
+        clean = sum(c.isalnum() or c.isspace() for c in text)
+        return confidence * (clean / len(text))
+    
+    def _run_ocr_passes(self, image: np.ndarray, results: Dict, crop_page: bool = False) -> List[str]:
+        """
+        Run the configured OCR strategy on an image.
         
+        Fills the tesseract/easyocr result dicts in results and records every pass
+        that ran, with its timing, under 'ocr_passes'. The image is normalised
+        first, once for all passes; what was done is recorded under 'normalization'.
+        The variants the passes needed and the memory they took are recorded
+        under 'preprocessing'.
+        
+        Args:
+            image: Image to OCR
+            results: Result dict to fill
+            crop_page: Look for a page outline to crop to (photos and scans only)
+        
+        Returns:
+            Candidate texts, best first
+        """
+        if self.normalizer is not None:
+            image, results['normalization'] = self.normalizer.normalize(image, crop_page=crop_page)
+        variants = self.preprocessing.variants(image)
+        if self.ocr_mode == 'cascade':
+            best_texts = self._run_cascade(variants, results)
+        else:
+            best_texts = self._run_exhaustive(variants, results)
+        results['preprocessing'] = {
+            'variants_computed': variants.computed,
+            'image_bytes': image.nbytes,
+            'variant_bytes': variants.nbytes
+        }
+        return best_texts
+    
+    def _run_exhaustive(self, variants: PreprocessedVariants, results: Dict) -> List[str]:
+        """Run Tesseract on every preprocessing variant plus two EasyOCR passes; longest text first."""
+        passes = results.setdefault('ocr_passes', [])
         best_texts = []
         
         # Try Tesseract on different processed versions
-        for i, proc_img in enumerate(processed_images):
+        for i, name in enumerate(PREPROCESS_VARIANTS):
+            proc_img = variants[name]
+            start = time.perf_counter()
             tesseract_result = self.extract_text_tesseract(proc_img)
+            passes.append({'pass': f'tesseract:{name}', 'seconds': round(time.perf_counter() - start, 4)})
             results['tesseract_results'][f'version_{i}'] = tesseract_result
             
             # Collect non-empty results
@@ -169,25 +388,108 @@ class TextExtractor:
                 if text and len(text.strip()) > 0:
                     best_texts.append(text)
         
-        # Try EasyOCR on original and best processed versions
-        for i, proc_img in enumerate([processed_images[0], processed_images[3]]):  # original and threshold
+        # Try EasyOCR on original and threshold versions
+        for i, name in enumerate(['original', 'threshold']):
+            proc_img = variants[name]
+            start = time.perf_counter()
             easyocr_result = self.extract_text_easyocr(proc_img)
+            passes.append({'pass': f'easyocr:{name}', 'seconds': round(time.perf_counter() - start, 4)})
             results['easyocr_results'][f'version_{i}'] = easyocr_result
             
             if easyocr_result and len(easyocr_result.strip()) > 0:
                 best_texts.append(easyocr_result)
         
-        # Combine results (choose the longest meaningful text)
+        best_texts.sort(key=len, reverse=True)
+        return best_texts
+    
+    def _run_cascade(self, variants: PreprocessedVariants, results: Dict) -> List[str]:
+        """
+        Run OCR passes in cascade order, stopping at the first pass whose quality
+        score clears the threshold. Variants are only computed when a pass needs them.
+        Results are keyed by the variant's index in PREPROCESS_VARIANTS.
+        """
+        passes = results.setdefault('ocr_passes', [])
+        scored = []
+        stopped_early = False
+        
+        for spec in self.cascade_order:
+            engine, variant, config = self._parse_pass(spec)
+            proc_img = variants[variant]
+            key = f'version_{PREPROCESS_VARIANTS.index(variant)}'
+            
+            start = time.perf_counter()
+            if engine == 'tesseract':
+                text, confidence = self._tesseract_with_confidence(proc_img, TESSERACT_CONFIGS[config])
+                results['tesseract_results'].setdefault(key, {})[config] = text.strip()
+            else:
+                text, confidence = self._easyocr_with_confidence(proc_img)
+                results['easyocr_results'][key] = text
+            elapsed = time.perf_counter() - start
+            
+            score = self._score_pass(text, confidence)
+            passes.append({
+                'pass': spec,
+                'confidence': round(confidence, 3),
+                'score': round(score, 3),
+                'chars': len(text.strip()),
+                'seconds': round(elapsed, 4)
+            })
+            
+            if text.strip():
+                scored.append((score, text.strip()))
+            
+            if score >= self.cascade_threshold and len(text.strip()) >= self.cascade_min_chars:
+                stopped_early = True
+                break
+        
+        results['cascade'] = {
+            'threshold': self.cascade_threshold,
+            'stopped_early': stopped_early,
+            'passes_run': len(passes),
+            'passes_available': len(self.cascade_order),
+            'variants_computed': variants.computed
+        }
+        
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [text for _, text in scored]
+    
+    def extract_from_image(self, image_path: str) -> Dict[str, str]:
+        """
+        Extract text from an image file using multiple methods.
+        """
+        self.logger.info(f"Processing image: {image_path}")
+        
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+        
+        # Load image
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not load image: {image_path}")
+        
+        return self._extract_from_loaded_image(image, image_path)
+    
+    def _extract_from_loaded_image(self, image: np.ndarray, image_path: str) -> Dict[str, str]:
+        """Run OCR on a decoded image and pick the best meaningful text."""
+        results = {
+            'file_path': image_path,
+            'tesseract_results': {},
+            'easyocr_results': {},
+            'combined_text': ''
+        }
+        
+        # An uploaded image may be a photo with the table around the page in view
+        best_texts = self._run_ocr_passes(image, results, crop_page=True)
+        
+        # Combine results (choose the best-ranked meaningful text)
         if best_texts:
             # Filter out very short or garbage texts
             valid_texts = [text for text in best_texts if len(text.strip()) > 15 and self._is_meaningful_text(text)]
             if valid_texts:
-                # Sort by length and take the longest result
-                valid_texts.sort(key=len, reverse=True)
+                # Candidates are already ranked best-first
                 results['combined_text'] = self._clean_extracted_text(valid_texts[0])
             else:
                 # If no valid texts, try with original texts but warn
-                best_texts.sort(key=len, reverse=True)
                 results['combined_text'] = f"Text extraction quality is poor. Extracted: {best_texts[0][:100]}..."
         else:
             results['combined_text'] = "No readable text could be extracted from this image. Please ensure the image is clear, well-lit, and contains readable text."
@@ -228,14 +530,30 @@ class TextExtractor:
         
         return cleaned_text
     
-    def extract_from_pdf(self, pdf_path: str, use_ocr: bool = True) -> Dict[str, Union[str, List[Dict]]]:
+    def extract_from_pdf(self, pdf_path: str, use_ocr: bool = True, parallel: Optional[bool] = None,
+                         progress_callback: Optional[Callable[[int, int], None]] = None,
+                         page_callback: Optional[Callable[[Dict], None]] = None,
+                         stream: Optional[bytes] = None) -> Dict[str, Union[str, List[Dict]]]:
         """
         Extract text from PDF file.
         First tries direct text extraction, then OCR if needed.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            use_ocr: OCR pages whose embedded text is missing or too short
+            parallel: OCR those pages in the process pool. Defaults to the
+                extractor's parallel_pages setting.
+            progress_callback: Called as (pages_done, page_count) once direct text
+                extraction is done and again after each OCR'd page
+            page_callback: Called with each page's page_results entry as soon as
+                that page is final (in completion order, not page order)
+            stream: PDF content already in memory. When given, the document is opened
+                from it without touching disk, pdf_path is only used as a label, and
+                pages are OCR'd in this process (pool workers need a file path).
         """
         self.logger.info(f"Processing PDF: {pdf_path}")
         
-        if not os.path.exists(pdf_path):
+        if stream is None and not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         results = {
@@ -243,18 +561,45 @@ class TextExtractor:
             'direct_text': '',
             'ocr_text': '',
             'page_results': [],
-            'combined_text': ''
+            'combined_text': '',
+            'stats': {}
         }
         
         try:
             # Open PDF
-            doc = fitz.open(pdf_path)
+            if stream is not None:
+                doc = fitz.open(stream=stream, filetype="pdf")
+            else:
+                doc = fitz.open(pdf_path)
             
             direct_text_parts = []
-            ocr_text_parts = []
+            ocr_pages = []
+            ocr_done = set()
+            page_keys = {}
+            page_hits = 0
+            page_misses = 0
             
             for page_num in range(doc.page_count):
                 page = doc[page_num]
+                
+                # Unchanged pages of a revised document reuse their earlier result
+                if self.cache is not None:
+                    page_key = self._page_cache_key(doc, page, use_ocr)
+                    cached = self.cache.get(page_key)
+                    if cached is not None:
+                        page_result = cached['page_result']
+                        page_result['page_number'] = page_num + 1
+                        results['page_results'].append(page_result)
+                        direct_text_parts.append(page_result['direct_text'])
+                        if cached['ocr_done']:
+                            ocr_done.add(page_num)
+                        page_hits += 1
+                        if page_callback is not None:
+                            page_callback(page_result)
+                        continue
+                    page_keys[page_num] = page_key
+                    page_misses += 1
+                
                 page_result = {
                     'page_number': page_num + 1,
                     'direct_text': '',
@@ -266,28 +611,74 @@ class TextExtractor:
                 page_result['direct_text'] = direct_text
                 direct_text_parts.append(direct_text)
                 
-                # If direct extraction yields little text and OCR is enabled, use OCR
+                # If direct extraction yields little text and OCR is enabled, queue the page for OCR
                 if use_ocr and (not direct_text or len(direct_text.strip()) < 50):
-                    try:
-                        # Convert PDF page to image
-                        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x zoom for better quality
-                        img_data = pix.tobytes("png")
-                        
-                        # Convert to numpy array
-                        nparr = np.frombuffer(img_data, np.uint8)
-                        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-                        
-                        # Extract text using OCR
-                        ocr_result = self.extract_from_image_array(image)
-                        page_result['ocr_text'] = ocr_result['combined_text']
-                        ocr_text_parts.append(ocr_result['combined_text'])
-                        
-                    except Exception as e:
-                        self.logger.error(f"OCR failed for page {page_num + 1}: {e}")
-                        page_result['ocr_text'] = ""
+                    ocr_pages.append(page_num)
+                elif page_callback is not None:
+                    page_callback(page_result)
                 
                 results['page_results'].append(page_result)
             
+            if parallel is None:
+                parallel = self.parallel_pages
+            parallel = parallel and stream is None and len(ocr_pages) > 1 and self.page_workers > 1
+            
+            ocr_finished = 0
+            
+            def page_ocr_done(page_num: int, ocr_text: Optional[str]):
+                nonlocal ocr_finished
+                ocr_finished += 1
+                if ocr_text is not None:
+                    results['page_results'][page_num]['ocr_text'] = ocr_text
+                if progress_callback is not None:
+                    progress_callback(doc.page_count - len(ocr_pages) + ocr_finished, doc.page_count)
+                if page_callback is not None:
+                    page_callback(results['page_results'][page_num])
+            
+            if progress_callback is not None:
+                progress_callback(doc.page_count - len(ocr_pages), doc.page_count)
+            start = time.perf_counter()
+            if parallel:
+                ocr_texts = self._ocr_pages_parallel(pdf_path, ocr_pages, page_ocr_done)
+            else:
+                ocr_texts = {}
+                for page_num in ocr_pages:
+                    ocr_texts[page_num] = self._ocr_page(doc[page_num])
+                    page_ocr_done(page_num, ocr_texts[page_num])
+            
+            failed_pages = set()
+            for page_num in ocr_pages:
+                ocr_text = ocr_texts.get(page_num)
+                if ocr_text is None:
+                    failed_pages.add(page_num)
+                else:
+                    results['page_results'][page_num]['ocr_text'] = ocr_text
+                    ocr_done.add(page_num)
+            
+            # Cache freshly extracted pages; failed OCR is retried next time
+            for page_num, page_key in page_keys.items():
+                if page_num not in failed_pages:
+                    self.cache.put(page_key, {
+                        'page_result': results['page_results'][page_num],
+                        'ocr_done': page_num in ocr_done
+                    })
+            
+            # Page order is kept regardless of the order pages finished in
+            ocr_text_parts = [results['page_results'][page_num]['ocr_text'] for page_num in sorted(ocr_done)]
+            
+            results['stats'] = {
+                'page_count': doc.page_count,
+                'ocr_pages': len(ocr_pages),
+                'parallel': parallel,
+                'workers': self.page_workers if parallel else 1,
+                'ocr_seconds': round(time.perf_counter() - start, 4),
+                'page_cache': {
+                    'enabled': self.cache is not None,
+                    'hits': page_hits,
+                    'misses': page_misses
+                }
+            }
+            
             doc.close()
             
             # Combine results
@@ -306,66 +697,281 @@ class TextExtractor:
         
         return results
     
-    def extract_from_image_array(self, image: np.ndarray) -> Dict[str, str]:
-        """Extract text from numpy image array."""
-        processed_images = self.preprocess_image(image)
+    def extract_from_docx(self, docx_path: str, stream: Optional[bytes] = None) -> Dict:
+        """
+        Extract text from a Word document: paragraphs, tables, headers and footers,
+        plus OCR of embedded images that carry text (see docx_extractor).
+        
+        Args:
+            docx_path: Path to the .docx file (only a label when stream is given)
+            stream: Document content already in memory
+        """
+        self.logger.info(f"Processing DOCX: {docx_path}")
+        
+        if stream is None and not os.path.exists(docx_path):
+            raise FileNotFoundError(f"DOCX file not found: {docx_path}")
+        
+        ocr = None
+        if self.docx_ocr_images:
+            ocr = lambda image: self.extract_from_image_array(image)['combined_text']
+        
+        try:
+            results = extract_docx(stream if stream is not None else docx_path, ocr=ocr)
+        except Exception as e:
+            self.logger.error(f"DOCX processing failed: {e}")
+            raise
+        
+        results['file_path'] = docx_path
+        return results
+    
+    def render_page(self, page: "fitz.Page", zoom: float = PDF_RENDER_ZOOM) -> np.ndarray:
+        """Rasterise a PDF page to a BGR image array."""
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return pixmap_to_array(pix)
+    
+    def _ocr_page(self, page: "fitz.Page") -> Optional[str]:
+        """OCR a single PDF page in this process. Returns None if OCR failed."""
+        try:
+            image = self.render_page(page)
+            return self.extract_from_image_array(image)['combined_text']
+        except Exception as e:
+            self.logger.error(f"OCR failed for page {page.number + 1}: {e}")
+            return None
+    
+    def _worker_settings(self) -> Dict:
+        """Constructor arguments that page workers need to OCR like this extractor."""
+        return {
+            'ocr_mode': self.ocr_mode,
+            'cascade_order': self.cascade_order,
+            'cascade_threshold': self.cascade_threshold,
+            'cascade_min_chars': self.cascade_min_chars,
+            'parallel_pages': False,
+            'normalize_images': self.normalizer is not None,
+            'tesseract_backend': self.tesseract_backend
+        }
+    
+    def _get_page_pool(self) -> ProcessPoolExecutor:
+        """Create the page OCR pool on first use and reuse it afterwards."""
+        with self._page_pool_lock:
+            if self._page_pool is None:
+                self._page_pool = ProcessPoolExecutor(
+                    max_workers=self.page_workers,
+                    initializer=_init_page_worker,
+                    initargs=(self._worker_settings(),)
+                )
+            return self._page_pool
+    
+    def _discard_page_pool(self, pool: ProcessPoolExecutor):
+        """Shut down a broken pool; the next call starts a fresh one (unless another thread already did)."""
+        with self._page_pool_lock:
+            if self._page_pool is pool:
+                self._page_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _ocr_pages_parallel(self, pdf_path: str, page_nums: List[int],
+                            on_page_done: Optional[Callable[[int, Optional[str]], None]] = None
+                            ) -> Dict[int, Optional[str]]:
+        """
+        OCR PDF pages across the process pool.
+        At most max_pages_in_flight pages are submitted at once, so only that many
+        rasterised pages can be held in memory. on_page_done is called with
+        (page index, OCR text or None) as each page finishes.
+        
+        Returns:
+            Mapping of page index to OCR text (None where OCR failed)
+        """
+        pool = self._get_page_pool()
+        ocr_texts = {}
+        pending = {}
+        queue = iter(page_nums)
+        pool_broken = False
+        
+        def submit_next():
+            nonlocal pool_broken
+            page_num = next(queue, None)
+            if page_num is None:
+                return
+            try:
+                pending[pool.submit(_ocr_pdf_page, pdf_path, page_num)] = page_num
+            except (BrokenProcessPool, RuntimeError) as e:
+                # Broken, or shut down by another request that found it broken
+                self.logger.error(f"OCR failed for page {page_num + 1}: {e}")
+                ocr_texts[page_num] = None
+                pool_broken = True
+                if on_page_done is not None:
+                    on_page_done(page_num, None)
+        
+        for _ in range(self.max_pages_in_flight):
+            submit_next()
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_num = pending.pop(future)
+                try:
+                    ocr_texts[page_num] = future.result()
+                except BrokenProcessPool as e:
+                    self.logger.error(f"OCR failed for page {page_num + 1}: {e}")
+                    ocr_texts[page_num] = None
+                    pool_broken = True
+                except Exception as e:
+                    self.logger.error(f"OCR failed for page {page_num + 1}: {e}")
+                    ocr_texts[page_num] = None
+                if on_page_done is not None:
+                    on_page_done(page_num, ocr_texts[page_num])
+                if not pool_broken:
+                    submit_next()
         
+        if pool_broken:
+            # A worker died; start a fresh pool on the next call
+            self._discard_page_pool(pool)
+            for page_num in queue:
+                ocr_texts[page_num] = None
+                if on_page_done is not None:
+                    on_page_done(page_num, None)
+        
+        return ocr_texts
+    
+    def close(self):
+        """Shut down the page OCR pool, if one was started."""
+        with self._page_pool_lock:
+            pool, self._page_pool = self._page_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+    
+    def extract_from_image_array(self, image: np.ndarray) -> Dict[str, str]:
+        """Extract text from numpy image array (a rendered PDF page or an embedded image, never cropped)."""
         results = {
             'tesseract_results': {},
             'easyocr_results': {},
             'combined_text': ''
         }
         
-        best_texts = []
-        
-        # Try Tesseract
-        for i, proc_img in enumerate(processed_images):
-            tesseract_result = self.extract_text_tesseract(proc_img)
-            results['tesseract_results'][f'version_{i}'] = tesseract_result
-            
-            for method, text in tesseract_result.items():
-                if text and len(text.strip()) > 0:
-                    best_texts.append(text)
-        
-        # Try EasyOCR
-        for i, proc_img in enumerate([processed_images[0], processed_images[3]]):
-            easyocr_result = self.extract_text_easyocr(proc_img)
-            results['easyocr_results'][f'version_{i}'] = easyocr_result
-            
-            if easyocr_result and len(easyocr_result.strip()) > 0:
-                best_texts.append(easyocr_result)
+        best_texts = self._run_ocr_passes(image, results)
         
         # Choose the best result
         if best_texts:
-            best_texts.sort(key=len, reverse=True)
             results['combined_text'] = best_texts[0]
         
         return results
     
-    def extract_text(self, file_path: str, output_format: str = 'text') -> Union[str, Dict]:
+    def extract_text(self, file_path: str, output_format: str = 'text',
+                     progress_callback: Optional[Callable[[int, int], None]] = None,
+                     page_callback: Optional[Callable[[Dict], None]] = None) -> Union[str, Dict]:
         """
-        Main method to extract text from either image or PDF.
+        Main method to extract text from an image, PDF or Word document.
         
         Args:
             file_path: Path to the file
             output_format: 'text' for plain text, 'detailed' for detailed results
+            progress_callback: Page progress callback for PDFs (see extract_from_pdf)
+            page_callback: Per-page result callback for PDFs (see extract_from_pdf)
         
         Returns:
             Extracted text or detailed results dictionary
         """
         file_ext = os.path.splitext(file_path)[1].lower()
+        self._check_format(file_ext)
         
-        if file_ext in ['.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif']:
-            results = self.extract_from_image(file_path)
-        elif file_ext == '.pdf':
-            results = self.extract_from_pdf(file_path)
-        else:
+        def extract() -> Dict:
+            if file_ext in IMAGE_EXTENSIONS:
+                return self.extract_from_image(file_path)
+            if file_ext in DOCX_EXTENSIONS:
+                return self.extract_from_docx(file_path)
+            return self.extract_from_pdf(file_path, progress_callback=progress_callback,
+                                         page_callback=page_callback)
+        
+        results = self._extract_cached(lambda: file_sha256(file_path), file_ext, file_path, extract)
+        return results['combined_text'] if output_format == 'text' else results
+    
+    def extract_text_from_bytes(self, data: bytes, filename: str, output_format: str = 'text',
+                                progress_callback: Optional[Callable[[int, int], None]] = None,
+                                page_callback: Optional[Callable[[Dict], None]] = None) -> Union[str, Dict]:
+        """
+        Same as extract_text, for a document that is already in memory.
+        Nothing is written to disk.
+        
+        Args:
+            data: File content
+            filename: Original file name; its extension selects the extractor
+            output_format: 'text' for plain text, 'detailed' for detailed results
+            progress_callback: Page progress callback for PDFs (see extract_from_pdf)
+            page_callback: Per-page result callback for PDFs (see extract_from_pdf)
+        """
+        file_ext = os.path.splitext(filename)[1].lower()
+        self._check_format(file_ext)
+        
+        def extract() -> Dict:
+            if file_ext in IMAGE_EXTENSIONS:
+                image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError(f"Could not load image: {filename}")
+                return self._extract_from_loaded_image(image, filename)
+            if file_ext in DOCX_EXTENSIONS:
+                return self.extract_from_docx(filename, stream=data)
+            return self.extract_from_pdf(filename, progress_callback=progress_callback,
+                                         page_callback=page_callback, stream=data)
+        
+        results = self._extract_cached(lambda: hashlib.sha256(data).hexdigest(), file_ext, filename, extract)
+        return results['combined_text'] if output_format == 'text' else results
+    
+    def _check_format(self, file_ext: str):
+        if file_ext not in IMAGE_EXTENSIONS and file_ext not in DOCX_EXTENSIONS and file_ext != '.pdf':
             raise ValueError(f"Unsupported file format: {file_ext}")
+    
+    def _extract_cached(self, content_hash: Callable[[], str], file_ext: str, label: str,
+                        extract: Callable[[], Dict]) -> Dict:
+        """Serve repeat uploads of the same content from the cache, otherwise extract and store."""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(content_hash(), file_ext)
+            results = self.cache.get(cache_key)
+            if results is not None:
+                self.logger.info(f"Extraction cache hit: {label}")
+                results['file_path'] = label
+                results['cache_hit'] = True
+                return results
         
-        if output_format == 'text':
-            return results['combined_text']
-        else:
-            return results
+        results = extract()
+        if cache_key is not None:
+            self.cache.put(cache_key, results)
+        results['cache_hit'] = False
+        return results
+    
+    def _settings_fingerprint(self, **extra) -> str:
+        """Short hash of the settings that affect the extracted text."""
+        settings = self._worker_settings()
+        settings.pop('parallel_pages')
+        # Both backends run the same engine on the same pixels
+        settings.pop('tesseract_backend')
+        if self.normalizer is not None:
+            settings['normalize_images'] = self.normalizer.settings()
+        settings.update(extra)
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    
+    def _cache_key(self, content_hash: str, file_ext: str) -> str:
+        """Cache key: content hash plus the settings that affect the extracted text."""
+        if file_ext in DOCX_EXTENSIONS:
+            return f"{content_hash}:{self._settings_fingerprint(file_ext=file_ext, docx_ocr_images=self.docx_ocr_images)}"
+        return f"{content_hash}:{self._settings_fingerprint(file_ext=file_ext)}"
+    
+    def _page_cache_key(self, doc: "fitz.Document", page: "fitz.Page", use_ocr: bool) -> str:
+        """
+        Page cache key: hash of the page's content stream, the images and fonts it
+        references and its geometry, plus the extraction settings.
+        """
+        digest = hashlib.sha256()
+        digest.update(page.read_contents())
+        digest.update(repr((tuple(page.rect), page.rotation)).encode('utf-8'))
+        for image in page.get_images(full=True):
+            xref, smask = image[0], image[1]
+            digest.update(doc.xref_stream_raw(xref) or b'')
+            if smask:
+                digest.update(doc.xref_stream_raw(smask) or b'')
+        # Font xrefs are renumbered when a document is re-saved, so only names and encodings count
+        fonts = [font[1:6] for font in page.get_fonts(full=True)]
+        digest.update(repr(fonts).encode('utf-8'))
+        return f"page:{digest.hexdigest()}:{self._settings_fingerprint(use_ocr=use_ocr)}"
     
     def save_results(self, results: Dict, output_path: str):
         """Save extraction results to a JSON file."""
@@ -374,6 +980,25 @@ class TextExtractor:
         self.logger.info(f"Results saved to: {output_path}")
 
 
+# Per-process extractor used by the PDF page OCR pool
+_page_worker_extractor = None
+
+
+def _init_page_worker(settings: Dict):
+    """Pool initializer: build one TextExtractor per worker process."""
+    global _page_worker_extractor
+    _page_worker_extractor = TextExtractor(**settings)
+
+
+def _ocr_pdf_page(pdf_path: str, page_num: int) -> Optional[str]:
+    """Pool task: rasterise and OCR one page of a PDF."""
+    doc = fitz.open(pdf_path)
+    try:
+        return _page_worker_extractor._ocr_page(doc[page_num])
+    finally:
+        doc.close()
+
+
 def main():
     """Example usage of the TextExtractor."""
     extractor = TextExtractor()
@@ -382,7 +1007,7 @@ def main():
     print("Text Extraction Tool")
     print("=" * 50)
     
-    file_path = input("Enter the path to your image or PDF file: ").strip()
+    file_path = input("Enter the path to your image, PDF or DOCX file: ").strip()
     
     if not file_path:
         print("No file path provided. Exiting.")